@@ -23,6 +23,11 @@ def create_app():
     
     app = Flask(__name__)
     
+    # Encode JSON responses with orjson when it is installed
+    from app.json_provider import ORJSON_AVAILABLE, OrjsonProvider
+    if ORJSON_AVAILABLE:
+        app.json = OrjsonProvider(app)
+    
     # Enable CORS for frontend communication
     CORS(app, origins=["http://localhost:5173", "http://localhost:5174"])
     
@@ -30,6 +35,10 @@ def create_app():
     from app.database import init_db
     init_db(app)
     
+    # Raise on N+1 lazy loads during development
+    if os.environ.get('NPLUSONE'):
+        _enable_nplusone(app)
+    
     # Register error handlers for database operations
     from app.errors import register_error_handlers
     register_error_handlers(app)
@@ -43,3 +52,15 @@ def create_app():
     socketio = init_socketio(app)
     
     return app
+
+
+def _enable_nplusone(app):
+    """Make nplusone raise on N+1 queries, if the optional package is installed."""
+    try:
+        from nplusone.ext.flask_sqlalchemy import NPlusOne
+    except ImportError:
+        logging.getLogger(__name__).warning("NPLUSONE is set but nplusone is not installed")
+        return
+    
+    app.config['NPLUSONE_RAISE'] = True
+    NPlusOne(app)
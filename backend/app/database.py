@@ -5,6 +5,8 @@ Configures SQLAlchemy with Flask, supporting both SQLite (default) and MySQL.
 """
 import os
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event, inspect, text
+from sqlalchemy.schema import CreateColumn
 from sqlalchemy.orm import DeclarativeBase
 
 
@@ -15,6 +17,12 @@ class Base(DeclarativeBase):
 
 db = SQLAlchemy(model_class=Base)
 
+# Connection pool defaults for MySQL/Postgres; override with DB_POOL_SIZE
+# and DB_MAX_OVERFLOW. Keep pool_size + max_overflow, times the number of
+# worker processes, below the server's max_connections.
+DEFAULT_POOL_SIZE = 20
+DEFAULT_MAX_OVERFLOW = 30
+
 
 def get_database_url():
     """
@@ -50,11 +58,13 @@ def init_db(app):
     app.config['SQLALCHEMY_DATABASE_URI'] = database_url
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
     
-    # Connection pooling settings for production
+    # Connection pooling settings for production, sized so bursts of
+    # concurrent uploads don't queue waiting for a connection
     if not database_url.startswith('sqlite'):
         app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
-            'pool_size': 10,
-            'pool_recycle': 3600,
+            'pool_size': int(os.environ.get('DB_POOL_SIZE', DEFAULT_POOL_SIZE)),
+            'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', DEFAULT_MAX_OVERFLOW)),
+            'pool_recycle': 1800,
             'pool_pre_ping': True
         }
     
@@ -70,9 +80,93 @@ def init_db(app):
     # This must happen after db.init_app() but before db.create_all()
     from app.models import User, Session, Content, QuizResult, Conversation, Message
     from app.models import (Friend, FriendRequest, DirectChat, DirectMessage, 
-                           GroupMessage, GroupLearning, GroupMember, Call, 
+                           MessageRead, GroupMessage, GroupLearning, GroupMember, Call, 
                            CallParticipant, UserPresence)
     
-    # Create all tables
+    # Create all tables, then bring pre-existing ones up to date
     with app.app_context():
+        if database_url.startswith('sqlite') and ':memory:' not in database_url:
+            event.listen(db.engine, 'connect', _set_sqlite_pragmas)
+        if db.engine.dialect.name == 'postgresql':
+            # Needed by the trigram indexes on users
+            with db.engine.begin() as connection:
+                connection.execute(text('CREATE EXTENSION IF NOT EXISTS pg_trgm'))
         db.create_all()
+        upgrade_schema()
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """
+    Tune each new SQLite connection for a web workload.
+    
+    WAL lets readers proceed while a write is in progress, and
+    synchronous=NORMAL syncs only at checkpoints rather than on every commit,
+    which is still crash-safe in WAL mode.
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute('PRAGMA journal_mode=WAL')
+    cursor.execute('PRAGMA synchronous=NORMAL')
+    cursor.close()
+
+
+def upgrade_schema():
+    """
+    Apply schema additions that db.create_all() skips on existing tables.
+    
+    create_all() only creates missing tables, so columns and indexes added
+    to a model after its table was first created never reach an existing
+    database. Every step here is idempotent and safe to run on each startup.
+    
+    New columns on existing tables must be nullable or carry a
+    server_default so the ALTER TABLE succeeds on populated tables.
+    """
+    inspector = inspect(db.engine)
+    added_columns = set()
+    
+    with db.engine.begin() as connection:
+        for table in db.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            
+            existing_columns = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing_columns:
+                    continue
+                
+                column_spec = CreateColumn(column).compile(dialect=connection.dialect)
+                connection.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column_spec}'))
+                added_columns.add(f'{table.name}.{column.name}')
+    
+    # Read receipts moved from direct_messages.read_by to message_reads
+    if inspector.has_table('direct_messages') and 'read_by' in {
+        column['name'] for column in inspector.get_columns('direct_messages')
+    }:
+        from app.services.chat_service import chat_service
+        chat_service.import_legacy_read_by()
+        with db.engine.begin() as connection:
+            connection.execute(text('ALTER TABLE direct_messages DROP COLUMN read_by'))
+    
+    # Backfill denormalized columns from the data they summarize
+    if added_columns & {'direct_chats.user1_unread', 'direct_chats.user2_unread'}:
+        from app.services.chat_service import chat_service
+        chat_service.recount_unread()
+    
+    if 'quiz_results.success_rate' in added_columns:
+        from app.services.progress_service import progress_service
+        progress_service.backfill_success_rates()
+    
+    missing_indexes = []
+    for table in db.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        
+        existing_indexes = {index['name'] for index in inspector.get_indexes(table.name)}
+        missing_indexes.extend(index for index in table.indexes if index.name not in existing_indexes)
+    
+    # Existing rows must satisfy a unique index before it can be built
+    if any(index.name == 'uq_direct_chats_users' for index in missing_indexes):
+        from app.services.chat_service import chat_service
+        chat_service.canonicalize_chats()
+    
+    for index in missing_indexes:
+        index.create(db.engine, checkfirst=True)
@@ -0,0 +1,74 @@
+"""
+JSON encoding backed by orjson, when it is installed.
+
+orjson is optional: without it, HTTP responses and Socket.IO packets keep
+using the standard library encoder. Output is the same either way: dates
+still go through Flask's default handler, and key sorting is preserved.
+"""
+import json
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+ORJSON_AVAILABLE = orjson is not None
+
+# Standard library options orjson can honour (or safely ignore: its output
+# is always compact UTF-8)
+_SUPPORTED_DUMPS_ARGS = {'default', 'sort_keys', 'indent', 'separators', 'ensure_ascii'}
+
+
+def dumps(obj, **kwargs) -> str:
+    """
+    Serialize obj to a JSON string, with json.dumps-compatible arguments.
+    
+    Args:
+        obj: Object to serialize
+        **kwargs: json.dumps options; any orjson cannot honour fall back
+            to the standard library
+            
+    Returns:
+        JSON string
+    """
+    if not ORJSON_AVAILABLE or not set(kwargs) <= _SUPPORTED_DUMPS_ARGS:
+        return json.dumps(obj, **kwargs)
+    
+    # Let dates reach `default` so they encode exactly as json.dumps would
+    option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+    if kwargs.get('sort_keys'):
+        option |= orjson.OPT_SORT_KEYS
+    if kwargs.get('indent'):
+        option |= orjson.OPT_INDENT_2
+    
+    return orjson.dumps(obj, default=kwargs.get('default'), option=option).decode('utf-8')
+
+
+def loads(s, **kwargs):
+    """
+    Deserialize a JSON string or bytes, with json.loads-compatible arguments.
+    
+    Args:
+        s: JSON document
+        **kwargs: json.loads options; any given fall back to the standard library
+        
+    Returns:
+        Deserialized object
+    """
+    if not ORJSON_AVAILABLE or kwargs:
+        return json.loads(s, **kwargs)
+    return orjson.loads(s)
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider that encodes and decodes with orjson."""
+    
+    def dumps(self, obj, **kwargs) -> str:
+        kwargs.setdefault('default', self.default)
+        kwargs.setdefault('sort_keys', self.sort_keys)
+        return dumps(obj, **kwargs)
+    
+    def loads(self, s, **kwargs):
+        return loads(s, **kwargs)
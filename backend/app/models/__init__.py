@@ -21,7 +21,7 @@ from app.models.conversation import Conversation, Message
 from app.models.friend import Friend
 from app.models.friend_request import FriendRequest, RequestStatus
 from app.models.direct_chat import DirectChat
-from app.models.message import DirectMessage, GroupMessage
+from app.models.message import DirectMessage, MessageRead, GroupMessage
 from app.models.group_learning import GroupLearning
 from app.models.group_member import GroupMember
 from app.models.call import Call, CallParticipant
@@ -41,6 +41,7 @@ __all__ = [
     "RequestStatus",
     "DirectChat",
     "DirectMessage",
+    "MessageRead",
     "GroupMessage",
     "GroupLearning",
     "GroupMember",
@@ -3,7 +3,7 @@ Call and CallParticipant models for voice/video calls.
 """
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime, ForeignKey, Boolean
+from sqlalchemy import Column, String, DateTime, ForeignKey, Boolean, Index
 from app.database import db
 
 
@@ -26,6 +26,11 @@ class Call(db.Model):
     participants = db.relationship('CallParticipant', backref='call', lazy='dynamic',
                                   cascade='all, delete-orphan')
     
+    def __init__(self, **kwargs):
+        # Assign the ID up front so participants can reference it before a flush
+        kwargs.setdefault('id', str(uuid.uuid4()))
+        super().__init__(**kwargs)
+    
     def to_dict(self, include_participants=False):
         """Convert call to dictionary."""
         result = {
@@ -57,6 +62,9 @@ class Call(db.Model):
 class CallParticipant(db.Model):
     """Model representing a participant in a call."""
     __tablename__ = 'call_participants'
+    __table_args__ = (
+        Index('ix_callpart_call_user', 'call_id', 'user_id', unique=True),
+    )
     
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     call_id = Column(String(36), ForeignKey('calls.id'), nullable=False)
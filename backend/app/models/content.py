@@ -22,6 +22,7 @@ class Content(db.Model):
     content_type = db.Column(db.String(50), nullable=False)
     file_path = db.Column(db.String(500), nullable=False)
     file_size = db.Column(db.Integer, default=0)
+    sha256 = db.Column(db.String(64), nullable=True)  # Blob name; shared by identical uploads
     title = db.Column(db.String(255), nullable=True)
     summary = db.Column(db.Text, nullable=True)
     extracted_text = db.Column(db.Text, nullable=True)  # Full extracted text from PDF/video
@@ -30,28 +31,43 @@ class Content(db.Model):
     processing_status = db.Column(db.String(20), default='pending')
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    # Keyset index for get_user_content: (user_id, created_at DESC, id DESC)
+    __table_args__ = (
+        db.Index('ix_contents_user_created', user_id, created_at.desc(), id.desc()),
+    )
+    
     def __repr__(self):
         return f'<Content {self.id}: {self.filename}>'
     
     @property
     def key_points(self) -> List[str]:
         """Get key points as a list."""
-        return json.loads(self.key_points_json) if self.key_points_json else []
+        return self.load_list(self.key_points_json)
     
     @key_points.setter
     def key_points(self, value: Optional[List[str]]) -> None:
         """Set key points from a list."""
-        self.key_points_json = json.dumps(value) if value else None
+        self.key_points_json = self.dump_list(value)
     
     @property
     def topics(self) -> List[str]:
         """Get topics as a list."""
-        return json.loads(self.topics_json) if self.topics_json else []
+        return self.load_list(self.topics_json)
     
     @topics.setter
     def topics(self, value: Optional[List[str]]) -> None:
         """Set topics from a list."""
-        self.topics_json = json.dumps(value) if value else None
+        self.topics_json = self.dump_list(value)
+    
+    @staticmethod
+    def load_list(value: Optional[str]) -> List[str]:
+        """Decode a list from the *_json columns (NULL reads as an empty list)."""
+        return json.loads(value) if value else []
+    
+    @staticmethod
+    def dump_list(value: Optional[List[str]]) -> Optional[str]:
+        """Encode a list for the *_json columns (empty lists are stored as NULL)."""
+        return json.dumps(value) if value else None
     
     def to_dict(self) -> dict:
         """Convert content to dictionary for API responses."""
@@ -108,6 +124,10 @@ ALLOWED_EXTENSIONS = {
 }
 
 
+# File types keyed by bare lowercase extension, so lookups skip the '.' concat
+_FILE_TYPES_BY_SUFFIX = {ext[1:]: file_type for ext, file_type in ALLOWED_EXTENSIONS.items()}
+
+
 def get_file_type(filename: str) -> Optional[str]:
     """
     Get the file type based on filename extension.
@@ -122,9 +142,9 @@ def get_file_type(filename: str) -> Optional[str]:
         return None
     
     # Get the extension (lowercase)
-    ext = '.' + filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+    _, dot, ext = filename.rpartition('.')
     
-    return ALLOWED_EXTENSIONS.get(ext)
+    return _FILE_TYPES_BY_SUFFIX.get(ext.lower()) if dot else None
 
 
 def is_allowed_file(filename: str) -> bool:
@@ -3,19 +3,30 @@ DirectChat model for one-on-one messaging between friends.
 """
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime, ForeignKey
+from sqlalchemy import Column, String, DateTime, ForeignKey, Integer, Index
 from app.database import db
 
 
 class DirectChat(db.Model):
-    """Model representing a direct chat between two users."""
+    """
+    Model representing a direct chat between two users.
+    
+    The pair is stored canonically with user1_id < user2_id, so each pair
+    maps to exactly one row.
+    """
     __tablename__ = 'direct_chats'
+    __table_args__ = (
+        Index('uq_direct_chats_users', 'user1_id', 'user2_id', unique=True),
+    )
     
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     user1_id = Column(String(36), ForeignKey('users.id'), nullable=False)
     user2_id = Column(String(36), ForeignKey('users.id'), nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     last_message_at = Column(DateTime, default=datetime.utcnow)
+    # Denormalized unread counters, maintained by ChatService
+    user1_unread = Column(Integer, default=0, server_default='0', nullable=False)
+    user2_unread = Column(Integer, default=0, server_default='0', nullable=False)
     
     # Relationships
     user1 = db.relationship('User', foreign_keys=[user1_id])
@@ -40,3 +51,7 @@ class DirectChat(db.Model):
     def get_other_user_id(self, current_user_id):
         """Get the ID of the other user in the chat."""
         return self.user2_id if self.user1_id == current_user_id else self.user1_id
+    
+    def get_unread_count(self, current_user_id):
+        """Get the number of unread messages for a user in the chat."""
+        return self.user1_unread if self.user1_id == current_user_id else self.user2_unread
@@ -8,7 +8,14 @@ from app.database import db
 
 
 class Friend(db.Model):
-    """Model representing a friendship between two users."""
+    """
+    Model representing a friendship between two users.
+    
+    Friendships are stored in both directions: accepting a request writes
+    (a, b) and (b, a), and removal deletes both. The table is therefore
+    already the symmetric edge set, and "is b a friend of a?" is a single
+    probe on the unique_friendship index.
+    """
     __tablename__ = 'friends'
     
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
@@ -3,7 +3,7 @@ FriendRequest model for managing friend request states.
 """
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime, ForeignKey, Enum
+from sqlalchemy import Column, String, DateTime, ForeignKey, Enum, Index
 from app.database import db
 import enum
 
@@ -26,6 +26,12 @@ class FriendRequest(db.Model):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    # Received and sent request listings filter on status and sort by age
+    __table_args__ = (
+        Index('ix_friend_requests_recipient_status', recipient_id, status, created_at.desc()),
+        Index('ix_friend_requests_sender_status', sender_id, status, created_at.desc()),
+    )
+    
     # Relationships
     sender = db.relationship('User', foreign_keys=[sender_id], backref='sent_requests')
     recipient = db.relationship('User', foreign_keys=[recipient_id], backref='received_requests')
@@ -44,3 +50,25 @@ class FriendRequest(db.Model):
             result['sender'] = self.sender.to_dict() if self.sender else None
             result['recipient'] = self.recipient.to_dict() if self.recipient else None
         return result
+    
+    @staticmethod
+    def to_list_dict(row, party: str) -> dict:
+        """
+        Build a request list entry from a column projection.
+        
+        Only the other party of the request is included, as a short
+        {id, name, email} summary under party ('sender' or 'recipient').
+        """
+        return {
+            'id': row.id,
+            'senderId': row.sender_id,
+            'recipientId': row.recipient_id,
+            'status': row.status,
+            'createdAt': row.created_at.isoformat() if row.created_at else None,
+            'updatedAt': row.updated_at.isoformat() if row.updated_at else None,
+            party: {
+                'id': row.sender_id if party == 'sender' else row.recipient_id,
+                'name': row.name,
+                'email': row.email
+            }
+        }
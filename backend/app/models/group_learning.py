@@ -3,8 +3,10 @@ GroupLearning model for collaborative learning sessions.
 """
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime, ForeignKey, Text
+from sqlalchemy import Column, String, DateTime, ForeignKey, Index, Text
+from sqlalchemy.orm import selectinload
 from app.database import db
+from app.models.group_member import GroupMember
 
 
 class GroupLearning(db.Model):
@@ -18,6 +20,11 @@ class GroupLearning(db.Model):
     created_at = Column(DateTime, default=datetime.utcnow)
     last_activity_at = Column(DateTime, default=datetime.utcnow)
     
+    # Groups are listed most recently active first
+    __table_args__ = (
+        Index('ix_group_learning_last_activity', last_activity_at.desc()),
+    )
+    
     # Relationships
     creator = db.relationship('User', foreign_keys=[creator_id])
     members = db.relationship('GroupMember', backref='group', lazy='dynamic',
@@ -25,8 +32,15 @@ class GroupLearning(db.Model):
     messages = db.relationship('GroupMessage', backref='group', lazy='dynamic',
                               order_by='GroupMessage.created_at', cascade='all, delete-orphan')
     
-    def to_dict(self, include_members=False):
-        """Convert group to dictionary."""
+    def to_dict(self, include_members=False, member_count=None):
+        """
+        Convert group to dictionary.
+        
+        member_count may be passed in when the caller has already counted
+        active members for several groups at once.
+        """
+        if member_count is None:
+            member_count = self.members.filter_by(status='active').count()
         result = {
             'id': self.id,
             'name': self.name,
@@ -35,8 +49,9 @@ class GroupLearning(db.Model):
             'creatorName': self.creator.name if self.creator else None,
             'createdAt': self.created_at.isoformat() if self.created_at else None,
             'lastActivityAt': self.last_activity_at.isoformat() if self.last_activity_at else None,
-            'memberCount': self.members.filter_by(status='active').count()
+            'memberCount': member_count
         }
         if include_members:
-            result['members'] = [m.to_dict() for m in self.members.filter_by(status='active').all()]
+            members = self.members.options(selectinload(GroupMember.user)).filter_by(status='active')
+            result['members'] = [m.to_dict() for m in members]
         return result
@@ -3,7 +3,7 @@ GroupMember model for tracking group membership.
 """
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime, ForeignKey
+from sqlalchemy import Column, String, DateTime, ForeignKey, Index
 from app.database import db
 
 
@@ -19,6 +19,13 @@ class GroupMember(db.Model):
     joined_at = Column(DateTime, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     
+    # A user's memberships by status (group listings and invitations), and a
+    # group's members by status (membership checks and member counts)
+    __table_args__ = (
+        Index('ix_group_members_user_status', 'user_id', 'status'),
+        Index('ix_group_members_group_status_user', 'group_id', 'status', 'user_id'),
+    )
+    
     # Relationships
     user = db.relationship('User', foreign_keys=[user_id])
     
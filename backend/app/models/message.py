@@ -3,7 +3,7 @@ Message models for direct and group messaging.
 """
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, Text, DateTime, ForeignKey, JSON
+from sqlalchemy import Column, String, Text, DateTime, ForeignKey, JSON, Index
 from app.database import db
 
 
@@ -15,11 +15,16 @@ class DirectMessage(db.Model):
     chat_id = Column(String(36), ForeignKey('direct_chats.id'), nullable=False)
     sender_id = Column(String(36), ForeignKey('users.id'), nullable=False)
     content = Column(Text, nullable=False)
-    read_by = Column(JSON, default=list)  # List of user IDs who have read the message
     created_at = Column(DateTime, default=datetime.utcnow)
     
+    # Keyset pagination index for get_messages: (chat_id, created_at DESC, id DESC)
+    __table_args__ = (
+        Index('ix_direct_messages_chat_created', chat_id, created_at.desc(), id.desc()),
+    )
+    
     # Relationships
     sender = db.relationship('User', foreign_keys=[sender_id])
+    reads = db.relationship('MessageRead', lazy='selectin', cascade='all, delete-orphan')
     
     def to_dict(self):
         """Convert message to dictionary."""
@@ -29,11 +34,21 @@ class DirectMessage(db.Model):
             'senderId': self.sender_id,
             'senderName': self.sender.name if self.sender else None,
             'content': self.content,
-            'readBy': self.read_by or [],
+            'readBy': [read.user_id for read in self.reads],
             'createdAt': self.created_at.isoformat() if self.created_at else None
         }
 
 
+class MessageRead(db.Model):
+    """Read receipt for a direct message, one row per (message, reader)."""
+    __tablename__ = 'message_reads'
+    
+    # The composite primary key doubles as the (message_id, user_id) lookup index
+    message_id = Column(String(36), ForeignKey('direct_messages.id'), primary_key=True)
+    user_id = Column(String(36), ForeignKey('users.id'), primary_key=True)
+    read_at = Column(DateTime, default=datetime.utcnow)
+
+
 class GroupMessage(db.Model):
     """Model for messages in group learning sessions."""
     __tablename__ = 'group_messages'
@@ -45,6 +60,11 @@ class GroupMessage(db.Model):
     read_by = Column(JSON, default=list)
     created_at = Column(DateTime, default=datetime.utcnow)
     
+    # Keyset index for get_group_messages: (group_id, created_at DESC, id DESC)
+    __table_args__ = (
+        Index('ix_group_messages_group_created', group_id, created_at.desc(), id.desc()),
+    )
+    
     # Relationships
     sender = db.relationship('User', foreign_keys=[sender_id])
     
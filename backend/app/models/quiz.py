@@ -1,6 +1,8 @@
 """Quiz models for quiz generation and results."""
 from dataclasses import dataclass, field
 from datetime import datetime
+from functools import cached_property
+from operator import eq
 from typing import Optional
 import uuid
 
@@ -46,6 +48,16 @@ class QuizQuestion:
         )
 
 
+def count_correct(answers: list[int], questions: list[QuizQuestion]) -> int:
+    """
+    Count answers matching their question's correct index.
+    
+    Answers beyond the last question are ignored. The comparison runs in
+    map/sum rather than a Python-level loop.
+    """
+    return sum(map(eq, answers, [q.correct_index for q in questions]))
+
+
 @dataclass
 class Quiz:
     """Model representing a quiz."""
@@ -71,6 +83,11 @@ class Quiz:
             created_at=datetime.utcnow()
         )
     
+    @cached_property
+    def option_counts(self) -> tuple[int, ...]:
+        """Number of options per question, computed once per quiz."""
+        return tuple(len(q.options) for q in self.questions)
+    
     def to_dict(self) -> dict:
         """Convert quiz to dictionary representation."""
         return {
@@ -115,10 +132,12 @@ class QuizResult:
     total_questions: int
     correct_count: int
     completed_at: datetime = field(default_factory=datetime.utcnow)
+    topic: Optional[str] = None  # Copied from the quiz so results stand alone
     
     @classmethod
     def create(cls, quiz_id: str, user_id: str, answers: list[int],
-               questions: list[QuizQuestion]) -> "QuizResult":
+               questions: list[QuizQuestion],
+               topic: Optional[str] = None) -> "QuizResult":
         """
         Create a new QuizResult by calculating score from answers.
         
@@ -127,13 +146,10 @@ class QuizResult:
             user_id: ID of the user.
             answers: List of answer indices submitted by user.
             questions: List of quiz questions for score calculation.
+            topic: Topic of the quiz, if any.
         """
         total = len(questions)
-        correct = 0
-        
-        for i, answer in enumerate(answers):
-            if i < len(questions) and answer == questions[i].correct_index:
-                correct += 1
+        correct = count_correct(answers, questions)
         
         score = (correct / total) if total > 0 else 0.0
         
@@ -145,7 +161,8 @@ class QuizResult:
             score=score,
             total_questions=total,
             correct_count=correct,
-            completed_at=datetime.utcnow()
+            completed_at=datetime.utcnow(),
+            topic=topic
         )
     
     def to_dict(self) -> dict:
@@ -158,7 +175,8 @@ class QuizResult:
             "score": self.score,
             "totalQuestions": self.total_questions,
             "correctCount": self.correct_count,
-            "completedAt": self.completed_at.isoformat() if self.completed_at else None
+            "completedAt": self.completed_at.isoformat() if self.completed_at else None,
+            "topic": self.topic
         }
     
     @classmethod
@@ -176,5 +194,6 @@ class QuizResult:
             score=data["score"],
             total_questions=data.get("totalQuestions", data.get("total_questions")),
             correct_count=data.get("correctCount", data.get("correct_count")),
-            completed_at=completed_at
+            completed_at=completed_at,
+            topic=data.get("topic")
         )
@@ -23,8 +23,16 @@ class QuizResult(db.Model):
     score = db.Column(db.Integer, nullable=False)
     total_questions = db.Column(db.Integer, nullable=False)
     answers_json = db.Column(db.Text, nullable=True)  # JSON object
+    success_rate = db.Column(db.Float, nullable=True)  # Percentage, stored at write time
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    # Recent activity (ORDER BY created_at DESC LIMIT) and per-topic GROUP BY
+    # in get_progress both filter by user_id first
+    __table_args__ = (
+        db.Index('ix_quiz_results_user_created', user_id, created_at),
+        db.Index('ix_quiz_results_user_topic', user_id, topic),
+    )
+    
     def __repr__(self):
         return f'<QuizResult {self.id}: {self.score}/{self.total_questions}>'
     
@@ -40,7 +48,9 @@ class QuizResult(db.Model):
     
     @property
     def percentage(self) -> float:
-        """Calculate the percentage score."""
+        """Get the stored percentage score, calculating it if not yet stored."""
+        if self.success_rate is not None:
+            return self.success_rate
         if self.total_questions == 0:
             return 0.0
         return round((self.score / self.total_questions) * 100, 1)
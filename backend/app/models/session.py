@@ -3,6 +3,7 @@ Session model for database persistence.
 
 Defines the Session table with SQLAlchemy ORM for storing user authentication sessions.
 """
+import secrets
 import uuid
 from datetime import datetime, timedelta
 
@@ -42,7 +43,7 @@ class Session(db.Model):
         """
         return cls(
             user_id=user_id,
-            token=str(uuid.uuid4()),
+            token=secrets.token_urlsafe(18),
             expires_at=datetime.utcnow() + timedelta(hours=duration_hours)
         )
     
@@ -23,6 +23,16 @@ class User(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     last_login = db.Column(db.DateTime, default=datetime.utcnow)
     
+    # Trigram indexes let search_users' ILIKE '%query%' use an index instead
+    # of scanning every user. Postgres only (needs pg_trgm); other databases
+    # skip them.
+    __table_args__ = (
+        db.Index('ix_users_name_trgm', 'name', postgresql_using='gin',
+                 postgresql_ops={'name': 'gin_trgm_ops'}).ddl_if(dialect='postgresql'),
+        db.Index('ix_users_email_trgm', 'email', postgresql_using='gin',
+                 postgresql_ops={'email': 'gin_trgm_ops'}).ddl_if(dialect='postgresql'),
+    )
+    
     # Relationships
     sessions = db.relationship('Session', backref='user', lazy='dynamic', cascade='all, delete-orphan')
     contents = db.relationship('Content', backref='user', lazy='dynamic', cascade='all, delete-orphan')
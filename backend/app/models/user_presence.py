@@ -3,7 +3,7 @@ UserPresence model for tracking online status.
 """
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime, ForeignKey, Boolean
+from sqlalchemy import Column, String, DateTime, ForeignKey, Boolean, Index
 from app.database import db
 
 
@@ -18,14 +18,33 @@ class UserPresence(db.Model):
     socket_id = Column(String(255), nullable=True)
     current_status = Column(String(50), default='available')  # 'available', 'busy', 'away', 'in_call'
     
+    # user_id alone is covered by its unique constraint; this composite lets
+    # "which of these users are online, on which socket" be answered from
+    # the index without reading the table
+    __table_args__ = (
+        Index('ix_user_presence_user_online', 'user_id', 'is_online', 'socket_id'),
+    )
+    
     # Relationships
     user = db.relationship('User', foreign_keys=[user_id], backref='presence')
     
     def to_dict(self):
         """Convert presence to dictionary."""
+        return UserPresence.build_dict(
+            self.user_id, self.is_online, self.last_seen, self.current_status
+        )
+    
+    @staticmethod
+    def build_dict(user_id, is_online=False, last_seen=None, current_status=None) -> dict:
+        """
+        Build a presence dictionary from column values.
+        
+        Missing values (no presence row, e.g. from an outer join) describe
+        a user who is offline and available.
+        """
         return {
-            'userId': self.user_id,
-            'isOnline': self.is_online,
-            'lastSeen': self.last_seen.isoformat() if self.last_seen else None,
-            'status': self.current_status
+            'userId': user_id,
+            'isOnline': bool(is_online),
+            'lastSeen': last_seen.isoformat() if last_seen else None,
+            'status': current_status or 'available'
         }
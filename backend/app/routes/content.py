@@ -1,4 +1,5 @@
 """Content routes for file uploads and content management."""
+from datetime import datetime
 from flask import Blueprint, request, jsonify
 from app.services.content_service import content_service
 from app.services.auth_service import auth_service
@@ -42,9 +43,11 @@ def upload_content():
     
     Request:
         - multipart/form-data with 'file' field
+        - optional 'processAsync' field ('true' to process in the background)
     
     Returns:
         - 201: Content uploaded and processed successfully
+        - 202: Content uploaded, processing queued (processAsync)
         - 400: Invalid file type or missing file
         - 401: Not authenticated
         - 413: File too large
@@ -69,21 +72,31 @@ def upload_content():
         return jsonify({'error': error}), 400
     
     try:
-        # Read file data
-        file_data = file.read()
-        
-        # Upload content
+        # Upload content, streaming the file to disk in chunks
         content, error = content_service.upload_content(
             user_id=user_id,
             filename=file.filename,
-            file_data=file_data
+            file_data=file.stream,
+            file_type=file_type
         )
         
         if error:
             return jsonify({'error': error}), 400
         
-        # Process content through ContentAgent
-        processed_content, process_error = content_service.process_content(content.id)
+        if request.form.get('processAsync', '').lower() == 'true':
+            # Return straight away; clients poll processingStatus via /list or /<id>
+            content_service.process_content_async(content.id)
+            return jsonify({
+                'contentId': content.id,
+                'filename': content.filename,
+                'fileType': content.content_type,
+                'processingStatus': 'pending'
+            }), 202
+        
+        # Process content through ContentAgent, reading from the upload itself
+        processed_content, process_error = content_service.process_content(
+            content.id, file_data=file.stream
+        )
         
         if process_error:
             # Content uploaded but processing failed
@@ -108,25 +121,114 @@ def upload_content():
         return jsonify({'error': f'Failed to upload file: {str(e)}'}), 500
 
 
+@content_bp.route('/upload/batch', methods=['POST'])
+@require_auth
+@db_error_handler
+def upload_content_batch():
+    """
+    Upload several files (videos or PDFs) at once.
+    
+    Headers:
+        - Authorization: Bearer <token>
+    
+    Request:
+        - multipart/form-data with one or more 'files' fields
+    
+    Returns:
+        - 201: Content uploaded and processed
+        - 400: Invalid file type or no files
+        - 401: Not authenticated
+    """
+    user = request.current_user
+    user_id = user.id
+    
+    files = [file for file in request.files.getlist('files') if file.filename]
+    
+    if not files:
+        return jsonify({'error': 'No files provided'}), 400
+    
+    contents, error = content_service.bulk_upload_content(
+        user_id=user_id,
+        files=[(file.filename, file.stream) for file in files]
+    )
+    
+    if error:
+        return jsonify({'error': error}), 400
+    
+    processed = content_service.process_contents(
+        contents, file_data=[file.stream for file in files]
+    )
+    
+    results = []
+    for content, (processed_content, process_error) in zip(contents, processed):
+        if process_error:
+            results.append({
+                'contentId': content.id,
+                'filename': content.filename,
+                'fileType': content.content_type,
+                'warning': f'File uploaded but processing failed: {process_error}',
+                'summary': '',
+                'keyPoints': []
+            })
+            continue
+        
+        results.append({
+            'contentId': processed_content.id,
+            'filename': processed_content.filename,
+            'fileType': processed_content.content_type,
+            'summary': processed_content.summary,
+            'keyPoints': processed_content.key_points
+        })
+    
+    return jsonify({'contents': results}), 201
+
+
 @content_bp.route('/list', methods=['GET'])
 @require_auth
 @db_error_handler
 def list_contents():
     """
-    List all content for the current user.
+    List content for the current user, newest first.
     
     Headers:
         - Authorization: Bearer <token>
     
+    Query params:
+        - limit: Maximum items per page (default: all)
+        - beforeCreatedAt: Cursor timestamp of the last item already loaded
+        - beforeId: Cursor ID of the last item already loaded
+    
     Returns:
-        - 200: List of user's content
+        - 200: List of user's content and the cursor for the next page
+        - 400: Validation error
         - 401: Not authenticated
     """
     # Get user from request context (set by require_auth decorator)
     user = request.current_user
     user_id = user.id
+    limit = request.args.get('limit', type=int)
+    before_created_at = request.args.get('beforeCreatedAt')
+    before_id = request.args.get('beforeId')
     
-    contents = content_service.get_user_content(user_id)
+    if limit is not None and limit < 1:
+        return jsonify({'error': 'limit must be at least 1'}), 400
+    
+    if bool(before_created_at) != bool(before_id):
+        return jsonify({'error': 'beforeCreatedAt and beforeId must be provided together'}), 400
+    
+    before = None
+    if before_created_at:
+        try:
+            before = (datetime.fromisoformat(before_created_at), before_id)
+        except ValueError:
+            return jsonify({'error': 'Invalid beforeCreatedAt cursor'}), 400
+    
+    contents = content_service.get_user_content(user_id, limit, before)
+    
+    next_cursor = None
+    if limit is not None and len(contents) == limit:
+        last = contents[-1]
+        next_cursor = {'beforeCreatedAt': last.created_at.isoformat(), 'beforeId': last.id}
     
     return jsonify({
         'contents': [
@@ -142,7 +244,8 @@ def list_contents():
                 'createdAt': c.created_at.isoformat() if c.created_at else None
             }
             for c in contents
-        ]
+        ],
+        'nextCursor': next_cursor
     }), 200
 
 
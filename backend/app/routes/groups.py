@@ -1,4 +1,5 @@
 """Groups API routes for managing group learning sessions."""
+from datetime import datetime
 from flask import Blueprint, request, jsonify
 from app.services.group_service import group_service
 from app.routes.auth import require_auth
@@ -236,28 +237,48 @@ def get_pending_invitations():
 @require_auth
 def get_group_messages(group_id):
     """
-    Get messages for a group with pagination.
+    Get messages for a group with keyset pagination.
     
     Query params:
         - limit: Maximum messages (default 50)
-        - offset: Number to skip (default 0)
+        - beforeCreatedAt: Cursor timestamp of the oldest message already loaded
+        - beforeId: Cursor ID of the oldest message already loaded
     
     Returns:
-        - 200: List of messages
-        - 400: Not a member
+        - 200: List of messages and the cursor for the next (older) page
+        - 400: Not a member or invalid cursor
         - 404: Group not found
     """
     user = request.current_user
     limit = request.args.get('limit', 50, type=int)
-    offset = request.args.get('offset', 0, type=int)
+    before_created_at = request.args.get('beforeCreatedAt')
+    before_id = request.args.get('beforeId')
+    
+    if limit < 1:
+        return jsonify({'error': 'limit must be at least 1'}), 400
+    
+    if bool(before_created_at) != bool(before_id):
+        return jsonify({'error': 'beforeCreatedAt and beforeId must be provided together'}), 400
     
-    messages, error = group_service.get_group_messages(group_id, user.id, limit, offset)
+    before = None
+    if before_created_at:
+        try:
+            before = (datetime.fromisoformat(before_created_at), before_id)
+        except ValueError:
+            return jsonify({'error': 'Invalid beforeCreatedAt cursor'}), 400
+    
+    messages, error = group_service.get_group_messages(group_id, user.id, limit, before)
     
     if error:
         status_code = 404 if 'not found' in error.lower() else 400
         return jsonify({'error': error}), status_code
     
-    return jsonify({'messages': messages}), 200
+    next_cursor = None
+    if len(messages) == limit:
+        oldest = messages[0]
+        next_cursor = {'beforeCreatedAt': oldest['createdAt'], 'beforeId': oldest['id']}
+    
+    return jsonify({'messages': messages, 'nextCursor': next_cursor}), 200
 
 
 @groups_bp.route('/<group_id>/messages', methods=['POST'])
@@ -1,5 +1,5 @@
 """Progress routes for user learning progress tracking."""
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response, current_app, stream_with_context
 from app.services.progress_service import progress_service
 from app.routes.auth import require_auth
 from app.errors import db_error_handler
@@ -7,6 +7,19 @@ from app.errors import db_error_handler
 progress_bp = Blueprint('progress', __name__)
 
 
+def _quiz_result_dict(result) -> dict:
+    """Serialize a quiz result for the /results response."""
+    return {
+        'id': result.id,
+        'quizId': result.quiz_id,
+        'topic': result.topic,
+        'score': result.score,
+        'totalQuestions': result.total_questions,
+        'percentage': result.percentage,
+        'createdAt': result.created_at.isoformat() if result.created_at else None
+    }
+
+
 @progress_bp.route('', methods=['GET'])
 @require_auth
 @db_error_handler
@@ -31,18 +44,7 @@ def get_progress():
     progress = progress_service.get_progress(user_id)
     
     # Categorize topics for frontend display
-    topics_mastered = []
-    topics_needing_work = []
-    topics_in_progress = []
-    
-    for topic, data in progress.get('topicProgress', {}).items():
-        percentage = data.get('percentage', 0)
-        if percentage >= 80.0:
-            topics_mastered.append(topic)
-        elif percentage < 50.0:
-            topics_needing_work.append(topic)
-        else:
-            topics_in_progress.append(topic)
+    buckets = progress_service.categorize_topics(progress.get('topicProgress', {}))
     
     return jsonify({
         'progressData': {
@@ -52,9 +54,9 @@ def get_progress():
             'successRate': progress.get('successRate', 0.0),
             'topicProgress': progress.get('topicProgress', {}),
             'recentActivity': progress.get('recentActivity', []),
-            'topicsMastered': topics_mastered,
-            'topicsNeedingWork': topics_needing_work,
-            'topicsInProgress': topics_in_progress
+            'topicsMastered': buckets['mastered'],
+            'topicsNeedingWork': buckets['needs_work'],
+            'topicsInProgress': buckets['in_progress']
         }
     }), 200
 
@@ -64,26 +66,46 @@ def get_progress():
 @db_error_handler
 def get_quiz_results():
     """
-    Get all quiz results for the current user.
+    Get quiz results for the current user, newest first.
     
+    Query params:
+        - limit: Maximum results per page (default: all)
+        - offset: Number of newest results to skip (default 0)
+        
     Returns:
         - 200: List of quiz results
+        - 400: Validation error
         - 401: Unauthorized
     """
     user_id = request.current_user.id
+    limit = request.args.get('limit', type=int)
+    offset = request.args.get('offset', 0, type=int)
+    
+    if limit is not None and limit < 1:
+        return jsonify({'error': 'limit must be at least 1'}), 400
+    
+    if offset < 0:
+        return jsonify({'error': 'offset must not be negative'}), 400
+    
+    if limit is None and not offset:
+        # Full history: encode rows as they are fetched, so neither the rows
+        # nor the JSON document are ever held in memory in full
+        results = progress_service.iter_quiz_results(user_id)
+        
+        def generate():
+            yield '{"results": ['
+            for index, result in enumerate(results):
+                if index:
+                    yield ','
+                yield current_app.json.dumps(_quiz_result_dict(result))
+            yield ']}'
+        
+        return Response(stream_with_context(generate()), mimetype='application/json')
     
-    results = progress_service.get_quiz_results(user_id)
+    results = progress_service.get_quiz_results(user_id, limit, offset)
     
     return jsonify({
-        'results': [{
-            'id': r.id,
-            'quizId': r.quiz_id,
-            'topic': r.topic,
-            'score': r.score,
-            'totalQuestions': r.total_questions,
-            'percentage': r.percentage,
-            'createdAt': r.created_at.isoformat() if r.created_at else None
-        } for r in results]
+        'results': [_quiz_result_dict(r) for r in results]
     }), 200
 
 
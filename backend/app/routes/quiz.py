@@ -154,7 +154,7 @@ def submit_quiz():
     progress_service.record_quiz_result(
         user_id=user_id,
         quiz_id=quiz_id,
-        topic=quiz.topic,
+        topic=result.topic,
         score=result.correct_count,
         total_questions=result.total_questions,
         answers=answers_dict
@@ -3,6 +3,8 @@ Authentication service for user management with database persistence.
 
 Uses SQLAlchemy ORM for storing users and sessions in the database.
 """
+import queue
+import threading
 import bcrypt
 from datetime import datetime
 from typing import Optional, Tuple
@@ -12,9 +14,51 @@ from app.models.user import User
 from app.models.session import Session
 
 
+# Pre-generated bcrypt salts kept ready for registrations
+SALT_POOL_SIZE = 1024
+SALT_POOL_LOW_WATER = 256
+
+
 class AuthService:
     """Service for handling user authentication operations with database persistence."""
     
+    def __init__(self):
+        self._salt_queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._salt_refill_lock = threading.Lock()
+        self._salt_refilling = False
+    
+    def _refill_salts(self) -> None:
+        """Top the salt pool back up to SALT_POOL_SIZE."""
+        try:
+            while self._salt_queue.qsize() < SALT_POOL_SIZE:
+                self._salt_queue.put(bcrypt.gensalt())
+        finally:
+            with self._salt_refill_lock:
+                self._salt_refilling = False
+    
+    def _next_salt(self) -> bytes:
+        """
+        Take a bcrypt salt from the pool.
+        
+        Salts still come from bcrypt.gensalt() and each is used once; the
+        pool only moves the generation off the request path. Falls back to
+        generating a salt inline when the pool is empty, and starts a
+        background refill once the pool drops below SALT_POOL_LOW_WATER.
+        """
+        try:
+            salt = self._salt_queue.get_nowait()
+        except queue.Empty:
+            salt = bcrypt.gensalt()
+        
+        if self._salt_queue.qsize() < SALT_POOL_LOW_WATER:
+            with self._salt_refill_lock:
+                start_refill = not self._salt_refilling
+                self._salt_refilling = True
+            if start_refill:
+                threading.Thread(target=self._refill_salts, daemon=True).start()
+        
+        return salt
+    
     def register(self, email: str, password: str, name: str) -> Tuple[Optional[dict], Optional[str]]:
         """
         Register a new user with database persistence.
@@ -45,7 +89,7 @@ class AuthService:
             return None, "An account with this email already exists"
         
         # Hash password
-        password_hash = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        password_hash = bcrypt.hashpw(password.encode('utf-8'), self._next_salt()).decode('utf-8')
         
         # Create user
         user = User(
@@ -0,0 +1,119 @@
+"""
+In-process cache-aside store for hot, rarely changing reads.
+
+Services cache serialized results under string keys with a TTL and drop the
+affected keys whenever they write. Values are deep-copied on the way in and
+out so callers can never mutate a cached entry.
+
+LRUCache is a size-bounded variant for large, immutable values that are
+too costly to copy (e.g. embedding vectors).
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+class TTLCache:
+    """Thread-safe key/value cache whose entries expire after a TTL."""
+    
+    def __init__(self):
+        # key -> (expires_at, value)
+        self._entries: Dict[str, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+    
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Get a cached value.
+        
+        Args:
+            key: Cache key
+            
+        Returns:
+            A copy of the cached value, or None if missing or expired
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._entries[key]
+                return None
+        return copy.deepcopy(entry[1])
+    
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        """
+        Cache a value.
+        
+        Args:
+            key: Cache key
+            value: Value to store (copied)
+            ttl: Seconds until the entry expires
+        """
+        entry = (time.monotonic() + ttl, copy.deepcopy(value))
+        with self._lock:
+            self._entries[key] = entry
+    
+    def invalidate(self, *keys: str) -> None:
+        """Drop the given keys."""
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+
+
+class LRUCache:
+    """
+    Thread-safe, size-bounded cache that evicts the least recently used key.
+    
+    Unlike TTLCache, values are stored and returned as-is, so only cache
+    immutable values (e.g. tuples).
+    """
+    
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Get a cached value and mark it as recently used.
+        
+        Args:
+            key: Cache key
+            
+        Returns:
+            The cached value, or None if missing
+        """
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+    
+    def set(self, key: Hashable, value: Any) -> None:
+        """
+        Cache a value, evicting the least recently used one if full.
+        
+        Args:
+            key: Cache key
+            value: Value to store (not copied)
+        """
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+    
+    def clear(self) -> None:
+        """Drop every entry."""
+        with self._lock:
+            self._entries.clear()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Singleton instance
+cache = TTLCache()
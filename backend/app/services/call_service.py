@@ -1,18 +1,84 @@
 """
 Call service for managing voice and video calls.
 """
+import threading
 from datetime import datetime
 from typing import List, Optional, Tuple
+from sqlalchemy import bindparam, exists, select, update
 from app.database import db
 from app.models.call import Call, CallParticipant
 from app.models.direct_chat import DirectChat
 from app.models.group_learning import GroupLearning
 from app.models.group_member import GroupMember
+from app.services.cache import cache
+
+
+# Statements shared by every call lookup; built once at import so hot paths
+# only bind parameters instead of rebuilding ORM queries per request
+_GET_CALL = select(Call).where(Call.id == bindparam('call_id'))
+_GET_PARTICIPANT = select(CallParticipant).where(
+    CallParticipant.call_id == bindparam('call_id'),
+    CallParticipant.user_id == bindparam('user_id')
+)
+_GET_JOINED_PARTICIPANT = _GET_PARTICIPANT.where(CallParticipant.status == 'joined')
+_IS_PARTICIPANT = select(
+    exists().where(
+        CallParticipant.call_id == bindparam('call_id'),
+        CallParticipant.user_id == bindparam('user_id')
+    )
+)
+_CALL_USER_IDS = select(CallParticipant.user_id).where(
+    CallParticipant.call_id.in_(bindparam('call_ids', expanding=True))
+)
+
+# Seconds a cached get_active_call result stays valid. A call's participants
+# also have their entries dropped whenever it changes state, so this only
+# bounds staleness from writes made outside this service.
+ACTIVE_CALL_CACHE_TTL = 5
+
+
+def _active_call_key(user_id: str) -> str:
+    """Cache key for a user's get_active_call result."""
+    return f"active_call:{user_id}"
 
 
 class CallService:
     """Service for managing voice and video calls."""
     
+    def __init__(self):
+        # Bumped on every invalidation, so a lookup that raced with a state
+        # change can tell its result may be stale and skip caching it
+        self._active_call_generation = 0
+        self._active_call_lock = threading.Lock()
+    
+    def _commit(self, *call_ids: str) -> None:
+        """
+        Commit a call state change and drop the participants' cached active-call lookups.
+        
+        Args:
+            *call_ids: IDs of the calls that changed
+        """
+        user_ids = db.session.execute(
+            _CALL_USER_IDS, {'call_ids': list(call_ids)}
+        ).scalars().all()
+        db.session.commit()
+        with self._active_call_lock:
+            self._active_call_generation += 1
+            cache.invalidate(*(_active_call_key(user_id) for user_id in user_ids))
+    
+    def _get_call(self, call_id: str) -> Optional[Call]:
+        """Load a call by ID."""
+        return db.session.execute(_GET_CALL, {'call_id': call_id}).scalar_one_or_none()
+    
+    def _get_participant(self, call_id: str, user_id: str, joined_only: bool = False) -> Optional[CallParticipant]:
+        """Load a user's participant row for a call."""
+        stmt = _GET_JOINED_PARTICIPANT if joined_only else _GET_PARTICIPANT
+        return db.session.execute(stmt, {'call_id': call_id, 'user_id': user_id}).scalar_one_or_none()
+    
+    def _is_participant(self, call_id: str, user_id: str) -> bool:
+        """Check call membership without loading the participant row."""
+        return db.session.execute(_IS_PARTICIPANT, {'call_id': call_id, 'user_id': user_id}).scalar()
+    
     def initiate_call(
         self, 
         initiator_id: str, 
@@ -135,7 +201,7 @@ class CallService:
                 print(f"Cleaning up stale call {existing_call.id}: reason={cleanup_reason}, age={call_age}")
                 existing_call.status = 'ended' if cleanup_reason == 'stale' else 'missed'
                 existing_call.ended_at = now
-                db.session.commit()
+                self._commit(existing_call.id)
             else:
                 # Call is legitimately active
                 return None, "There is already an active call in this context"
@@ -149,28 +215,18 @@ class CallService:
             status='ringing'
         )
         
-        db.session.add(call)
-        db.session.flush()  # Get the call ID
-        
-        # Add initiator as participant (already joined)
-        initiator_participant = CallParticipant(
-            call_id=call.id,
-            user_id=initiator_id,
-            status='joined',
-            joined_at=datetime.utcnow()
-        )
-        db.session.add(initiator_participant)
-        
-        # Add other participants as invited
-        for participant_id in participant_ids:
-            participant = CallParticipant(
-                call_id=call.id,
-                user_id=participant_id,
-                status='ringing'
-            )
-            db.session.add(participant)
+        # Initiator is already joined; everyone else starts ringing
+        now = datetime.utcnow()
+        participants = [
+            CallParticipant(call_id=call.id, user_id=initiator_id, status='joined', joined_at=now)
+        ] + [
+            CallParticipant(call_id=call.id, user_id=participant_id, status='ringing')
+            for participant_id in participant_ids
+        ]
         
-        db.session.commit()
+        db.session.add(call)
+        db.session.add_all(participants)
+        self._commit(call.id)
         
         return call, None
     
@@ -185,7 +241,7 @@ class CallService:
         Returns:
             Tuple of (CallParticipant, error_message)
         """
-        call = Call.query.get(call_id)
+        call = self._get_call(call_id)
         
         if not call:
             return None, "Call not found"
@@ -194,10 +250,7 @@ class CallService:
             return None, "Call is no longer available"
         
         # Find participant record
-        participant = CallParticipant.query.filter_by(
-            call_id=call_id,
-            user_id=user_id
-        ).first()
+        participant = self._get_participant(call_id, user_id)
         
         if not participant:
             return None, "Not invited to this call"
@@ -217,7 +270,7 @@ class CallService:
             call.status = 'active'
             call.started_at = datetime.utcnow()
         
-        db.session.commit()
+        self._commit(call_id)
         
         return participant, None
     
@@ -232,33 +285,35 @@ class CallService:
         Returns:
             Tuple of (success, error_message)
         """
-        call = Call.query.get(call_id)
-        
-        if not call:
-            return False, "Call not found"
-        
-        participant = CallParticipant.query.filter_by(
-            call_id=call_id,
-            user_id=user_id
-        ).first()
+        now = datetime.utcnow()
         
-        if not participant:
+        left = db.session.execute(
+            update(CallParticipant)
+            .where(CallParticipant.call_id == call_id, CallParticipant.user_id == user_id)
+            .values(status='left', left_at=now)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        
+        if not left:
+            db.session.rollback()
+            if not db.session.query(exists().where(Call.id == call_id)).scalar():
+                return False, "Call not found"
             return False, "Not a participant in this call"
         
-        participant.status = 'left'
-        participant.left_at = datetime.utcnow()
-        
-        # Check if call should end (no more active participants)
-        active_participants = CallParticipant.query.filter_by(
-            call_id=call_id,
-            status='joined'
-        ).count()
-        
-        if active_participants == 0:
-            call.status = 'ended'
-            call.ended_at = datetime.utcnow()
+        # End the call only if nobody is still joined; evaluated atomically so
+        # two simultaneous leavers can't both miss (or both perform) the end
+        still_joined = exists().where(
+            CallParticipant.call_id == call_id,
+            CallParticipant.status == 'joined'
+        )
+        db.session.execute(
+            update(Call)
+            .where(Call.id == call_id, ~still_joined)
+            .values(status='ended', ended_at=now)
+            .execution_options(synchronize_session=False)
+        )
         
-        db.session.commit()
+        self._commit(call_id)
         
         return True, None
     
@@ -273,15 +328,12 @@ class CallService:
         Returns:
             Tuple of (success, error_message, call_ended)
         """
-        call = Call.query.get(call_id)
+        call = self._get_call(call_id)
         
         if not call:
             return False, "Call not found", False
         
-        participant = CallParticipant.query.filter_by(
-            call_id=call_id,
-            user_id=user_id
-        ).first()
+        participant = self._get_participant(call_id, user_id)
         
         if not participant:
             return False, "Not invited to this call", False
@@ -323,7 +375,7 @@ class CallService:
                     call.ended_at = datetime.utcnow()
                     call_ended = True
         
-        db.session.commit()
+        self._commit(call_id)
         
         return True, None, call_ended
     
@@ -338,18 +390,13 @@ class CallService:
         Returns:
             Tuple of (success, error_message)
         """
-        call = Call.query.get(call_id)
+        call = self._get_call(call_id)
         
         if not call:
             return False, "Call not found"
         
         # Verify user is a participant
-        participant = CallParticipant.query.filter_by(
-            call_id=call_id,
-            user_id=user_id
-        ).first()
-        
-        if not participant:
+        if not self._is_participant(call_id, user_id):
             return False, "Not a participant in this call"
         
         if call.status == 'ended':
@@ -364,7 +411,7 @@ class CallService:
             CallParticipant.status == 'joined'
         ).update({'status': 'left', 'left_at': datetime.utcnow()})
         
-        db.session.commit()
+        self._commit(call_id)
         
         return True, None
     
@@ -389,11 +436,7 @@ class CallService:
         Returns:
             Tuple of (CallParticipant, error_message)
         """
-        participant = CallParticipant.query.filter_by(
-            call_id=call_id,
-            user_id=user_id,
-            status='joined'
-        ).first()
+        participant = self._get_participant(call_id, user_id, joined_only=True)
         
         if not participant:
             return None, "Not an active participant in this call"
@@ -405,7 +448,7 @@ class CallService:
         if is_screen_sharing is not None:
             participant.is_screen_sharing = is_screen_sharing
         
-        db.session.commit()
+        self._commit(call_id)
         
         return participant, None
     
@@ -420,18 +463,13 @@ class CallService:
         Returns:
             Tuple of (call dict, error_message)
         """
-        call = Call.query.get(call_id)
+        call = self._get_call(call_id)
         
         if not call:
             return None, "Call not found"
         
         # Verify user is a participant
-        participant = CallParticipant.query.filter_by(
-            call_id=call_id,
-            user_id=user_id
-        ).first()
-        
-        if not participant:
+        if not self._is_participant(call_id, user_id):
             return None, "Not a participant in this call"
         
         return call.to_dict(include_participants=True), None
@@ -446,19 +484,37 @@ class CallService:
         Returns:
             Call dict or None
         """
+        cached = cache.get(_active_call_key(user_id))
+        if cached is not None:
+            started_at, result = cached
+            # Duration keeps ticking while the call is cached
+            if result is not None and started_at:
+                result['duration'] = int((datetime.utcnow() - started_at).total_seconds())
+            return result
+        
+        with self._active_call_lock:
+            generation = self._active_call_generation
+        
+        result = None
+        started_at = None
+        
         participant = CallParticipant.query.filter_by(
             user_id=user_id,
             status='joined'
         ).first()
         
-        if not participant:
-            return None
+        if participant:
+            call = self._get_call(participant.call_id)
+            if call and call.status == 'active':
+                result = call.to_dict(include_participants=True)
+                started_at = call.started_at
         
-        call = Call.query.get(participant.call_id)
-        if call and call.status == 'active':
-            return call.to_dict(include_participants=True)
+        with self._active_call_lock:
+            # A call changed while we were reading, so the result may predate it
+            if generation == self._active_call_generation:
+                cache.set(_active_call_key(user_id), (started_at, result), ACTIVE_CALL_CACHE_TTL)
         
-        return None
+        return result
     
     def get_incoming_calls(self, user_id: str) -> List[dict]:
         """
@@ -477,7 +533,7 @@ class CallService:
         
         calls = []
         for participant in participants:
-            call = Call.query.get(participant.call_id)
+            call = self._get_call(participant.call_id)
             if call and call.status == 'ringing':
                 calls.append(call.to_dict(include_participants=True))
         
@@ -493,7 +549,7 @@ class CallService:
         Returns:
             Tuple of (success, error_message)
         """
-        call = Call.query.get(call_id)
+        call = self._get_call(call_id)
         
         if not call:
             return False, "Call not found"
@@ -504,7 +560,7 @@ class CallService:
         call.status = 'missed'
         call.ended_at = datetime.utcnow()
         
-        db.session.commit()
+        self._commit(call_id)
         
         return True, None
     
@@ -520,7 +576,7 @@ class CallService:
         Returns:
             Tuple of (success, error_message)
         """
-        call = Call.query.get(call_id)
+        call = self._get_call(call_id)
         
         if not call:
             return False, "Call not found"
@@ -539,7 +595,7 @@ class CallService:
             if joined_count == 0:
                 call.status = 'missed'
                 call.ended_at = datetime.utcnow()
-                db.session.commit()
+                self._commit(call_id)
                 return True, None
         
         # If call is active, just mark remaining ringing participants as missed
@@ -549,7 +605,7 @@ class CallService:
                 CallParticipant.call_id == call_id,
                 CallParticipant.status == 'ringing'
             ).update({'status': 'missed'})
-            db.session.commit()
+            self._commit(call_id)
         
         return True, None
     
@@ -610,7 +666,7 @@ class CallService:
             print(f"Cleaned up stale call {call.id} in {context_type}:{context_id}")
         
         if cleaned_count > 0:
-            db.session.commit()
+            self._commit(*(call.id for call in stale_calls))
         
         return cleaned_count
 
@@ -3,11 +3,58 @@ Chat service for managing direct messages between friends.
 """
 from datetime import datetime
 from typing import List, Optional, Tuple
-from sqlalchemy import or_, and_
+from sqlalchemy import or_, tuple_, update, insert, select, func, case, exists, literal, table, column, JSON
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
 from app.database import db
 from app.models.direct_chat import DirectChat
-from app.models.message import DirectMessage
+from app.models.message import DirectMessage, MessageRead
 from app.models.friend import Friend
+from app.models.call import Call
+
+
+def _insert_ignoring_duplicates(model):
+    """
+    Build an INSERT for a model that skips rows clashing with its primary key.
+    
+    Args:
+        model: Model class to insert into
+        
+    Returns:
+        Insert statement for the session's dialect
+        
+    Raises:
+        NotImplementedError: If the dialect has no conflict-ignoring INSERT here
+    """
+    dialect = db.session.get_bind().dialect.name
+    
+    if dialect == 'sqlite':
+        return sqlite_insert(model).on_conflict_do_nothing()
+    
+    if dialect == 'postgresql':
+        return postgresql_insert(model).on_conflict_do_nothing()
+    
+    if dialect == 'mysql':
+        return insert(model).prefix_with('IGNORE')
+    
+    raise NotImplementedError(f"Conflict-ignoring INSERT is not supported on '{dialect}'")
+
+
+def _is_read_by(user_id):
+    """
+    Build a SQL expression testing whether a user has read the current message.
+    
+    Args:
+        user_id: User ID (or column) of the reader
+        
+    Returns:
+        Boolean EXISTS expression, answered from the message_reads primary key
+    """
+    return exists().where(
+        MessageRead.message_id == DirectMessage.id,
+        MessageRead.user_id == user_id
+    )
 
 
 class ChatService:
@@ -35,25 +82,27 @@ class ChatService:
         if not friendship:
             return None, "Users must be friends to chat"
         
-        # Look for existing chat (either direction)
-        chat = DirectChat.query.filter(
-            or_(
-                and_(DirectChat.user1_id == user1_id, DirectChat.user2_id == user2_id),
-                and_(DirectChat.user1_id == user2_id, DirectChat.user2_id == user1_id)
-            )
-        ).first()
+        # Chats are stored with the smaller user ID first
+        lo, hi = sorted([user1_id, user2_id])
+        
+        chat = DirectChat.query.filter_by(user1_id=lo, user2_id=hi).first()
         
         if chat:
             return chat, None
         
         # Create new chat
         chat = DirectChat(
-            user1_id=user1_id,
-            user2_id=user2_id
+            user1_id=lo,
+            user2_id=hi
         )
         
         db.session.add(chat)
-        db.session.commit()
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # Lost a race with a concurrent create for the same pair
+            db.session.rollback()
+            chat = DirectChat.query.filter_by(user1_id=lo, user2_id=hi).first()
         
         return chat, None
     
@@ -86,29 +135,31 @@ class ChatService:
             if last_message:
                 chat_data['lastMessage'] = last_message.to_dict()
             
-            # Count unread messages
-            unread_count = DirectMessage.query.filter(
-                and_(
-                    DirectMessage.chat_id == chat.id,
-                    DirectMessage.sender_id != user_id,
-                    ~DirectMessage.read_by.contains([user_id])
-                )
-            ).count()
-            chat_data['unreadCount'] = unread_count
+            chat_data['unreadCount'] = chat.get_unread_count(user_id)
             
             result.append(chat_data)
         
         return result
     
-    def get_messages(self, chat_id: str, user_id: str, limit: int = 50, offset: int = 0) -> Tuple[List[dict], Optional[str]]:
+    def get_messages(
+        self,
+        chat_id: str,
+        user_id: str,
+        limit: int = 50,
+        before: Optional[Tuple[datetime, str]] = None
+    ) -> Tuple[List[dict], Optional[str]]:
         """
-        Get messages for a chat with pagination.
+        Get messages for a chat with keyset pagination.
+        
+        Pages are anchored on the ``(created_at, id)`` of the oldest message
+        already seen, so fetching older history costs the same at any depth.
         
         Args:
             chat_id: The chat's ID
             user_id: Current user's ID (for authorization)
             limit: Maximum number of messages
-            offset: Number of messages to skip
+            before: Optional ``(created_at, id)`` cursor; only messages older
+                than it are returned
             
         Returns:
             Tuple of (messages list, error_message)
@@ -122,9 +173,16 @@ class ChatService:
         if chat.user1_id != user_id and chat.user2_id != user_id:
             return [], "Not authorized to view this chat"
         
-        messages = DirectMessage.query.filter_by(
-            chat_id=chat_id
-        ).order_by(DirectMessage.created_at.desc()).offset(offset).limit(limit).all()
+        query = DirectMessage.query.filter_by(chat_id=chat_id)
+        
+        if before:
+            query = query.filter(
+                tuple_(DirectMessage.created_at, DirectMessage.id) < tuple_(*before)
+            )
+        
+        messages = query.order_by(
+            DirectMessage.created_at.desc(), DirectMessage.id.desc()
+        ).limit(limit).all()
         
         # Reverse to get chronological order
         messages = list(reversed(messages))
@@ -146,13 +204,34 @@ class ChatService:
         if not content or not content.strip():
             return None, "Message content cannot be empty"
         
-        chat = DirectChat.query.get(chat_id)
+        now = datetime.utcnow()
         
-        if not chat:
-            return None, "Chat not found"
+        # Touch the chat and bump the recipient's unread counter in one UPDATE,
+        # which also checks that the sender is part of the chat
+        touched = db.session.execute(
+            update(DirectChat)
+            .where(
+                DirectChat.id == chat_id,
+                or_(DirectChat.user1_id == sender_id, DirectChat.user2_id == sender_id)
+            )
+            .values(
+                last_message_at=now,
+                user1_unread=case(
+                    (DirectChat.user2_id == sender_id, DirectChat.user1_unread + 1),
+                    else_=DirectChat.user1_unread
+                ),
+                user2_unread=case(
+                    (DirectChat.user1_id == sender_id, DirectChat.user2_unread + 1),
+                    else_=DirectChat.user2_unread
+                )
+            )
+            .execution_options(synchronize_session=False)
+        ).rowcount
         
-        # Verify sender is part of the chat
-        if chat.user1_id != sender_id and chat.user2_id != sender_id:
+        if not touched:
+            db.session.rollback()
+            if not db.session.get(DirectChat, chat_id):
+                return None, "Chat not found"
             return None, "Not authorized to send messages in this chat"
         
         # Create message
@@ -160,12 +239,10 @@ class ChatService:
             chat_id=chat_id,
             sender_id=sender_id,
             content=content.strip(),
-            read_by=[sender_id]  # Sender has read their own message
+            created_at=now,
+            reads=[MessageRead(user_id=sender_id)]  # Sender has read their own message
         )
         
-        # Update chat's last_message_at
-        chat.last_message_at = datetime.utcnow()
-        
         db.session.add(message)
         db.session.commit()
         
@@ -192,34 +269,116 @@ class ChatService:
         if chat.user1_id != user_id and chat.user2_id != user_id:
             return 0, "Not authorized to access this chat"
         
-        # Get messages to mark as read
-        query = DirectMessage.query.filter(
-            and_(
-                DirectMessage.chat_id == chat_id,
-                DirectMessage.sender_id != user_id
-            )
+        # Record a receipt for every unread message in one INSERT ... SELECT
+        unread = select(DirectMessage.id, literal(user_id), literal(datetime.utcnow())).where(
+            DirectMessage.chat_id == chat_id,
+            DirectMessage.sender_id != user_id,
+            ~_is_read_by(user_id)
         )
         
         if message_ids:
-            query = query.filter(DirectMessage.id.in_(message_ids))
+            unread = unread.where(DirectMessage.id.in_(message_ids))
         
-        messages = query.all()
-        updated_count = 0
+        stmt = _insert_ignoring_duplicates(MessageRead).from_select(
+            ['message_id', 'user_id', 'read_at'], unread
+        )
         
-        for message in messages:
-            read_by = list(message.read_by or [])
-            if user_id not in read_by:
-                read_by.append(user_id)
-                message.read_by = read_by
-                # Flag the JSON column as modified for SQLAlchemy
-                from sqlalchemy.orm.attributes import flag_modified
-                flag_modified(message, 'read_by')
-                updated_count += 1
+        updated_count = db.session.execute(stmt).rowcount
         
         if updated_count > 0:
-            db.session.commit()
+            # Keep the denormalized unread counter in step with the receipts
+            counter = DirectChat.user1_unread if chat.user1_id == user_id else DirectChat.user2_unread
+            remaining = 0 if not message_ids else case(
+                (counter > updated_count, counter - updated_count), else_=0
+            )
+            db.session.execute(
+                update(DirectChat)
+                .where(DirectChat.id == chat_id)
+                .values({counter: remaining})
+                .execution_options(synchronize_session=False)
+            )
+        
+        # Commit even when nothing matched so the INSERT's transaction ends
+        db.session.commit()
         
         return updated_count, None
+    
+    def recount_unread(self) -> None:
+        """
+        Recompute every chat's unread counters from the message read receipts.
+        
+        Used to backfill the denormalized counters after they are added to an
+        existing database.
+        """
+        def unread_for(member_id):
+            return select(func.count()).where(
+                DirectMessage.chat_id == DirectChat.id,
+                DirectMessage.sender_id != member_id,
+                ~_is_read_by(member_id)
+            ).scalar_subquery()
+        
+        db.session.execute(
+            update(DirectChat).values(
+                user1_unread=unread_for(DirectChat.user1_id),
+                user2_unread=unread_for(DirectChat.user2_id)
+            ).execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+    
+    def import_legacy_read_by(self) -> None:
+        """
+        Copy read receipts from the legacy direct_messages.read_by JSON column.
+        
+        Receipts used to live in a JSON array on each message; they now live
+        in message_reads. Must run before the legacy column is dropped.
+        """
+        legacy_messages = table('direct_messages', column('id'), column('read_by', JSON))
+        rows = [
+            {'message_id': message_id, 'user_id': reader_id}
+            for message_id, read_by in db.session.execute(select(legacy_messages))
+            for reader_id in set(read_by or [])
+        ]
+        
+        if rows:
+            db.session.execute(_insert_ignoring_duplicates(MessageRead), rows)
+        db.session.commit()
+    
+    def canonicalize_chats(self) -> None:
+        """
+        Rewrite existing chats so user1_id < user2_id.
+        
+        Chats created before the ordering was enforced may be stored either
+        way round, and a pair may have one chat in each direction. Duplicates
+        are folded into the pair's oldest chat. Must run before the unique
+        (user1_id, user2_id) index is created on an existing database.
+        """
+        kept = {}
+        
+        for chat in DirectChat.query.order_by(DirectChat.created_at).all():
+            lo, hi = sorted([chat.user1_id, chat.user2_id])
+            if chat.user1_id != lo:
+                chat.user1_id, chat.user2_id = lo, hi
+                chat.user1_unread, chat.user2_unread = chat.user2_unread, chat.user1_unread
+            
+            original = kept.setdefault((lo, hi), chat)
+            if original is chat:
+                continue
+            
+            # Move the duplicate's history onto the original chat
+            DirectMessage.query.filter_by(chat_id=chat.id).update(
+                {'chat_id': original.id}, synchronize_session=False
+            )
+            Call.query.filter_by(context_type='direct', context_id=chat.id).update(
+                {'context_id': original.id}, synchronize_session=False
+            )
+            original.user1_unread += chat.user1_unread
+            original.user2_unread += chat.user2_unread
+            original.last_message_at = max(
+                filter(None, [original.last_message_at, chat.last_message_at]), default=None
+            )
+            db.session.delete(chat)
+        
+        db.session.commit()
 
 
 # Singleton instance
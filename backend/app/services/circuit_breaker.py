@@ -0,0 +1,120 @@
+"""Circuit breaker for calls to an unreliable upstream service.
+
+After repeated failures the breaker opens and callers fail immediately
+instead of retrying against a service that is down. Once the recovery
+timeout passes a single trial call is let through: success closes the
+breaker again, failure re-opens it.
+"""
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Thread-safe closed/open/half-open circuit breaker.
+    
+    Counts consecutive failures while closed. Reaching failure_threshold
+    opens the circuit for recovery_timeout seconds, during which allow()
+    refuses every call. After that one trial call is allowed through
+    (half-open) and its outcome decides whether the circuit closes again.
+    """
+    
+    def __init__(self, failure_threshold: int = 5, recovery_timeout: float = 30.0):
+        """
+        Initialize the circuit breaker.
+        
+        Args:
+            failure_threshold: Consecutive failures that open the circuit.
+            recovery_timeout: Seconds the circuit stays open before a trial call.
+        """
+        if failure_threshold < 1:
+            raise ValueError("failure_threshold must be at least 1")
+        if recovery_timeout <= 0:
+            raise ValueError("recovery_timeout must be positive")
+        
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        # Whether the single half-open trial call is still in flight
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+    
+    @property
+    def state(self) -> str:
+        """Current state: "closed", "open" or "half_open"."""
+        with self._lock:
+            if self._state == OPEN and self._retry_in(time.monotonic()) <= 0:
+                return HALF_OPEN
+            return self._state
+    
+    def _retry_in(self, now: float) -> float:
+        """Seconds until an open circuit lets a trial call through."""
+        return self._opened_at + self.recovery_timeout - now
+    
+    def allow(self) -> bool:
+        """
+        Check whether a call may be made now.
+        
+        Returns:
+            True if the call may proceed, False if the circuit is open.
+        """
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+            
+            if self._state == OPEN:
+                if self._retry_in(time.monotonic()) > 0:
+                    return False
+                self._state = HALF_OPEN
+                self._trial_in_flight = False
+            
+            # Half-open: only one trial call at a time
+            if self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+    
+    def retry_in(self) -> float:
+        """
+        Seconds until the circuit will let a trial call through.
+        
+        Returns:
+            Remaining open time, or 0.0 if calls may be attempted now.
+        """
+        with self._lock:
+            if self._state != OPEN:
+                return 0.0
+            return max(0.0, self._retry_in(time.monotonic()))
+    
+    def record_success(self) -> None:
+        """Record a successful call, closing the circuit."""
+        with self._lock:
+            if self._state != CLOSED:
+                logger.info("Circuit breaker closed after a successful trial call")
+            self._state = CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+    
+    def record_failure(self) -> None:
+        """Record a failed call, opening the circuit at the threshold."""
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != OPEN:
+                    logger.warning(
+                        f"Circuit breaker opened after {self._failures} failures; "
+                        f"failing fast for {self.recovery_timeout:.0f}s"
+                    )
+                self._state = OPEN
+                self._opened_at = time.monotonic()
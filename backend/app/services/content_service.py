@@ -1,13 +1,216 @@
 """Content service for managing uploaded content with database persistence."""
+import hashlib
+import io
 import os
+import threading
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
-from typing import Optional, List, Tuple
+from typing import BinaryIO, Optional, List, Tuple, Union
+
+from flask import current_app
+from sqlalchemy import insert, inspect, select, tuple_, update
+from sqlalchemy.orm import make_transient_to_detached
 
 from app.database import db
-from app.models.content import Content, get_file_type, is_allowed_file
+from app.models.content import Content, get_file_type
 from app.services.agent_orchestrator import agent_orchestrator
 
 
+# Upload files are written on a small pool so the write overlaps the INSERT
+FILE_WRITE_WORKERS = 4
+_file_writer = ThreadPoolExecutor(max_workers=FILE_WRITE_WORKERS, thread_name_prefix='content-write')
+
+# AI processing takes seconds to minutes, so it can run off the request thread.
+# The work is mostly waiting on the LLM, so several items run at once
+PROCESSING_WORKERS = 8
+_processor = ThreadPoolExecutor(max_workers=PROCESSING_WORKERS, thread_name_prefix='content-process')
+
+
+# Uploads are copied from the request stream in fixed-size chunks so a large
+# video never has to sit in memory in full
+WRITE_CHUNK_SIZE = 4 * 1024 * 1024
+
+FileData = Union[bytes, BinaryIO]
+
+# Each write-pool thread keeps one copy buffer for its lifetime instead of
+# allocating a fresh one per upload
+_write_buffers = threading.local()
+
+
+def _get_write_buffer() -> bytearray:
+    """Get the calling thread's reusable copy buffer."""
+    buffer = getattr(_write_buffers, 'buffer', None)
+    if buffer is None:
+        buffer = _write_buffers.buffer = bytearray(WRITE_CHUNK_SIZE)
+    return buffer
+
+
+def _file_size(file_data: FileData) -> int:
+    """
+    Get the size of upload data without reading it.
+    
+    Args:
+        file_data: Raw file bytes or a seekable binary stream.
+        
+    Returns:
+        Size in bytes.
+    """
+    if isinstance(file_data, (bytes, bytearray, memoryview)):
+        return len(file_data)
+    
+    position = file_data.tell()
+    size = file_data.seek(0, os.SEEK_END) - position
+    file_data.seek(position)
+    return size
+
+
+def _open_for_write(file_path: str) -> BinaryIO:
+    """
+    Open a file for writing, creating its directory the first time it's needed.
+    
+    Trying the open first means the usual case, where the user's upload
+    directory already exists, costs no mkdir call.
+    
+    Args:
+        file_path: Destination path.
+        
+    Returns:
+        Binary file object open for writing.
+    """
+    try:
+        return open(file_path, 'wb')
+    except FileNotFoundError:
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        return open(file_path, 'wb')
+
+
+def _link_blob(blob_path: str, file_path: str) -> bool:
+    """
+    Hardlink an existing blob to an upload path.
+    
+    Args:
+        blob_path: Content-addressed blob path.
+        file_path: Per-upload destination path.
+        
+    Returns:
+        True if the link was made, False if there is no such blob or the
+        filesystem doesn't support hardlinks.
+    """
+    try:
+        os.link(blob_path, file_path)
+    except FileNotFoundError:
+        if not os.path.exists(blob_path):
+            return False
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        os.link(blob_path, file_path)
+    except OSError:
+        return False
+    return True
+
+
+def _publish_blob(temp_path: str, file_path: str, blob_path: str) -> None:
+    """
+    Move a freshly written upload into place and record it as a blob.
+    
+    If another upload stored the same bytes in the meantime, the upload is
+    linked to that blob and the fresh copy is dropped.
+    
+    Args:
+        temp_path: Path the upload was written to.
+        file_path: Per-upload destination path.
+        blob_path: Content-addressed blob path.
+    """
+    try:
+        try:
+            os.link(temp_path, blob_path)
+        except FileNotFoundError:
+            os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+            os.link(temp_path, blob_path)
+    except FileExistsError:
+        if _link_blob(blob_path, file_path):
+            os.remove(temp_path)
+            return
+    except OSError:
+        pass  # No hardlink support; keep a plain copy
+    
+    os.replace(temp_path, file_path)
+
+
+def _write_file(file_path: str, file_data: FileData, blob_dir: str) -> str:
+    """
+    Write an uploaded file to disk, sharing storage between identical files.
+    
+    Files are stored once under blob_dir, named by SHA-256, and each upload
+    path is a hardlink to its blob. Raw bytes are hashed before writing, so a
+    duplicate costs a single link call. Streams are hashed while they are
+    copied and a duplicate copy is dropped afterwards.
+    
+    Args:
+        file_path: Destination path.
+        file_data: Raw file bytes, or a binary stream copied in chunks.
+        blob_dir: Directory of content-addressed blobs.
+        
+    Returns:
+        Hex SHA-256 of the file, which names its blob.
+    """
+    temp_path = f"{file_path}.part"
+    
+    if isinstance(file_data, (bytes, bytearray, memoryview)):
+        sha256 = hashlib.sha256(file_data).hexdigest()
+        blob_path = os.path.join(blob_dir, sha256)
+        if _link_blob(blob_path, file_path):
+            return sha256
+        
+        with _open_for_write(temp_path) as f:
+            f.write(file_data)
+    else:
+        digest = hashlib.sha256()
+        buffer = _get_write_buffer()
+        view = memoryview(buffer)
+        
+        with _open_for_write(temp_path) as f:
+            while True:
+                read = file_data.readinto(buffer)
+                if not read:
+                    break
+                digest.update(view[:read])
+                f.write(view[:read])
+        
+        sha256 = digest.hexdigest()
+        blob_path = os.path.join(blob_dir, sha256)
+    
+    _publish_blob(temp_path, file_path, blob_path)
+    return sha256
+
+
+def _remove_file(file_path: str, blob_dir: str, sha256: Optional[str]) -> None:
+    """
+    Remove an uploaded file, and its blob once nothing else links to it.
+    
+    Args:
+        file_path: Per-upload path to remove.
+        blob_dir: Directory of content-addressed blobs.
+        sha256: Hex SHA-256 naming the file's blob, or None if unknown.
+    """
+    try:
+        os.remove(file_path)
+    except FileNotFoundError:
+        return
+    
+    if not sha256:
+        return
+    
+    # One link left means only the blob itself. An upload linking to it
+    # right after this check still keeps its own link to the data.
+    blob_path = os.path.join(blob_dir, sha256)
+    try:
+        if os.stat(blob_path).st_nlink == 1:
+            os.remove(blob_path)
+    except FileNotFoundError:
+        pass
+
+
 class ContentService:
     """Service for managing content uploads and processing with SQLAlchemy persistence."""
     
@@ -25,6 +228,7 @@ class ContentService:
             upload_dir = os.path.join(backend_dir, 'uploads')
         
         self._upload_dir = upload_dir
+        self._blob_dir = os.path.join(upload_dir, 'blobs')
         
         # Ensure upload directory exists
         os.makedirs(self._upload_dir, exist_ok=True)
@@ -49,70 +253,165 @@ class ContentService:
         
         return True, file_type, None
     
-    def save_content(self, user_id: str, filename: str, content_type: str,
-                     file_data: bytes) -> Content:
+    def _new_content(self, user_id: str, filename: str, content_type: str,
+                     file_size: int) -> Content:
         """
-        Save uploaded content to file system and database.
+        Build a pending Content record with its ID and file path assigned.
+        
+        The ID is assigned up front so the file can be named before the INSERT.
+        Every column is set explicitly so the record needs no reload after
+        _insert_contents writes it.
         
         Args:
             user_id: ID of the user uploading the content.
             filename: Original filename.
             content_type: Type of content ('video' or 'pdf').
-            file_data: Raw file bytes.
+            file_size: Size of the file in bytes.
             
         Returns:
-            Content object with saved data.
-            
-        Raises:
-            IOError: If file cannot be saved.
+            Unsaved Content object.
         """
-        # Create user-specific upload directory
+        # User-specific upload directory, created by the first write into it
         user_upload_dir = os.path.join(self._upload_dir, user_id)
-        os.makedirs(user_upload_dir, exist_ok=True)
         
-        # Create content record first to get ID
-        content = Content(
+        content_id = str(uuid.uuid4())
+        
+        # Generate unique filename to avoid collisions
+        safe_filename = f"{content_id}_{filename}"
+        
+        return Content(
+            id=content_id,
             user_id=user_id,
             filename=filename,
             content_type=content_type,
-            file_path="",  # Will be set after saving
-            file_size=len(file_data),
-            processing_status='pending'
+            file_path=os.path.join(user_upload_dir, safe_filename),
+            file_size=file_size,
+            sha256=None,
+            title=None,
+            summary=None,
+            extracted_text=None,
+            key_points_json=None,
+            topics_json=None,
+            processing_status='pending',
+            created_at=datetime.utcnow()
         )
-        db.session.add(content)
-        db.session.flush()  # Get the ID without committing
+    
+    def _insert_contents(self, contents: List[Content]) -> None:
+        """
+        INSERT Content rows with a Core statement, bypassing the unit of work.
         
-        # Generate unique filename to avoid collisions
-        safe_filename = f"{content.id}_{filename}"
-        file_path = os.path.join(user_upload_dir, safe_filename)
+        All rows go out as a single executemany. Call _attach_contents once
+        the transaction has committed.
         
-        # Save file
-        with open(file_path, 'wb') as f:
-            f.write(file_data)
+        Args:
+            contents: Records built by _new_content.
+        """
+        columns = inspect(Content).column_attrs.keys()
+        db.session.execute(
+            insert(Content),
+            [{column: getattr(content, column) for column in columns} for content in contents]
+        )
+    
+    def _attach_contents(self, contents: List[Content]) -> None:
+        """
+        Attach inserted records to the session as if they had been loaded.
+        
+        Args:
+            contents: Records whose rows were written by _insert_contents.
+        """
+        for content in contents:
+            make_transient_to_detached(content)
+            db.session.add(content)
+    
+    def _record_hashes(self, contents: List[Content]) -> None:
+        """
+        Store the SHA-256 of each written file on its committed row.
+        
+        The hash is only known once the write finishes, after the INSERT
+        has been committed, so it is written back with one bulk UPDATE.
         
-        # Update file path
-        content.file_path = file_path
+        Args:
+            contents: Records with sha256 set from their file writes.
+        """
+        db.session.execute(
+            update(Content),
+            [{'id': content.id, 'sha256': content.sha256} for content in contents]
+        )
         db.session.commit()
+    
+    def _delete_contents(self, contents: List[Content]) -> None:
+        """
+        Remove committed rows again after their file writes failed.
         
+        Args:
+            contents: Records whose rows were written by _insert_contents.
+        """
+        Content.query.filter(
+            Content.id.in_([content.id for content in contents])
+        ).delete(synchronize_session=False)
+        db.session.commit()
+    
+    def save_content(self, user_id: str, filename: str, content_type: str,
+                     file_data: FileData) -> Content:
+        """
+        Save uploaded content to file system and database.
+        
+        Args:
+            user_id: ID of the user uploading the content.
+            filename: Original filename.
+            content_type: Type of content ('video' or 'pdf').
+            file_data: Raw file bytes or a seekable binary stream.
+            
+        Returns:
+            Content object with saved data.
+            
+        Raises:
+            IOError: If file cannot be saved.
+        """
+        content = self._new_content(user_id, filename, content_type, _file_size(file_data))
+        
+        # Write the file in the background while the row is committed
+        pending_write = _file_writer.submit(_write_file, content.file_path, file_data, self._blob_dir)
+        try:
+            self._insert_contents([content])
+            db.session.commit()
+        except Exception:
+            if pending_write.exception() is None:
+                _remove_file(content.file_path, self._blob_dir, pending_write.result())
+            raise
+        
+        try:
+            content.sha256 = pending_write.result()
+        except IOError:
+            # The row is already committed, so take it back out
+            self._delete_contents([content])
+            raise
+        
+        self._record_hashes([content])
+        self._attach_contents([content])
         return content
     
     def upload_content(self, user_id: str, filename: str, 
-                       file_data: bytes) -> Tuple[Optional[Content], Optional[str]]:
+                       file_data: FileData,
+                       file_type: Optional[str] = None) -> Tuple[Optional[Content], Optional[str]]:
         """
         Upload and store content.
         
         Args:
             user_id: ID of the user uploading the content.
             filename: Original filename.
-            file_data: Raw file bytes.
+            file_data: Raw file bytes or a seekable binary stream.
+            file_type: File type already returned by validate_file_type for
+                       this filename; the filename is validated if omitted.
             
         Returns:
             Tuple of (Content, None) on success, or (None, error_message) on failure.
         """
-        # Validate file type
-        is_valid, file_type, error = self.validate_file_type(filename)
-        if not is_valid:
-            return None, error
+        # Validate file type unless the caller already has
+        if file_type is None:
+            is_valid, file_type, error = self.validate_file_type(filename)
+            if not is_valid:
+                return None, error
         
         try:
             content = self.save_content(
@@ -130,10 +429,66 @@ class ContentService:
             db.session.rollback()
             return None, f"Failed to upload content: {str(e)}"
     
+    def bulk_upload_content(self, user_id: str,
+                            files: List[Tuple[str, FileData]]) -> Tuple[List[Content], Optional[str]]:
+        """
+        Upload and store several files with one commit.
+        
+        All filenames are validated before anything is written. The file
+        writes are submitted together and run while the rows are committed;
+        if any write or the commit fails, nothing is kept.
+        
+        Args:
+            user_id: ID of the user uploading the content.
+            files: List of (filename, file_data) pairs; file_data may be
+                   bytes or a seekable binary stream.
+            
+        Returns:
+            Tuple of (list of Content, None) on success, or ([], error_message) on failure.
+        """
+        if not files:
+            return [], "No files provided"
+        
+        contents = []
+        for filename, file_data in files:
+            is_valid, file_type, error = self.validate_file_type(filename)
+            if not is_valid:
+                return [], f"{filename or 'File'}: {error}"
+            contents.append(self._new_content(user_id, filename, file_type, _file_size(file_data)))
+        
+        pending_writes = [
+            _file_writer.submit(_write_file, content.file_path, file_data, self._blob_dir)
+            for content, (_, file_data) in zip(contents, files)
+        ]
+        
+        committed = False
+        try:
+            self._insert_contents(contents)
+            db.session.commit()
+            committed = True
+            for content, pending_write in zip(contents, pending_writes):
+                content.sha256 = pending_write.result()
+            self._record_hashes(contents)
+            self._attach_contents(contents)
+            return contents, None
+            
+        except Exception as e:
+            db.session.rollback()
+            if committed:
+                # The rows were committed before a write failed
+                self._delete_contents(contents)
+            for content, pending_write in zip(contents, pending_writes):
+                if pending_write.exception() is None:
+                    _remove_file(content.file_path, self._blob_dir, pending_write.result())
+            if isinstance(e, IOError):
+                return [], f"Failed to save file: {str(e)}"
+            return [], f"Failed to upload content: {str(e)}"
+    
     def update_content_metadata(self, content_id: str, title: Optional[str] = None,
                                 summary: Optional[str] = None,
                                 key_points: Optional[List[str]] = None,
-                                topics: Optional[List[str]] = None) -> Optional[Content]:
+                                topics: Optional[List[str]] = None,
+                                return_object: bool = True) -> Union[Content, bool, None]:
         """
         Update content with extracted metadata from AI processing.
         
@@ -143,112 +498,250 @@ class ContentService:
             summary: Extracted summary.
             key_points: List of key points.
             topics: List of topics.
+            return_object: Whether to load and return the updated Content.
             
         Returns:
-            Updated Content object, or None if not found.
+            Updated Content object, or None if not found. With
+            return_object=False, whether the content was found instead.
         """
-        content = Content.query.get(content_id)
-        if not content:
-            return None
+        values = {'processing_status': 'complete'}
         
         if title is not None:
-            content.title = title
+            values['title'] = title
         if summary is not None:
-            content.summary = summary
+            values['summary'] = summary
         if key_points is not None:
-            content.key_points = key_points
+            values['key_points_json'] = Content.dump_list(key_points)
         if topics is not None:
-            content.topics = topics
+            values['topics_json'] = Content.dump_list(topics)
         
-        content.processing_status = 'complete'
+        # One UPDATE instead of load, mutate and flush
+        updated = Content.query.filter_by(id=content_id).update(values, synchronize_session=False)
         db.session.commit()
         
-        return content
+        if not return_object:
+            return updated > 0
+        
+        return db.session.get(Content, content_id) if updated else None
     
-    def process_content(self, content_id: str) -> Tuple[Optional[Content], Optional[str]]:
+    def process_content(self, content_id: str,
+                        file_data: Optional[FileData] = None) -> Tuple[Optional[Content], Optional[str]]:
         """
         Process uploaded content through ContentAgent.
         
         Args:
             content_id: ID of the content to process.
+            file_data: Optional upload data that was just saved (bytes or a
+                       seekable stream). Text is extracted from it directly
+                       instead of reading the stored file back.
             
         Returns:
             Tuple of (Content, None) on success, or (None, error_message) on failure.
         """
-        content = Content.query.get(content_id)
-        if not content:
+        # Claim the content so concurrent requests don't process it twice
+        claimed = Content.query.filter(
+            Content.id == content_id,
+            Content.processing_status.is_distinct_from('processing')
+        ).update({'processing_status': 'processing'}, synchronize_session=False)
+        db.session.commit()
+        
+        if not claimed:
+            if db.session.get(Content, content_id):
+                return None, "Content is already being processed"
             return None, "Content not found"
         
+        content = db.session.get(Content, content_id)
+        
         try:
-            # Read file content (for text extraction)
-            content_text = self._extract_text(content)
-            
-            # Store the extracted text - this is the most important part
-            content.extracted_text = content_text
-            
-            # Try to process through ContentAgent for summary/key points
-            try:
-                result = agent_orchestrator.process_content(
-                    content_data=content_text,
-                    content_type=content.content_type,
-                    filename=content.filename
-                )
-                
-                # Check for processing failure
-                if result.get("processing_status") == "failed":
-                    # AI failed but we still have the extracted text
-                    content.summary = "AI processing unavailable - text extracted successfully"
-                    content.key_points = ["Text extracted from document", "AI summary unavailable"]
-                    content.title = content.filename
-                    content.topics = []
-                else:
-                    # Update content with extracted information
-                    content.summary = result.get("summary", "")
-                    content.key_points = result.get("key_points", [])
-                    content.title = result.get("title", content.filename)
-                    content.topics = result.get("topics", [])
-            except Exception as ai_error:
-                # AI processing failed but we still have the extracted text
-                import logging
-                logging.getLogger(__name__).warning(f"AI processing failed: {ai_error}")
-                content.summary = "AI processing unavailable - text extracted successfully"
-                content.key_points = ["Text extracted from document", "AI summary unavailable"]
-                content.title = content.filename
-                content.topics = []
-            
-            # Mark as complete since we have the extracted text (most important for chat)
-            content.processing_status = 'complete'
+            values = self._analyze_content(
+                content.content_type, content.filename, content.file_path, file_data
+            )
+            for key, value in values.items():
+                setattr(content, key, value)
             db.session.commit()
             
             return content, None
             
         except Exception as e:
             db.session.rollback()
+            Content.query.filter_by(id=content_id).update(
+                {'processing_status': 'failed'}, synchronize_session=False
+            )
+            db.session.commit()
             return None, f"Failed to process content: {str(e)}"
     
-    def _extract_text(self, content: Content) -> str:
+    def process_contents(self, contents: List[Content],
+                         file_data: Optional[List[Optional[FileData]]] = None
+                         ) -> List[Tuple[Optional[Content], Optional[str]]]:
+        """
+        Process several freshly uploaded items concurrently.
+        
+        Text extraction and the ContentAgent calls run on the processing
+        pool, so the LLM round trips overlap instead of running one after
+        another. All results are written back with a single bulk UPDATE.
+        
+        Args:
+            contents: Content records returned by bulk_upload_content.
+            file_data: Optional upload data for each record, in the same
+                       order (see process_content).
+            
+        Returns:
+            List of (Content, None) or (None, error_message) tuples, in the
+            order of contents.
+        """
+        if not contents:
+            return []
+        
+        # Read everything the workers need before the commit expires it
+        jobs = [
+            (content.id, content.content_type, content.filename, content.file_path)
+            for content in contents
+        ]
+        content_ids = [content_id for content_id, _, _, _ in jobs]
+        if file_data is None:
+            file_data = [None] * len(jobs)
+        
+        Content.query.filter(Content.id.in_(content_ids)).update(
+            {'processing_status': 'processing'}, synchronize_session=False
+        )
+        db.session.commit()
+        
+        pending = [
+            _processor.submit(self._analyze_content, content_type, filename, file_path, data)
+            for (_, content_type, filename, file_path), data in zip(jobs, file_data)
+        ]
+        
+        rows = []
+        errors = {}
+        for content_id, future in zip(content_ids, pending):
+            try:
+                values = future.result()
+            except Exception as e:
+                values = {'processing_status': 'failed'}
+                errors[content_id] = f"Failed to process content: {str(e)}"
+            rows.append({'id': content_id, **values})
+        
+        db.session.execute(update(Content), rows)
+        db.session.commit()
+        
+        # Reload every record with one query
+        processed = {
+            content.id: content
+            for content in Content.query.filter(Content.id.in_(content_ids))
+        }
+        return [
+            (None, errors[content_id]) if content_id in errors else (processed[content_id], None)
+            for content_id in content_ids
+        ]
+    
+    def _analyze_content(self, content_type: str, filename: str, file_path: str,
+                         file_data: Optional[FileData] = None) -> dict:
+        """
+        Extract text from a file and run it through ContentAgent.
+        
+        Touches no database state, so it is safe to run on worker threads.
+        
+        Args:
+            content_type: Type of content ('video' or 'pdf').
+            filename: Original filename.
+            file_path: Path of the stored file.
+            file_data: Optional upload data to read instead of the stored file.
+            
+        Returns:
+            Content column values to store for the processed content.
+        """
+        # Read file content (for text extraction)
+        content_text = self._extract_text(content_type, filename, file_path, file_data)
+        
+        # Store the extracted text - this is the most important part. It is
+        # marked complete even if the AI step fails (most important for chat)
+        values = {'extracted_text': content_text, 'processing_status': 'complete'}
+        
+        # Try to process through ContentAgent for summary/key points
+        try:
+            result = agent_orchestrator.process_content(
+                content_data=content_text,
+                content_type=content_type,
+                filename=filename
+            )
+        except Exception as ai_error:
+            import logging
+            logging.getLogger(__name__).warning(f"AI processing failed: {ai_error}")
+            result = None
+        
+        if result is None or result.get("processing_status") == "failed":
+            # AI failed but we still have the extracted text
+            values.update(
+                summary="AI processing unavailable - text extracted successfully",
+                key_points_json=Content.dump_list(["Text extracted from document", "AI summary unavailable"]),
+                title=filename,
+                topics_json=None
+            )
+        else:
+            # Update content with extracted information
+            values.update(
+                summary=result.get("summary", ""),
+                key_points_json=Content.dump_list(result.get("key_points", [])),
+                title=result.get("title", filename),
+                topics_json=Content.dump_list(result.get("topics", []))
+            )
+        
+        return values
+    
+    def process_content_async(self, content_id: str) -> Future:
+        """
+        Queue content for processing on the background pool.
+        
+        The content stays 'pending' until a worker claims it, then moves to
+        'processing' and finally 'complete' or 'failed'.
+        
+        Args:
+            content_id: ID of the content to process.
+            
+        Returns:
+            Future resolving to process_content's (Content, error_message) tuple.
+        """
+        app = current_app._get_current_object()
+        
+        def run():
+            with app.app_context():
+                return self.process_content(content_id)
+        
+        return _processor.submit(run)
+    
+    def _extract_text(self, content_type: str, filename: str, file_path: str,
+                      file_data: Optional[FileData] = None) -> str:
         """
         Extract text from content file.
         
         Args:
-            content: The content to extract text from.
+            content_type: Type of content ('video' or 'pdf').
+            filename: Original filename.
+            file_path: Path of the stored file.
+            file_data: Optional in-memory copy or stream of the file, used
+                       instead of the stored file when given.
             
         Returns:
             Extracted text string.
         """
-        if content.content_type == 'pdf':
-            return self._extract_pdf_text(content.file_path)
-        elif content.content_type == 'video':
-            return f"[Video content: {content.filename}. Video transcription not yet implemented.]"
+        if content_type == 'pdf':
+            if file_data is None:
+                return self._extract_pdf_text(file_path)
+            if isinstance(file_data, (bytes, bytearray, memoryview)):
+                return self._extract_pdf_text(io.BytesIO(file_data))
+            file_data.seek(0)
+            return self._extract_pdf_text(file_data)
+        elif content_type == 'video':
+            return f"[Video content: {filename}. Video transcription not yet implemented.]"
         
         return ""
     
-    def _extract_pdf_text(self, file_path: str) -> str:
+    def _extract_pdf_text(self, file_path: Union[str, BinaryIO]) -> str:
         """
         Extract text from a PDF file.
         
         Args:
-            file_path: Path to the PDF file.
+            file_path: Path to the PDF file, or a binary stream of it.
             
         Returns:
             Extracted text string.
@@ -256,9 +749,6 @@ class ContentService:
         try:
             from PyPDF2 import PdfReader
             
-            if not os.path.exists(file_path):
-                return f"[PDF file not found: {file_path}]"
-            
             reader = PdfReader(file_path)
             text_parts = []
             
@@ -281,22 +771,36 @@ class ContentService:
             
         except ImportError:
             return "[PDF extraction unavailable. PyPDF2 is not installed.]"
+        except FileNotFoundError:
+            return f"[PDF file not found: {file_path}]"
         except Exception as e:
             return f"[Error extracting PDF text: {str(e)}]"
     
-    def get_user_content(self, user_id: str) -> List[Content]:
+    def get_user_content(self, user_id: str, limit: Optional[int] = None,
+                         before: Optional[Tuple[datetime, str]] = None) -> List[Content]:
         """
-        Get all content for a user.
+        Get content for a user, with optional keyset pagination.
         
         Args:
             user_id: ID of the user.
+            limit: Maximum number of items (all if None).
+            before: Optional (created_at, id) cursor of the last item already
+                    seen; only older content is returned.
             
         Returns:
             List of Content objects for the user, ordered by creation date (newest first).
         """
-        return Content.query.filter_by(user_id=user_id).order_by(
-            Content.created_at.desc()
-        ).all()
+        query = Content.query.filter_by(user_id=user_id)
+        
+        if before:
+            query = query.filter(tuple_(Content.created_at, Content.id) < tuple_(*before))
+        
+        query = query.order_by(Content.created_at.desc(), Content.id.desc())
+        
+        if limit is not None:
+            query = query.limit(limit)
+        
+        return query.all()
     
     # Alias for backward compatibility
     def get_user_contents(self, user_id: str) -> List[Content]:
@@ -316,7 +820,7 @@ class ContentService:
         """
         if user_id:
             return Content.query.filter_by(id=content_id, user_id=user_id).first()
-        return Content.query.get(content_id)
+        return db.session.get(Content, content_id)
     
     def delete_content(self, content_id: str, user_id: str) -> Tuple[bool, Optional[str]]:
         """
@@ -329,19 +833,19 @@ class ContentService:
         Returns:
             Tuple of (success, error_message).
         """
-        content = Content.query.filter_by(id=content_id, user_id=user_id).first()
+        # One lookup by primary key answers both "missing" and "not yours"
+        content = db.session.get(Content, content_id)
         
         if not content:
-            # Check if content exists but belongs to another user
-            exists = Content.query.get(content_id)
-            if exists:
-                return False, "Not authorized to delete this content"
             return False, "Content not found"
         
+        if content.user_id != user_id:
+            return False, "Not authorized to delete this content"
+        
         try:
-            # Delete file if it exists
-            if content.file_path and os.path.exists(content.file_path):
-                os.remove(content.file_path)
+            # Delete file; a file that is already gone is fine
+            if content.file_path:
+                _remove_file(content.file_path, self._blob_dir, content.sha256)
             
             # Delete database record
             db.session.delete(content)
@@ -363,10 +867,10 @@ class ContentService:
         Returns:
             Summary string, or None if not found/processed.
         """
-        content = Content.query.get(content_id)
-        if not content or content.processing_status != 'complete':
-            return None
-        return content.summary
+        row = db.session.execute(
+            select(Content.summary).filter_by(id=content_id, processing_status='complete')
+        ).first()
+        return row.summary if row else None
     
     def get_content_key_points(self, content_id: str) -> Optional[List[str]]:
         """
@@ -378,10 +882,10 @@ class ContentService:
         Returns:
             List of key point strings, or None if not found/processed.
         """
-        content = Content.query.get(content_id)
-        if not content or content.processing_status != 'complete':
-            return None
-        return content.key_points
+        row = db.session.execute(
+            select(Content.key_points_json).filter_by(id=content_id, processing_status='complete')
+        ).first()
+        return Content.load_list(row.key_points_json) if row else None
 
 
 # Global content service instance
@@ -1,13 +1,36 @@
 """
 Friend service for managing friendships and friend requests.
 """
+import uuid
 from datetime import datetime
-from typing import List, Optional, Tuple
-from sqlalchemy import or_, and_
+from typing import Dict, List, Optional, Set, Tuple
+from sqlalchemy import and_, insert, literal, or_, select, update
 from app.database import db
 from app.models.friend import Friend
 from app.models.friend_request import FriendRequest
 from app.models.user import User
+from app.services.cache import cache
+
+
+# Seconds a cached friend list stays valid. Lists are also dropped whenever
+# a friendship is created or removed, so this only bounds how stale the
+# friends' profile fields can get.
+FRIENDS_CACHE_TTL = 300
+
+
+def _friends_key(user_id: str) -> str:
+    """Cache key for a user's friend list."""
+    return f"friends:{user_id}"
+
+
+# Seconds the friend/request ID sets used by search_users stay cached. They
+# are dropped whenever a request is sent, answered, or a friendship removed.
+RELATED_CACHE_TTL = 60
+
+
+def _related_key(user_id: str) -> str:
+    """Cache key for a user's friend and pending request ID sets."""
+    return f"related:{user_id}"
 
 
 class FriendService:
@@ -23,17 +46,23 @@ class FriendService:
         Returns:
             List of friend user dictionaries
         """
-        friendships = Friend.query.filter_by(user_id=user_id).all()
+        friends = cache.get(_friends_key(user_id))
+        if friends is not None:
+            return friends
+        
+        # One JOIN instead of a User lookup per friendship
+        rows = db.session.query(Friend, User).join(
+            User, User.id == Friend.friend_id
+        ).filter(Friend.user_id == user_id).all()
         friends = []
         
-        for friendship in friendships:
-            friend_user = User.query.get(friendship.friend_id)
-            if friend_user:
-                friend_data = friend_user.to_dict()
-                friend_data['friendshipId'] = friendship.id
-                friend_data['friendsSince'] = friendship.created_at.isoformat() if friendship.created_at else None
-                friends.append(friend_data)
+        for friendship, friend_user in rows:
+            friend_data = friend_user.to_dict()
+            friend_data['friendshipId'] = friendship.id
+            friend_data['friendsSince'] = friendship.created_at.isoformat() if friendship.created_at else None
+            friends.append(friend_data)
         
+        cache.set(_friends_key(user_id), friends, FRIENDS_CACHE_TTL)
         return friends
     
     def search_users(self, query: str, current_user_id: str, limit: int = 20) -> List[dict]:
@@ -64,33 +93,59 @@ class FriendService:
             )
         ).limit(limit).all()
         
-        # Get existing friendships and pending requests
-        existing_friend_ids = set(
-            f.friend_id for f in Friend.query.filter_by(user_id=current_user_id).all()
-        )
-        
-        pending_request_ids = set(
-            r.recipient_id for r in FriendRequest.query.filter_by(
-                sender_id=current_user_id, status='pending'
-            ).all()
-        )
-        
-        received_request_ids = set(
-            r.sender_id for r in FriendRequest.query.filter_by(
-                recipient_id=current_user_id, status='pending'
-            ).all()
-        )
+        related = self._get_related_ids(current_user_id)
         
         results = []
         for user in users:
             user_data = user.to_dict()
-            user_data['isFriend'] = user.id in existing_friend_ids
-            user_data['hasPendingRequest'] = user.id in pending_request_ids
-            user_data['hasReceivedRequest'] = user.id in received_request_ids
+            user_data['isFriend'] = user.id in related['friend']
+            user_data['hasPendingRequest'] = user.id in related['sent']
+            user_data['hasReceivedRequest'] = user.id in related['received']
             results.append(user_data)
         
         return results
     
+    def _get_related_ids(self, user_id: str) -> Dict[str, Set[str]]:
+        """
+        Get the IDs of a user's friends and pending request counterparts.
+        
+        Cached briefly so a burst of searches (typing in the search box)
+        reuses one lookup.
+        
+        Args:
+            user_id: The user's ID
+            
+        Returns:
+            Dict with 'friend', 'sent' and 'received' sets of user IDs
+        """
+        related_sets = cache.get(_related_key(user_id))
+        if related_sets is not None:
+            return related_sets
+        
+        # Friends and pending requests both ways in one round trip
+        related_sets = {'friend': set(), 'sent': set(), 'received': set()}
+        
+        related = db.session.query(
+            Friend.friend_id.label('user_id'), literal('friend').label('kind')
+        ).filter(
+            Friend.user_id == user_id
+        ).union_all(
+            db.session.query(FriendRequest.recipient_id, literal('sent')).filter(
+                FriendRequest.sender_id == user_id,
+                FriendRequest.status == 'pending'
+            ),
+            db.session.query(FriendRequest.sender_id, literal('received')).filter(
+                FriendRequest.recipient_id == user_id,
+                FriendRequest.status == 'pending'
+            )
+        )
+        
+        for related_id, kind in related:
+            related_sets[kind].add(related_id)
+        
+        cache.set(_related_key(user_id), related_sets, RELATED_CACHE_TTL)
+        return related_sets
+    
     def send_friend_request(self, sender_id: str, recipient_id: str) -> Tuple[Optional[FriendRequest], Optional[str]]:
         """
         Send a friend request.
@@ -107,15 +162,11 @@ class FriendService:
             return None, "Cannot send friend request to yourself"
         
         # Check if recipient exists
-        recipient = User.query.get(recipient_id)
-        if not recipient:
+        if not db.session.query(User.query.filter_by(id=recipient_id).exists()).scalar():
             return None, "User not found"
         
         # Check if already friends
-        existing_friendship = Friend.query.filter_by(
-            user_id=sender_id, friend_id=recipient_id
-        ).first()
-        if existing_friendship:
+        if self.are_friends(sender_id, recipient_id):
             return None, "Already friends with this user"
         
         # Check for existing pending request (either direction)
@@ -145,9 +196,44 @@ class FriendService:
         
         db.session.add(friend_request)
         db.session.commit()
+        cache.invalidate(_related_key(sender_id), _related_key(recipient_id))
         
         return friend_request, None
     
+    def _list_pending_requests(self, user_column, other_column, user_id: str, party: str) -> List[dict]:
+        """
+        List a user's pending requests with the other party's name and email.
+        
+        Selects plain columns joined to the other party's user row, so no
+        ORM objects are built.
+        
+        Args:
+            user_column: Request column holding the user's ID
+            other_column: Request column holding the other party's ID
+            user_id: The user's ID
+            party: Key for the other party in each entry ('sender' or 'recipient')
+            
+        Returns:
+            List of friend request dictionaries, newest first
+        """
+        rows = db.session.query(
+            FriendRequest.id,
+            FriendRequest.sender_id,
+            FriendRequest.recipient_id,
+            FriendRequest.status,
+            FriendRequest.created_at,
+            FriendRequest.updated_at,
+            User.name,
+            User.email
+        ).join(
+            User, User.id == other_column
+        ).filter(
+            user_column == user_id,
+            FriendRequest.status == 'pending'
+        ).order_by(FriendRequest.created_at.desc())
+        
+        return [FriendRequest.to_list_dict(row, party) for row in rows]
+    
     def get_pending_requests(self, user_id: str) -> List[dict]:
         """
         Get all pending friend requests for a user.
@@ -156,14 +242,11 @@ class FriendService:
             user_id: The user's ID
             
         Returns:
-            List of pending friend request dictionaries
+            List of pending friend request dictionaries with the sender's details
         """
-        requests = FriendRequest.query.filter_by(
-            recipient_id=user_id,
-            status='pending'
-        ).order_by(FriendRequest.created_at.desc()).all()
-        
-        return [req.to_dict(include_users=True) for req in requests]
+        return self._list_pending_requests(
+            FriendRequest.recipient_id, FriendRequest.sender_id, user_id, 'sender'
+        )
     
     def get_sent_requests(self, user_id: str) -> List[dict]:
         """
@@ -173,14 +256,11 @@ class FriendService:
             user_id: The user's ID
             
         Returns:
-            List of sent friend request dictionaries
+            List of sent friend request dictionaries with the recipient's details
         """
-        requests = FriendRequest.query.filter_by(
-            sender_id=user_id,
-            status='pending'
-        ).order_by(FriendRequest.created_at.desc()).all()
-        
-        return [req.to_dict(include_users=True) for req in requests]
+        return self._list_pending_requests(
+            FriendRequest.sender_id, FriendRequest.recipient_id, user_id, 'recipient'
+        )
     
     def accept_request(self, request_id: str, user_id: str) -> Tuple[bool, Optional[str]]:
         """
@@ -193,34 +273,47 @@ class FriendService:
         Returns:
             Tuple of (success, error_message)
         """
-        friend_request = FriendRequest.query.get(request_id)
-        
-        if not friend_request:
-            return False, "Friend request not found"
-        
-        if friend_request.recipient_id != user_id:
-            return False, "Not authorized to accept this request"
-        
-        if friend_request.status != 'pending':
+        now = datetime.utcnow()
+        
+        # Accept in one conditional UPDATE so two concurrent accepts cannot
+        # both pass the pending check
+        stmt = update(FriendRequest).where(
+            FriendRequest.id == request_id,
+            FriendRequest.recipient_id == user_id,
+            FriendRequest.status == 'pending'
+        ).values(status='accepted', updated_at=now)
+        
+        if db.session.get_bind().dialect.update_returning:
+            sender_id = db.session.execute(
+                stmt.returning(FriendRequest.sender_id)
+            ).scalar_one_or_none()
+        elif db.session.execute(stmt).rowcount:
+            # The UPDATE holds the row, so this read sees what it accepted
+            sender_id = db.session.execute(
+                select(FriendRequest.sender_id).where(FriendRequest.id == request_id)
+            ).scalar_one()
+        else:
+            sender_id = None
+        
+        if sender_id is None:
+            db.session.rollback()
+            friend_request = db.session.get(FriendRequest, request_id)
+            if not friend_request:
+                return False, "Friend request not found"
+            if friend_request.recipient_id != user_id:
+                return False, "Not authorized to accept this request"
             return False, "Friend request is no longer pending"
         
         # Create bidirectional friendship
-        friendship1 = Friend(
-            user_id=friend_request.recipient_id,
-            friend_id=friend_request.sender_id
-        )
-        friendship2 = Friend(
-            user_id=friend_request.sender_id,
-            friend_id=friend_request.recipient_id
-        )
-        
-        # Update request status
-        friend_request.status = 'accepted'
-        friend_request.updated_at = datetime.utcnow()
-        
-        db.session.add(friendship1)
-        db.session.add(friendship2)
+        db.session.execute(insert(Friend), [
+            {'id': str(uuid.uuid4()), 'user_id': user_id, 'friend_id': sender_id, 'created_at': now},
+            {'id': str(uuid.uuid4()), 'user_id': sender_id, 'friend_id': user_id, 'created_at': now}
+        ])
         db.session.commit()
+        cache.invalidate(
+            _friends_key(sender_id), _friends_key(user_id),
+            _related_key(sender_id), _related_key(user_id)
+        )
         
         return True, None
     
@@ -249,6 +342,7 @@ class FriendService:
         friend_request.status = 'declined'
         friend_request.updated_at = datetime.utcnow()
         db.session.commit()
+        cache.invalidate(_related_key(friend_request.sender_id), _related_key(user_id))
         
         return True, None
     
@@ -263,33 +357,31 @@ class FriendService:
         Returns:
             Tuple of (success, error_message)
         """
-        # Find and delete both directions of the friendship
-        friendship1 = Friend.query.filter_by(
-            user_id=user_id, friend_id=friend_id
-        ).first()
-        
-        friendship2 = Friend.query.filter_by(
-            user_id=friend_id, friend_id=user_id
-        ).first()
+        # Delete both directions of the friendship in one statement
+        deleted = Friend.query.filter(
+            or_(
+                and_(Friend.user_id == user_id, Friend.friend_id == friend_id),
+                and_(Friend.user_id == friend_id, Friend.friend_id == user_id)
+            )
+        ).delete(synchronize_session=False)
         
-        if not friendship1 and not friendship2:
+        if not deleted:
+            db.session.rollback()
             return False, "Friendship not found"
         
-        if friendship1:
-            db.session.delete(friendship1)
-        if friendship2:
-            db.session.delete(friendship2)
-        
         db.session.commit()
+        cache.invalidate(
+            _friends_key(user_id), _friends_key(friend_id),
+            _related_key(user_id), _related_key(friend_id)
+        )
         
         return True, None
     
     def are_friends(self, user_id: str, other_user_id: str) -> bool:
         """Check if two users are friends."""
-        friendship = Friend.query.filter_by(
-            user_id=user_id, friend_id=other_user_id
-        ).first()
-        return friendship is not None
+        return db.session.query(
+            Friend.query.filter_by(user_id=user_id, friend_id=other_user_id).exists()
+        ).scalar()
 
 
 # Singleton instance
@@ -3,16 +3,108 @@ Group service for managing group learning sessions.
 """
 from datetime import datetime
 from typing import List, Optional, Tuple
+from sqlalchemy import func, tuple_
+from sqlalchemy.orm import selectinload
 from app.database import db
 from app.models.group_learning import GroupLearning
 from app.models.group_member import GroupMember
 from app.models.message import GroupMessage
 from app.models.friend import Friend
+from app.services.cache import cache
+
+
+# Seconds a cached group list stays valid. Lists are dropped when membership
+# changes; new messages only reorder them, so that is left to the TTL.
+GROUPS_CACHE_TTL = 120
+
+
+def _groups_key(user_id: str) -> str:
+    """Cache key for a user's group list."""
+    return f"groups:{user_id}"
 
 
 class GroupService:
     """Service for managing group learning sessions."""
     
+    def _count_active_members(self, group_ids: List[str]) -> dict:
+        """
+        Count active members for several groups with one GROUP BY query.
+        
+        Args:
+            group_ids: IDs of the groups to count
+            
+        Returns:
+            Dict mapping group ID to active member count (groups without
+            active members are omitted)
+        """
+        if not group_ids:
+            return {}
+        
+        return dict(
+            db.session.query(GroupMember.group_id, func.count(GroupMember.id)).filter(
+                GroupMember.group_id.in_(group_ids),
+                GroupMember.status == 'active'
+            ).group_by(GroupMember.group_id).all()
+        )
+    
+    def _invalidate_group_lists(self, group_id: str, *user_ids: str) -> None:
+        """
+        Drop cached group lists after a group's membership changed.
+        
+        Every active member's list shows the member count, so all of them
+        are dropped, along with any users who just left the group.
+        
+        Args:
+            group_id: The group's ID
+            user_ids: Extra users whose lists changed
+        """
+        member_ids = [
+            member_id for member_id, in db.session.query(GroupMember.user_id).filter_by(
+                group_id=group_id, status='active'
+            )
+        ]
+        cache.invalidate(*(_groups_key(member_id) for member_id in [*member_ids, *user_ids]))
+    
+    def _get_active_membership(self, group_id: str, user_id: str) -> Optional[GroupMember]:
+        """Load a user's active membership in a group."""
+        return GroupMember.query.filter_by(
+            group_id=group_id,
+            user_id=user_id,
+            status='active'
+        ).first()
+    
+    def _is_active_member(self, group_id: str, user_id: str) -> bool:
+        """Check whether a user is an active member of a group."""
+        return db.session.query(
+            GroupMember.query.filter_by(
+                group_id=group_id,
+                user_id=user_id,
+                status='active'
+            ).exists()
+        ).scalar()
+    
+    def _get_member_and_group(self, group_id: str, user_id: str) -> Tuple[Optional[GroupMember], Optional[GroupLearning]]:
+        """
+        Load a user's active membership together with its group in one query.
+        
+        Args:
+            group_id: The group's ID
+            user_id: The user's ID
+            
+        Returns:
+            Tuple of (GroupMember, GroupLearning), or (None, None) if the user
+            is not an active member of the group
+        """
+        row = db.session.query(GroupMember, GroupLearning).join(
+            GroupLearning, GroupLearning.id == GroupMember.group_id
+        ).filter(
+            GroupMember.group_id == group_id,
+            GroupMember.user_id == user_id,
+            GroupMember.status == 'active'
+        ).first()
+        
+        return (row[0], row[1]) if row else (None, None)
+    
     def create_group(self, creator_id: str, name: str, description: str = None) -> Tuple[Optional[GroupLearning], Optional[str]]:
         """
         Create a new group learning session.
@@ -49,6 +141,7 @@ class GroupService:
         
         db.session.add(creator_member)
         db.session.commit()
+        cache.invalidate(_groups_key(creator_id))
         
         return group, None
     
@@ -60,23 +153,32 @@ class GroupService:
             user_id: The user's ID
             
         Returns:
-            List of group dictionaries
+            List of group dictionaries, most recently active first
         """
-        memberships = GroupMember.query.filter_by(
-            user_id=user_id,
-            status='active'
-        ).all()
+        groups = cache.get(_groups_key(user_id))
+        if groups is not None:
+            return groups
+        
+        memberships = GroupMember.query.join(
+            GroupLearning, GroupLearning.id == GroupMember.group_id
+        ).options(
+            selectinload(GroupMember.group).selectinload(GroupLearning.creator)
+        ).filter(
+            GroupMember.user_id == user_id,
+            GroupMember.status == 'active'
+        ).order_by(GroupLearning.last_activity_at.desc()).all()
+        member_counts = self._count_active_members([m.group_id for m in memberships])
         
         groups = []
         for membership in memberships:
-            group = GroupLearning.query.get(membership.group_id)
-            if group:
-                group_data = group.to_dict()
-                group_data['userRole'] = membership.role
-                group_data['joinedAt'] = membership.joined_at.isoformat() if membership.joined_at else None
-                groups.append(group_data)
-        
-        return sorted(groups, key=lambda g: g.get('lastActivityAt', ''), reverse=True)
+            group = membership.group
+            group_data = group.to_dict(member_count=member_counts.get(group.id, 0))
+            group_data['userRole'] = membership.role
+            group_data['joinedAt'] = membership.joined_at.isoformat() if membership.joined_at else None
+            groups.append(group_data)
+        
+        cache.set(_groups_key(user_id), groups, GROUPS_CACHE_TTL)
+        return groups
     
     def get_group(self, group_id: str, user_id: str) -> Tuple[Optional[dict], Optional[str]]:
         """
@@ -89,19 +191,11 @@ class GroupService:
         Returns:
             Tuple of (group dict, error_message)
         """
-        group = GroupLearning.query.get(group_id)
-        
-        if not group:
-            return None, "Group not found"
-        
-        # Check if user is a member
-        membership = GroupMember.query.filter_by(
-            group_id=group_id,
-            user_id=user_id,
-            status='active'
-        ).first()
+        membership, group = self._get_member_and_group(group_id, user_id)
         
         if not membership:
+            if not db.session.get(GroupLearning, group_id):
+                return None, "Group not found"
             return None, "Not a member of this group"
         
         group_data = group.to_dict(include_members=True)
@@ -121,40 +215,36 @@ class GroupService:
         Returns:
             Tuple of (successful_invites, failed_invites)
         """
-        group = GroupLearning.query.get(group_id)
-        
-        if not group:
+        # Check the group exists and the inviter is a member
+        if not self._is_active_member(group_id, inviter_id):
             return [], invitee_ids
         
-        # Check if inviter is a member
-        inviter_membership = GroupMember.query.filter_by(
-            group_id=group_id,
-            user_id=inviter_id,
-            status='active'
-        ).first()
-        
-        if not inviter_membership:
-            return [], invitee_ids
+        # Look up friendships and existing memberships for every invitee at once
+        friend_ids = {
+            friend_id for friend_id, in db.session.query(Friend.friend_id).filter(
+                Friend.user_id == inviter_id,
+                Friend.friend_id.in_(invitee_ids)
+            )
+        }
+        existing_members = {
+            member.user_id: member for member in GroupMember.query.filter(
+                GroupMember.group_id == group_id,
+                GroupMember.user_id.in_(invitee_ids)
+            )
+        }
         
         successful = []
         failed = []
+        new_members = []
         
         for invitee_id in invitee_ids:
             # Check if they're friends
-            friendship = Friend.query.filter_by(
-                user_id=inviter_id,
-                friend_id=invitee_id
-            ).first()
-            
-            if not friendship:
+            if invitee_id not in friend_ids:
                 failed.append(invitee_id)
                 continue
             
             # Check if already a member or has pending invite
-            existing = GroupMember.query.filter_by(
-                group_id=group_id,
-                user_id=invitee_id
-            ).first()
+            existing = existing_members.get(invitee_id)
             
             if existing:
                 if existing.status in ['active', 'pending']:
@@ -171,10 +261,12 @@ class GroupService:
                     role='member',
                     status='pending'
                 )
-                db.session.add(member)
+                new_members.append(member)
+                existing_members[invitee_id] = member
             
             successful.append(invitee_id)
         
+        db.session.add_all(new_members)
         if successful:
             db.session.commit()
         
@@ -214,6 +306,7 @@ class GroupService:
             group.last_activity_at = datetime.utcnow()
         
         db.session.commit()
+        self._invalidate_group_lists(group_id)
         
         return True, None
     
@@ -228,11 +321,7 @@ class GroupService:
         Returns:
             Tuple of (success, error_message)
         """
-        membership = GroupMember.query.filter_by(
-            group_id=group_id,
-            user_id=user_id,
-            status='active'
-        ).first()
+        membership = self._get_active_membership(group_id, user_id)
         
         if not membership:
             return False, "Not a member of this group"
@@ -243,6 +332,7 @@ class GroupService:
         
         membership.status = 'left'
         db.session.commit()
+        self._invalidate_group_lists(group_id, user_id)
         
         return True, None
     
@@ -284,11 +374,7 @@ class GroupService:
             Tuple of (success, error_message)
         """
         # Check if remover is the creator
-        remover_membership = GroupMember.query.filter_by(
-            group_id=group_id,
-            user_id=remover_id,
-            status='active'
-        ).first()
+        remover_membership = self._get_active_membership(group_id, remover_id)
         
         if not remover_membership or remover_membership.role != 'creator':
             return False, "Only the group creator can remove members"
@@ -297,18 +383,19 @@ class GroupService:
         if remover_id == member_id:
             return False, "Cannot remove yourself from the group"
         
-        # Find the member to remove
-        member = GroupMember.query.filter_by(
+        # Mark the member removed in one statement
+        removed = GroupMember.query.filter_by(
             group_id=group_id,
             user_id=member_id,
             status='active'
-        ).first()
+        ).update({'status': 'removed'}, synchronize_session=False)
         
-        if not member:
+        if not removed:
+            db.session.rollback()
             return False, "Member not found in this group"
         
-        member.status = 'removed'
         db.session.commit()
+        self._invalidate_group_lists(group_id, member_id)
         
         return True, None
     
@@ -322,20 +409,22 @@ class GroupService:
         Returns:
             List of pending invitation dictionaries
         """
-        memberships = GroupMember.query.filter_by(
+        memberships = GroupMember.query.options(
+            selectinload(GroupMember.group).selectinload(GroupLearning.creator)
+        ).filter_by(
             user_id=user_id,
             status='pending'
         ).all()
+        member_counts = self._count_active_members([m.group_id for m in memberships])
         
         invitations = []
         for membership in memberships:
-            group = GroupLearning.query.get(membership.group_id)
-            if group:
-                invitations.append({
-                    'membershipId': membership.id,
-                    'group': group.to_dict(),
-                    'createdAt': membership.created_at.isoformat() if membership.created_at else None
-                })
+            group = membership.group
+            invitations.append({
+                'membershipId': membership.id,
+                'group': group.to_dict(member_count=member_counts.get(group.id, 0)),
+                'createdAt': membership.created_at.isoformat() if membership.created_at else None
+            })
         
         return invitations
     
@@ -354,12 +443,8 @@ class GroupService:
         if not content or not content.strip():
             return None, "Message content cannot be empty"
         
-        # Check if sender is a member
-        membership = GroupMember.query.filter_by(
-            group_id=group_id,
-            user_id=sender_id,
-            status='active'
-        ).first()
+        # Check if sender is a member, loading the group with the membership
+        membership, group = self._get_member_and_group(group_id, sender_id)
         
         if not membership:
             return None, "Not a member of this group"
@@ -373,41 +458,52 @@ class GroupService:
         )
         
         # Update group activity
-        group = GroupLearning.query.get(group_id)
-        if group:
-            group.last_activity_at = datetime.utcnow()
+        group.last_activity_at = datetime.utcnow()
         
         db.session.add(message)
         db.session.commit()
         
         return message, None
     
-    def get_group_messages(self, group_id: str, user_id: str, limit: int = 50, offset: int = 0) -> Tuple[List[dict], Optional[str]]:
+    def get_group_messages(
+        self,
+        group_id: str,
+        user_id: str,
+        limit: int = 50,
+        before: Optional[Tuple[datetime, str]] = None
+    ) -> Tuple[List[dict], Optional[str]]:
         """
-        Get messages for a group with pagination.
+        Get messages for a group with keyset pagination.
+        
+        Pages are anchored on the ``(created_at, id)`` of the oldest message
+        already seen, so fetching older history costs the same at any depth.
         
         Args:
             group_id: The group's ID
             user_id: Current user's ID (for authorization)
             limit: Maximum number of messages
-            offset: Number of messages to skip
+            before: Optional ``(created_at, id)`` cursor; only messages older
+                than it are returned
             
         Returns:
             Tuple of (messages list, error_message)
         """
         # Check if user is a member
-        membership = GroupMember.query.filter_by(
-            group_id=group_id,
-            user_id=user_id,
-            status='active'
-        ).first()
-        
-        if not membership:
+        if not self._is_active_member(group_id, user_id):
             return [], "Not a member of this group"
         
-        messages = GroupMessage.query.filter_by(
-            group_id=group_id
-        ).order_by(GroupMessage.created_at.desc()).offset(offset).limit(limit).all()
+        query = GroupMessage.query.options(
+            selectinload(GroupMessage.sender)
+        ).filter_by(group_id=group_id)
+        
+        if before:
+            query = query.filter(
+                tuple_(GroupMessage.created_at, GroupMessage.id) < tuple_(*before)
+            )
+        
+        messages = query.order_by(
+            GroupMessage.created_at.desc(), GroupMessage.id.desc()
+        ).limit(limit).all()
         
         # Reverse to get chronological order
         messages = list(reversed(messages))
@@ -1,13 +1,93 @@
 """Client for Nebius AI API interactions."""
 import base64
+import hashlib
+import importlib.util
+import json
 import logging
+import math
 import os
-from typing import Generator, Optional, Union
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+from typing import Callable, Generator, Optional, Sequence, TypeVar, Union
 
+from app.services.cache import LRUCache
+from app.services.circuit_breaker import CircuitBreaker
 from app.services.nebius_config import NebiusConfig, ModelConfig
+from app.services.rate_limiter import RateLimiter
+from app.services.retry_handler import CircuitOpenError, RetryHandler
+
+# Checked once at import; without the package the client runs in fallback mode
+_OPENAI_AVAILABLE = importlib.util.find_spec('openai') is not None
+if _OPENAI_AVAILABLE:
+    from openai import (
+        APIConnectionError, DefaultHttpxClient, InternalServerError, OpenAI, RateLimitError
+    )
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar('T')
+
+# One connection pool shared by every NebiusClient, so new instances reuse
+# warm keep-alive connections instead of paying a fresh TCP+TLS handshake
+_http_client = None
+_http_client_lock = threading.Lock()
+
+
+def _shared_http_client():
+    """Get the process-wide HTTP client for the OpenAI SDK, creating it once."""
+    global _http_client
+    with _http_client_lock:
+        if _http_client is None:
+            _http_client = DefaultHttpxClient()
+        return _http_client
+
+# Requests batch_chat_completion keeps in flight by default
+DEFAULT_BATCH_CONCURRENCY = 16
+
+# Fallback embedding: a zero vector of typical embedding size. A tuple, so
+# it can be handed to every caller without copying.
+ZERO_EMBEDDING = (0.0,) * 4096
+
+# Embeddings each client keeps for repeated texts. At ~4096 floats apiece,
+# this bounds the cache to roughly 100 MB.
+EMBEDDING_CACHE_SIZE = 1024
+
+# Texts create_embeddings sends per API request by default
+DEFAULT_EMBEDDING_BATCH_SIZE = 64
+
+# Placeholder reply used while the AI service is unavailable
+FALLBACK_CHAT_TEMPLATE = (
+    "⚠️ **Fallback Mode Active**\n\n"
+    "I received your message: \"{preview}\"\n\n"
+    "{status}\n\n"
+    "**To enable real AI responses:**\n"
+    "1. Set the `NEBIUS_API_KEY` environment variable\n"
+    "2. Restart the backend server\n\n"
+    "_This is a placeholder response._"
+)
+FALLBACK_STATUS_WITH_CONTEXT = (
+    "I have context from your uploaded content, but the AI service is currently unavailable."
+)
+FALLBACK_STATUS_NO_CONTEXT = "The AI service is currently unavailable."
+
+# Leading magic bytes of the image formats vision models accept
+IMAGE_SIGNATURES = (
+    (b'\x89PNG', 'image/png'),
+    (b'\xff\xd8', 'image/jpeg'),
+    (b'GIF8', 'image/gif'),
+    (b'RIFF', 'image/webp'),
+)
+
+# Data URL prefix for each MIME type above, built once
+DATA_URL_PREFIXES = {
+    mime_type: f"data:{mime_type};base64," for _, mime_type in IMAGE_SIGNATURES
+}
+
+# Rough characters per token, for estimating a call's token cost up front
+CHARS_PER_TOKEN = 4
+
 
 class NebiusClient:
     """Client for Nebius AI API interactions using OpenAI-compatible API."""
@@ -26,12 +106,19 @@ class NebiusClient:
         """
         self._config = config or NebiusConfig.default()
         
-        # Override API key if provided directly
+        # Override API key if provided directly, without touching the caller's config
         if api_key is not None:
-            self._config.api_key = api_key
+            self._config = replace(self._config, api_key=api_key)
         
         self._client = None
         self._fallback_mode = False
+        self._embedding_cache = LRUCache(EMBEDDING_CACHE_SIZE)
+        self._limiter = RateLimiter(
+            requests_per_minute=self._config.rpm_limit,
+            tokens_per_minute=self._config.tpm_limit
+        )
+        # Sees every upstream call, so an outage trips it after a few requests
+        self._breaker = CircuitBreaker()
         
         self._initialize_client()
     
@@ -46,23 +133,27 @@ class NebiusClient:
             self._fallback_reason = "missing_api_key"
             return
         
+        if not _OPENAI_AVAILABLE:
+            logger.error(
+                "OpenAI package not installed. Running in fallback mode. "
+                "Install with: pip install openai"
+            )
+            self._fallback_mode = True
+            self._fallback_reason = "missing_openai_package"
+            return
+        
         try:
-            from openai import OpenAI
-            
+            # Retries are handled by the caller's RetryHandler using our own config
             self._client = OpenAI(
                 api_key=self._config.api_key,
-                base_url=self._config.base_url
+                base_url=self._config.base_url,
+                timeout=self._config.timeout,
+                max_retries=0,
+                http_client=_shared_http_client()
             )
             self._fallback_mode = False
             self._fallback_reason = None
             logger.info("Nebius client initialized successfully")
-        except ImportError:
-            logger.error(
-                "OpenAI package not installed. Running in fallback mode. "
-                "Install with: pip install openai"
-            )
-            self._fallback_mode = True
-            self._fallback_reason = "missing_openai_package"
         except Exception as e:
             logger.error(f"Failed to initialize Nebius client: {e}. Running in fallback mode.")
             self._fallback_mode = True
@@ -83,6 +174,105 @@ class NebiusClient:
         """Get the current configuration."""
         return self._config
     
+    def _throttle(self, estimated_tokens: int) -> None:
+        """Wait until the configured RPM/TPM budget allows another call."""
+        self._limiter.acquire(estimated_tokens)
+    
+    def _note_rate_limit(self, error: Exception) -> None:
+        """Hold back further calls for the Retry-After of a 429, if given."""
+        retry_after = RetryHandler().get_retry_after(error)
+        if retry_after:
+            self._limiter.pause(retry_after)
+    
+    @staticmethod
+    def _is_transient(error: Exception) -> bool:
+        """Check if an error means the service is failing rather than rejecting the call."""
+        if not _OPENAI_AVAILABLE:
+            return False
+        # APITimeoutError is a subclass of APIConnectionError
+        return isinstance(error, (RateLimitError, APIConnectionError, InternalServerError))
+    
+    def _guarded_call(self, call: Callable[[str], T], model_id: str) -> T:
+        """
+        Make a single upstream call through the circuit breaker.
+        
+        Raises:
+            CircuitOpenError: Without calling the API, while the circuit is open.
+        """
+        if not self._breaker.allow():
+            retry_in = self._breaker.retry_in()
+            raise CircuitOpenError(
+                "Circuit open: AI service calls are paused after repeated failures",
+                retry_after=math.ceil(retry_in) if retry_in > 0 else None
+            )
+        
+        try:
+            result = call(model_id)
+        except Exception as e:
+            if self._is_transient(e):
+                self._breaker.record_failure()
+            else:
+                # The service answered, so it counts as reachable
+                self._breaker.record_success()
+            raise
+        
+        self._breaker.record_success()
+        return result
+    
+    def _call_with_fallback(
+        self,
+        call: Callable[[str], T],
+        model_config: ModelConfig,
+        model: str,
+        use_fallback: bool,
+        operation: str
+    ) -> T:
+        """
+        Run an API call once, then once more on the fallback model.
+        
+        Each model gets a single attempt with no backoff: retrying is left
+        to the caller's RetryHandler, so the two layers never multiply into
+        repeated calls against a struggling service. A 429 with Retry-After
+        still pauses the shared rate limiter for every caller, and every
+        attempt counts toward the circuit breaker.
+        
+        Args:
+            call: Function taking a model ID and performing the request.
+            model_config: Config of the model family being called.
+            model: Model ID to try first.
+            use_fallback: Whether model is already the fallback.
+            operation: Name of the operation, for logging.
+            
+        Returns:
+            The result of call.
+            
+        Raises:
+            CircuitOpenError: If the circuit breaker refuses the call.
+            The last exception if every model fails.
+        """
+        models = [model]
+        if not use_fallback and model_config.fallback_model_id:
+            models.append(model_config.fallback_model_id)
+        
+        last_error: Optional[Exception] = None
+        for index, model_id in enumerate(models):
+            if index > 0:
+                logger.warning(
+                    f"Primary model '{models[0]}' failed: {last_error}. "
+                    f"Trying fallback model '{model_id}'"
+                )
+            
+            try:
+                return self._guarded_call(call, model_id)
+            except CircuitOpenError:
+                raise
+            except Exception as e:
+                last_error = e
+                self._note_rate_limit(e)
+        
+        logger.error(f"{operation} failed: {last_error}")
+        raise last_error
+    
     def chat_completion(
         self,
         messages: list[dict],
@@ -115,43 +305,107 @@ class NebiusClient:
         if model is None:
             model = model_config.get_model_id_with_fallback(use_fallback)
         
-        try:
+        if temperature is None:
+            temperature = model_config.temperature
+        if max_tokens is None:
+            max_tokens = model_config.max_tokens
+        estimated_tokens = len(json.dumps(messages)) // CHARS_PER_TOKEN + max_tokens
+        
+        def create(model_id: str) -> Union[str, Generator[str, None, None]]:
+            self._throttle(estimated_tokens)
             response = self._client.chat.completions.create(
-                model=model,
+                model=model_id,
                 messages=messages,
-                temperature=temperature if temperature is not None else model_config.temperature,
-                max_tokens=max_tokens if max_tokens is not None else model_config.max_tokens,
+                temperature=temperature,
+                max_tokens=max_tokens,
                 stream=stream
             )
             
             if stream:
                 return self._stream_response(response)
-            else:
-                return response.choices[0].message.content or ""
-                
-        except Exception as e:
-            # If primary model fails and we haven't tried fallback yet, try fallback
-            if not use_fallback and model_config.fallback_model_id:
-                logger.warning(
-                    f"Primary model '{model}' failed: {e}. "
-                    f"Trying fallback model '{model_config.fallback_model_id}'"
-                )
-                return self.chat_completion(
-                    messages=messages,
-                    model=model_config.fallback_model_id,
-                    temperature=temperature,
-                    max_tokens=max_tokens,
-                    stream=stream,
-                    use_fallback=True
-                )
-            logger.error(f"Chat completion failed: {e}")
-            raise
+            return response.choices[0].message.content or ""
+        
+        return self._call_with_fallback(
+            create, model_config, model, use_fallback, "Chat completion"
+        )
+    
+    def batch_chat_completion(
+        self,
+        batch: list[list[dict]],
+        model: Optional[str] = None,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        max_concurrency: int = DEFAULT_BATCH_CONCURRENCY
+    ) -> list[str]:
+        """
+        Generate several chat completions concurrently.
+        
+        Each conversation goes through chat_completion (including its model
+        fallback); up to max_concurrency requests are in flight at once, so
+        a batch takes roughly as long as its slowest calls rather than the
+        sum of all of them.
+        
+        Args:
+            batch: List of message lists, one per completion.
+            model: Model identifier. Uses tutor_model from config if None.
+            temperature: Sampling temperature (0-2). Uses config default if None.
+            max_tokens: Maximum tokens to generate. Uses config default if None.
+            max_concurrency: Maximum number of requests in flight.
+            
+        Returns:
+            Generated texts, in the order of batch.
+            
+        Raises:
+            Exception: The first failure, if any completion fails.
+        """
+        if not batch:
+            return []
+        
+        def complete(messages: list[dict]) -> str:
+            return self.chat_completion(
+                messages=messages,
+                model=model,
+                temperature=temperature,
+                max_tokens=max_tokens
+            )
+        
+        with ThreadPoolExecutor(
+            max_workers=min(max_concurrency, len(batch)),
+            thread_name_prefix='nebius-batch'
+        ) as executor:
+            return list(executor.map(complete, batch))
     
     def _stream_response(self, response) -> Generator[str, None, None]:
-        """Stream response chunks."""
+        """
+        Stream response text in evenly sized pieces.
+        
+        Tiny deltas are buffered until at least stream_min_chunk characters
+        are pending, and oversized ones are split into stream_max_chunk
+        pieces (optionally paced by stream_throttle_ms), so clients get
+        fewer, steadier frames regardless of how the model chunks output.
+        """
+        min_chunk = self._config.stream_min_chunk
+        max_chunk = self._config.stream_max_chunk
+        throttle = self._config.stream_throttle_ms / 1000.0
+        buffer = ""
+        
         for chunk in response:
-            if chunk.choices and chunk.choices[0].delta.content:
-                yield chunk.choices[0].delta.content
+            if not (chunk.choices and chunk.choices[0].delta.content):
+                continue
+            buffer += chunk.choices[0].delta.content
+            
+            while len(buffer) > max_chunk:
+                yield buffer[:max_chunk]
+                buffer = buffer[max_chunk:]
+                if throttle > 0:
+                    time.sleep(throttle)
+            
+            if len(buffer) >= min_chunk:
+                yield buffer
+                buffer = ""
+        
+        if buffer:
+            yield buffer
     
     def _fallback_chat_response(
         self,
@@ -163,10 +417,11 @@ class NebiusClient:
         has_context = False
         
         for msg in messages:
+            content = msg.get("content", "")
             if msg.get("role") == "user":
-                user_message = msg.get("content", "")
+                user_message = content
             # Check if there's a context message
-            if "Content Context:" in msg.get("content", ""):
+            if "Content Context:" in content:
                 has_context = True
         
         # Log warning about fallback mode
@@ -175,26 +430,10 @@ class NebiusClient:
             f"User message preview: '{user_message[:50]}...'"
         )
         
-        if has_context:
-            fallback_text = (
-                f"⚠️ **Fallback Mode Active**\n\n"
-                f"I received your message: \"{user_message[:100]}{'...' if len(user_message) > 100 else ''}\"\n\n"
-                "I have context from your uploaded content, but the AI service is currently unavailable.\n\n"
-                "**To enable real AI responses:**\n"
-                "1. Set the `NEBIUS_API_KEY` environment variable\n"
-                "2. Restart the backend server\n\n"
-                "_This is a placeholder response._"
-            )
-        else:
-            fallback_text = (
-                f"⚠️ **Fallback Mode Active**\n\n"
-                f"I received your message: \"{user_message[:100]}{'...' if len(user_message) > 100 else ''}\"\n\n"
-                "The AI service is currently unavailable.\n\n"
-                "**To enable real AI responses:**\n"
-                "1. Set the `NEBIUS_API_KEY` environment variable\n"
-                "2. Restart the backend server\n\n"
-                "_This is a placeholder response._"
-            )
+        fallback_text = FALLBACK_CHAT_TEMPLATE.format(
+            preview=user_message[:100] + ('...' if len(user_message) > 100 else ''),
+            status=FALLBACK_STATUS_WITH_CONTEXT if has_context else FALLBACK_STATUS_NO_CONTEXT
+        )
         
         if stream:
             def stream_fallback():
@@ -209,7 +448,7 @@ class NebiusClient:
     def vision_completion(
         self,
         prompt: str,
-        image_data: Union[bytes, str],
+        image_data: Union[bytes, bytearray, memoryview, str],
         model: Optional[str] = None,
         temperature: Optional[float] = None,
         max_tokens: Optional[int] = None,
@@ -220,7 +459,7 @@ class NebiusClient:
         
         Args:
             prompt: Text prompt describing what to analyze.
-            image_data: Base64 encoded image string or raw bytes.
+            image_data: Base64 encoded image string or raw bytes (PNG, JPEG, GIF or WebP).
             model: Vision model identifier. Uses vision_model from config if None.
             temperature: Sampling temperature. Uses config default if None.
             max_tokens: Maximum tokens. Uses config default if None.
@@ -238,15 +477,19 @@ class NebiusClient:
         if model is None:
             model = model_config.get_model_id_with_fallback(use_fallback)
         
-        # Convert bytes to base64 if needed
-        if isinstance(image_data, bytes):
-            image_base64 = base64.b64encode(image_data).decode('utf-8')
-        else:
-            image_base64 = image_data
+        # Build the data URL once, outside the retry loop
+        image_url = self._image_data_url(image_data)
         
-        try:
+        if temperature is None:
+            temperature = model_config.temperature
+        if max_tokens is None:
+            max_tokens = model_config.max_tokens
+        estimated_tokens = len(prompt) // CHARS_PER_TOKEN + max_tokens
+        
+        def create(model_id: str) -> str:
+            self._throttle(estimated_tokens)
             response = self._client.chat.completions.create(
-                model=model,
+                model=model_id,
                 messages=[
                     {
                         "role": "user",
@@ -255,35 +498,59 @@ class NebiusClient:
                             {
                                 "type": "image_url",
                                 "image_url": {
-                                    "url": f"data:image/jpeg;base64,{image_base64}"
+                                    "url": image_url
                                 }
                             }
                         ]
                     }
                 ],
-                temperature=temperature if temperature is not None else model_config.temperature,
-                max_tokens=max_tokens if max_tokens is not None else model_config.max_tokens
+                temperature=temperature,
+                max_tokens=max_tokens
             )
             
             return response.choices[0].message.content or ""
+        
+        return self._call_with_fallback(
+            create, model_config, model, use_fallback, "Vision completion"
+        )
+    
+    @staticmethod
+    def _detect_image_type(header: bytes) -> str:
+        """Guess an image's MIME type from its first bytes, defaulting to JPEG."""
+        for signature, mime_type in IMAGE_SIGNATURES:
+            if header.startswith(signature):
+                return mime_type
+        return 'image/jpeg'
+    
+    @classmethod
+    def _image_data_url(cls, image_data: Union[bytes, bytearray, memoryview, str]) -> str:
+        """
+        Build the base64 data URL sent to the vision model.
+        
+        Raw bytes are encoded straight from a memoryview (no intermediate
+        copy), and the MIME type is taken from the image's magic bytes
+        rather than always claiming JPEG.
+        
+        Args:
+            image_data: Raw image bytes or a base64 encoded string.
             
-        except Exception as e:
-            # If primary model fails and we haven't tried fallback yet, try fallback
-            if not use_fallback and model_config.fallback_model_id:
-                logger.warning(
-                    f"Primary vision model '{model}' failed: {e}. "
-                    f"Trying fallback model '{model_config.fallback_model_id}'"
-                )
-                return self.vision_completion(
-                    prompt=prompt,
-                    image_data=image_data,
-                    model=model_config.fallback_model_id,
-                    temperature=temperature,
-                    max_tokens=max_tokens,
-                    use_fallback=True
-                )
-            logger.error(f"Vision completion failed: {e}")
-            raise
+        Returns:
+            A data: URL for the image.
+        """
+        if isinstance(image_data, str):
+            image_base64 = image_data
+            # Enough base64 characters to decode the longest signature
+            prefix = image_data[:8]
+            try:
+                header = base64.b64decode(prefix + '=' * (-len(prefix) % 4))
+            except ValueError:
+                header = b''
+        else:
+            view = memoryview(image_data)
+            header = bytes(view[:4])
+            image_base64 = base64.b64encode(view).decode('ascii')
+        
+        return DATA_URL_PREFIXES[cls._detect_image_type(header)] + image_base64
     
     def _fallback_vision_response(self, prompt: str) -> str:
         """Generate fallback response for vision requests."""
@@ -306,7 +573,7 @@ class NebiusClient:
         text: str,
         model: Optional[str] = None,
         use_fallback: bool = False
-    ) -> list[float]:
+    ) -> Sequence[float]:
         """
         Create an embedding vector for text.
         
@@ -318,8 +585,38 @@ class NebiusClient:
         Returns:
             Embedding vector (dimensions depend on model).
         """
+        return self.create_embeddings([text], model=model, use_fallback=use_fallback)[0]
+    
+    def create_embeddings(
+        self,
+        texts: list[str],
+        batch_size: int = DEFAULT_EMBEDDING_BATCH_SIZE,
+        model: Optional[str] = None,
+        use_fallback: bool = False
+    ) -> list[Sequence[float]]:
+        """
+        Create embedding vectors for several texts.
+        
+        Texts are sent batch_size at a time in a single request each, so N
+        texts cost ceil(N / batch_size) round trips instead of N. Results are
+        kept in a per-client LRU cache keyed by model and text digest, so
+        repeated texts (within a call or across calls) are only embedded once.
+        
+        Args:
+            texts: Texts to embed.
+            batch_size: Maximum number of texts per API request.
+            model: Embedding model identifier. Uses embedding_model from config if None.
+            use_fallback: Whether to use the fallback model.
+            
+        Returns:
+            Embedding vectors (read-only tuples), in the order of texts. In
+            fallback mode these are all the shared ZERO_EMBEDDING.
+        """
+        if not texts:
+            return []
+        
         if self._fallback_mode:
-            return self._fallback_embedding()
+            return self._fallback_embeddings(len(texts))
         
         model_config = self._config.embedding_model
         
@@ -327,33 +624,58 @@ class NebiusClient:
         if model is None:
             model = model_config.get_model_id_with_fallback(use_fallback)
         
-        try:
-            response = self._client.embeddings.create(
-                model=model,
-                input=text
-            )
-            
-            return response.data[0].embedding
+        keys = [(model, self._text_digest(text)) for text in texts]
+        embeddings = [self._embedding_cache.get(key) for key in keys]
+        
+        # Each distinct uncached text is requested once
+        missing = {}
+        for key, text, embedding in zip(keys, texts, embeddings):
+            if embedding is None:
+                missing.setdefault(key, text)
+        pending = list(missing.items())
+        
+        fetched = {}
+        for start in range(0, len(pending), batch_size):
+            batch = pending[start:start + batch_size]
             
-        except Exception as e:
-            # If primary model fails and we haven't tried fallback yet, try fallback
-            if not use_fallback and model_config.fallback_model_id:
-                logger.warning(
-                    f"Primary embedding model '{model}' failed: {e}. "
-                    f"Trying fallback model '{model_config.fallback_model_id}'"
-                )
-                return self.create_embedding(
-                    text=text,
-                    model=model_config.fallback_model_id,
-                    use_fallback=True
+            def create(model_id: str, batch: list = batch) -> tuple:
+                self._throttle(sum(len(text) for _, text in batch) // CHARS_PER_TOKEN)
+                response = self._client.embeddings.create(
+                    model=model_id,
+                    input=[text for _, text in batch]
                 )
-            logger.error(f"Embedding creation failed: {e}")
-            raise
+                
+                # The API reports each vector's input position; don't rely on order
+                data = sorted(response.data, key=lambda item: item.index)
+                return model_id, [tuple(item.embedding) for item in data]
+            
+            used_model, vectors = self._call_with_fallback(
+                create, model_config, model, use_fallback, "Embedding creation"
+            )
+            for (key, _), vector in zip(batch, vectors):
+                fetched[key] = vector
+                # Vectors from the fallback model must not answer for the requested one
+                if used_model == model:
+                    self._embedding_cache.set(key, vector)
+        
+        return [
+            embedding if embedding is not None else fetched[key]
+            for key, embedding in zip(keys, embeddings)
+        ]
+    
+    @staticmethod
+    def _text_digest(text: str) -> bytes:
+        """Short fixed-size digest of a text, used in embedding cache keys."""
+        return hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+    
+    def clear_embedding_cache(self) -> None:
+        """Drop every cached embedding."""
+        self._embedding_cache.clear()
     
-    def _fallback_embedding(self) -> list[float]:
-        """Generate fallback embedding when API is unavailable."""
+    def _fallback_embeddings(self, count: int) -> list[Sequence[float]]:
+        """Generate fallback embeddings when API is unavailable."""
         logger.warning(
-            f"Returning fallback embedding (zero vector). Reason: {self._fallback_reason}"
+            f"Returning {count} fallback embedding(s) (zero vectors). "
+            f"Reason: {self._fallback_reason}"
         )
-        # Return a zero vector of typical embedding size
-        return [0.0] * 4096
+        return [ZERO_EMBEDDING] * count
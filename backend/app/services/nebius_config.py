@@ -1,12 +1,13 @@
 """Configuration management for Nebius AI integration."""
 import json
 import os
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
+from functools import partial
 from pathlib import Path
 from typing import Optional
 
 
-@dataclass
+@dataclass(slots=True)
 class ModelConfig:
     """Configuration for a specific AI model."""
     model_id: str
@@ -45,43 +46,56 @@ class ModelConfig:
         return self.model_id
 
 
-@dataclass
+# Built once at import; configs get their own copies since they are mutable
+DEFAULT_TUTOR_MODEL = ModelConfig(
+    model_id="openai/gpt-oss-120b",
+    temperature=0.7,
+    max_tokens=2048,
+    fallback_model_id="deepseek-ai/DeepSeek-V3"
+)
+DEFAULT_QUIZ_MODEL = ModelConfig(
+    model_id="openai/gpt-oss-120b",
+    temperature=0.3,
+    max_tokens=4096,
+    fallback_model_id="deepseek-ai/DeepSeek-V3"
+)
+DEFAULT_CONTENT_MODEL = ModelConfig(
+    model_id="openai/gpt-oss-120b",
+    temperature=0.5,
+    max_tokens=4096,
+    fallback_model_id="deepseek-ai/DeepSeek-V3"
+)
+DEFAULT_VISION_MODEL = ModelConfig(
+    model_id="google/gemma-3-27b-it-fast",
+    temperature=0.5,
+    max_tokens=2048,
+    fallback_model_id="google/gemma-3-27b-it"
+)
+DEFAULT_EMBEDDING_MODEL = ModelConfig(
+    model_id="intfloat/e5-mistral-7b-instruct",
+    fallback_model_id="BAAI/bge-en-icl"
+)
+
+
+@dataclass(slots=True)
 class NebiusConfig:
     """Configuration for Nebius AI integration."""
     api_key: Optional[str]
     base_url: str = "https://api.studio.nebius.com/v1/"
-    tutor_model: ModelConfig = field(default_factory=lambda: ModelConfig(
-        model_id="openai/gpt-oss-120b",
-        temperature=0.7,
-        max_tokens=2048,
-        fallback_model_id="deepseek-ai/DeepSeek-V3"
-    ))
-    quiz_model: ModelConfig = field(default_factory=lambda: ModelConfig(
-        model_id="openai/gpt-oss-120b",
-        temperature=0.3,
-        max_tokens=4096,
-        fallback_model_id="deepseek-ai/DeepSeek-V3"
-    ))
-    content_model: ModelConfig = field(default_factory=lambda: ModelConfig(
-        model_id="openai/gpt-oss-120b",
-        temperature=0.5,
-        max_tokens=4096,
-        fallback_model_id="deepseek-ai/DeepSeek-V3"
-    ))
-    vision_model: ModelConfig = field(default_factory=lambda: ModelConfig(
-        model_id="google/gemma-3-27b-it-fast",
-        temperature=0.5,
-        max_tokens=2048,
-        fallback_model_id="google/gemma-3-27b-it"
-    ))
-    embedding_model: ModelConfig = field(default_factory=lambda: ModelConfig(
-        model_id="intfloat/e5-mistral-7b-instruct",
-        fallback_model_id="BAAI/bge-en-icl"
-    ))
+    tutor_model: ModelConfig = field(default_factory=partial(replace, DEFAULT_TUTOR_MODEL))
+    quiz_model: ModelConfig = field(default_factory=partial(replace, DEFAULT_QUIZ_MODEL))
+    content_model: ModelConfig = field(default_factory=partial(replace, DEFAULT_CONTENT_MODEL))
+    vision_model: ModelConfig = field(default_factory=partial(replace, DEFAULT_VISION_MODEL))
+    embedding_model: ModelConfig = field(default_factory=partial(replace, DEFAULT_EMBEDDING_MODEL))
     retry_attempts: int = 3
     retry_delay: float = 1.0
     max_retry_delay: float = 30.0
     timeout: float = 30.0
+    rpm_limit: Optional[int] = None
+    tpm_limit: Optional[int] = None
+    stream_min_chunk: int = 16
+    stream_max_chunk: int = 50
+    stream_throttle_ms: float = 0.0
     
     @classmethod
     def from_file(cls, path: str) -> "NebiusConfig":
@@ -104,6 +118,8 @@ class NebiusConfig:
         nebius_data = data.get("nebius", data)
         models_data = nebius_data.get("models", {})
         retry_data = nebius_data.get("retry", {})
+        rate_limit_data = nebius_data.get("rate_limit", {})
+        streaming_data = nebius_data.get("streaming", {})
         
         # Load API key from environment variable
         api_key = os.environ.get("NEBIUS_API_KEY")
@@ -119,7 +135,12 @@ class NebiusConfig:
             retry_attempts=retry_data.get("max_attempts", 3),
             retry_delay=retry_data.get("base_delay", 1.0),
             max_retry_delay=retry_data.get("max_delay", 30.0),
-            timeout=nebius_data.get("timeout", 30.0)
+            timeout=nebius_data.get("timeout", 30.0),
+            rpm_limit=rate_limit_data.get("requests_per_minute"),
+            tpm_limit=rate_limit_data.get("tokens_per_minute"),
+            stream_min_chunk=streaming_data.get("min_chunk", 16),
+            stream_max_chunk=streaming_data.get("max_chunk", 50),
+            stream_throttle_ms=streaming_data.get("throttle_ms", 0.0)
         )
     
     @classmethod
@@ -132,59 +153,27 @@ class NebiusConfig:
         Returns:
             NebiusConfig instance with default settings.
         """
-        api_key = os.environ.get("NEBIUS_API_KEY")
-        
-        return cls(
-            api_key=api_key,
-            tutor_model=cls._default_tutor_model(),
-            quiz_model=cls._default_quiz_model(),
-            content_model=cls._default_content_model(),
-            vision_model=cls._default_vision_model(),
-            embedding_model=cls._default_embedding_model()
-        )
+        return cls(api_key=os.environ.get("NEBIUS_API_KEY"))
     
     @staticmethod
     def _default_tutor_model() -> ModelConfig:
-        return ModelConfig(
-            model_id="openai/gpt-oss-120b",
-            temperature=0.7,
-            max_tokens=2048,
-            fallback_model_id="deepseek-ai/DeepSeek-V3"
-        )
+        return replace(DEFAULT_TUTOR_MODEL)
     
     @staticmethod
     def _default_quiz_model() -> ModelConfig:
-        return ModelConfig(
-            model_id="openai/gpt-oss-120b",
-            temperature=0.3,
-            max_tokens=4096,
-            fallback_model_id="deepseek-ai/DeepSeek-V3"
-        )
+        return replace(DEFAULT_QUIZ_MODEL)
     
     @staticmethod
     def _default_content_model() -> ModelConfig:
-        return ModelConfig(
-            model_id="openai/gpt-oss-120b",
-            temperature=0.5,
-            max_tokens=4096,
-            fallback_model_id="deepseek-ai/DeepSeek-V3"
-        )
+        return replace(DEFAULT_CONTENT_MODEL)
     
     @staticmethod
     def _default_vision_model() -> ModelConfig:
-        return ModelConfig(
-            model_id="google/gemma-3-27b-it-fast",
-            temperature=0.5,
-            max_tokens=2048,
-            fallback_model_id="google/gemma-3-27b-it"
-        )
+        return replace(DEFAULT_VISION_MODEL)
     
     @staticmethod
     def _default_embedding_model() -> ModelConfig:
-        return ModelConfig(
-            model_id="intfloat/e5-mistral-7b-instruct",
-            fallback_model_id="BAAI/bge-en-icl"
-        )
+        return replace(DEFAULT_EMBEDDING_MODEL)
     
     def has_api_key(self) -> bool:
         """Check if API key is configured."""
@@ -207,6 +196,15 @@ class NebiusConfig:
                     "base_delay": self.retry_delay,
                     "max_delay": self.max_retry_delay
                 },
+                "rate_limit": {
+                    "requests_per_minute": self.rpm_limit,
+                    "tokens_per_minute": self.tpm_limit
+                },
+                "streaming": {
+                    "min_chunk": self.stream_min_chunk,
+                    "max_chunk": self.stream_max_chunk,
+                    "throttle_ms": self.stream_throttle_ms
+                },
                 "timeout": self.timeout
             }
         }
@@ -3,9 +3,57 @@ Presence service for tracking user online status.
 """
 from datetime import datetime
 from typing import List, Optional, Dict
+from sqlalchemy import update
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from app.database import db
 from app.models.user_presence import UserPresence
 from app.models.friend import Friend
+from app.services.cache import cache
+
+
+# Seconds a user's cached presence stays valid. Entries are dropped whenever
+# this process writes the user's presence; the TTL bounds how long another
+# worker's write can go unseen.
+PRESENCE_CACHE_TTL = 10
+
+
+def _presence_key(user_id: str) -> str:
+    """Cache key for a user's presence and live socket ID."""
+    return f"presence:{user_id}"
+
+
+def _upsert_presence(values: dict):
+    """
+    Build an INSERT that updates the existing row for the same user instead.
+    
+    Args:
+        values: Column values for the user's presence row (must include user_id)
+        
+    Returns:
+        Upsert statement for the session's dialect
+        
+    Raises:
+        NotImplementedError: If the dialect has no upsert here
+    """
+    dialect = db.session.get_bind().dialect.name
+    changes = {key: value for key, value in values.items() if key != 'user_id'}
+    
+    if dialect == 'sqlite':
+        return sqlite_insert(UserPresence).values(**values).on_conflict_do_update(
+            index_elements=['user_id'], set_=changes
+        )
+    
+    if dialect == 'postgresql':
+        return postgresql_insert(UserPresence).values(**values).on_conflict_do_update(
+            index_elements=['user_id'], set_=changes
+        )
+    
+    if dialect == 'mysql':
+        return mysql_insert(UserPresence).values(**values).on_duplicate_key_update(**changes)
+    
+    raise NotImplementedError(f"Presence upsert is not supported on '{dialect}'")
 
 
 class PresenceService:
@@ -22,25 +70,13 @@ class PresenceService:
         Returns:
             UserPresence object
         """
-        presence = UserPresence.query.filter_by(user_id=user_id).first()
-        
-        if presence:
-            presence.is_online = True
-            presence.socket_id = socket_id
-            presence.last_seen = datetime.utcnow()
-            presence.current_status = 'available'
-        else:
-            presence = UserPresence(
-                user_id=user_id,
-                is_online=True,
-                socket_id=socket_id,
-                last_seen=datetime.utcnow(),
-                current_status='available'
-            )
-            db.session.add(presence)
-        
-        db.session.commit()
-        return presence
+        return self._write_presence(_upsert_presence({
+            'user_id': user_id,
+            'is_online': True,
+            'socket_id': socket_id,
+            'last_seen': datetime.utcnow(),
+            'current_status': 'available'
+        }), user_id)
     
     def set_offline(self, user_id: str) -> Optional[UserPresence]:
         """
@@ -52,16 +88,15 @@ class PresenceService:
         Returns:
             UserPresence object or None
         """
-        presence = UserPresence.query.filter_by(user_id=user_id).first()
-        
-        if presence:
-            presence.is_online = False
-            presence.socket_id = None
-            presence.last_seen = datetime.utcnow()
-            presence.current_status = 'available'
-            db.session.commit()
-        
-        return presence
+        return self._write_presence(
+            update(UserPresence).where(UserPresence.user_id == user_id).values(
+                is_online=False,
+                socket_id=None,
+                last_seen=datetime.utcnow(),
+                current_status='available'
+            ),
+            user_id
+        )
     
     def set_status(self, user_id: str, status: str) -> Optional[UserPresence]:
         """
@@ -78,14 +113,86 @@ class PresenceService:
         if status not in valid_statuses:
             return None
         
-        presence = UserPresence.query.filter_by(user_id=user_id).first()
+        return self._write_presence(
+            update(UserPresence).where(UserPresence.user_id == user_id).values(
+                current_status=status
+            ),
+            user_id
+        )
+    
+    def _write_presence(self, statement, user_id: str) -> Optional[UserPresence]:
+        """
+        Run a single-statement presence write and commit it.
         
-        if presence:
-            presence.current_status = status
+        The written row comes back through RETURNING where the dialect
+        supports it, so the write is one round trip; otherwise it is
+        looked up afterwards.
+        
+        Args:
+            statement: INSERT/UPSERT or UPDATE on the user's presence row
+            user_id: The user's ID
+            
+        Returns:
+            UserPresence object, or None if no row was written
+        """
+        dialect = db.session.get_bind().dialect
+        returning = dialect.insert_returning if statement.is_insert else dialect.update_returning
+        
+        if returning:
+            presence = db.session.scalars(
+                statement.returning(UserPresence),
+                execution_options={'populate_existing': True}
+            ).first()
             db.session.commit()
+        else:
+            db.session.execute(statement)
+            db.session.commit()
+            presence = UserPresence.query.filter_by(user_id=user_id).first()
         
+        cache.invalidate(_presence_key(user_id))
         return presence
     
+    def _get_cached_presence(self, user_id: str) -> dict:
+        """
+        Get a user's presence dict and live socket ID, cached briefly.
+        
+        Presence is read on nearly every socket event, so one lookup
+        serves both get_presence and get_socket_id for a few seconds.
+        
+        Args:
+            user_id: The user's ID
+            
+        Returns:
+            Dict with 'presence' (presence dictionary) and 'socketId'
+            (socket ID if the user is online, else None)
+        """
+        entry = cache.get(_presence_key(user_id))
+        if entry is not None:
+            return entry
+        
+        row = db.session.query(
+            UserPresence.is_online,
+            UserPresence.last_seen,
+            UserPresence.current_status,
+            UserPresence.socket_id
+        ).filter(
+            UserPresence.user_id == user_id
+        ).first()
+        
+        if row:
+            entry = {
+                'presence': UserPresence.build_dict(
+                    user_id, row.is_online, row.last_seen, row.current_status
+                ),
+                'socketId': row.socket_id if row.is_online else None
+            }
+        else:
+            # Default offline status if no presence record
+            entry = {'presence': UserPresence.build_dict(user_id), 'socketId': None}
+        
+        cache.set(_presence_key(user_id), entry, PRESENCE_CACHE_TTL)
+        return entry
+    
     def get_presence(self, user_id: str) -> Optional[dict]:
         """
         Get a user's presence status.
@@ -96,18 +203,7 @@ class PresenceService:
         Returns:
             Presence dictionary or None
         """
-        presence = UserPresence.query.filter_by(user_id=user_id).first()
-        
-        if presence:
-            return presence.to_dict()
-        
-        # Return default offline status if no presence record
-        return {
-            'userId': user_id,
-            'isOnline': False,
-            'lastSeen': None,
-            'status': 'available'
-        }
+        return self._get_cached_presence(user_id)['presence']
     
     def get_friends_presence(self, user_id: str) -> List[dict]:
         """
@@ -119,35 +215,24 @@ class PresenceService:
         Returns:
             List of presence dictionaries for friends
         """
-        # Get all friend IDs
-        friendships = Friend.query.filter_by(user_id=user_id).all()
-        friend_ids = [f.friend_id for f in friendships]
-        
-        if not friend_ids:
-            return []
-        
-        # Get presence for all friends
-        presences = UserPresence.query.filter(
-            UserPresence.user_id.in_(friend_ids)
+        # Friends with their presence in one query (defaults to offline if no record)
+        rows = db.session.query(
+            Friend.friend_id,
+            UserPresence.is_online,
+            UserPresence.last_seen,
+            UserPresence.current_status
+        ).outerjoin(
+            UserPresence, UserPresence.user_id == Friend.friend_id
+        ).filter(
+            Friend.user_id == user_id
         ).all()
         
-        # Create a map of user_id to presence
-        presence_map = {p.user_id: p.to_dict() for p in presences}
-        
-        # Return presence for all friends (default to offline if no record)
-        result = []
-        for friend_id in friend_ids:
-            if friend_id in presence_map:
-                result.append(presence_map[friend_id])
-            else:
-                result.append({
-                    'userId': friend_id,
-                    'isOnline': False,
-                    'lastSeen': None,
-                    'status': 'available'
-                })
-        
-        return result
+        return [
+            UserPresence.build_dict(
+                row.friend_id, row.is_online, row.last_seen, row.current_status
+            )
+            for row in rows
+        ]
     
     def get_online_friends(self, user_id: str) -> List[str]:
         """
@@ -159,20 +244,14 @@ class PresenceService:
         Returns:
             List of online friend user IDs
         """
-        # Get all friend IDs
-        friendships = Friend.query.filter_by(user_id=user_id).all()
-        friend_ids = [f.friend_id for f in friendships]
-        
-        if not friend_ids:
-            return []
-        
-        # Get online friends
-        online_presences = UserPresence.query.filter(
-            UserPresence.user_id.in_(friend_ids),
+        rows = db.session.query(Friend.friend_id).join(
+            UserPresence, UserPresence.user_id == Friend.friend_id
+        ).filter(
+            Friend.user_id == user_id,
             UserPresence.is_online == True
         ).all()
         
-        return [p.user_id for p in online_presences]
+        return [row.friend_id for row in rows]
     
     def get_socket_id(self, user_id: str) -> Optional[str]:
         """
@@ -184,12 +263,7 @@ class PresenceService:
         Returns:
             Socket ID or None
         """
-        presence = UserPresence.query.filter_by(user_id=user_id).first()
-        
-        if presence and presence.is_online:
-            return presence.socket_id
-        
-        return None
+        return self._get_cached_presence(user_id)['socketId']
     
     def get_socket_ids_for_users(self, user_ids: List[str]) -> Dict[str, str]:
         """
@@ -201,12 +275,17 @@ class PresenceService:
         Returns:
             Dictionary mapping user_id to socket_id
         """
-        presences = UserPresence.query.filter(
+        if not user_ids:
+            return {}
+        
+        rows = db.session.query(UserPresence.user_id, UserPresence.socket_id).filter(
             UserPresence.user_id.in_(user_ids),
-            UserPresence.is_online == True
+            UserPresence.is_online == True,
+            UserPresence.socket_id.isnot(None),
+            UserPresence.socket_id != ''
         ).all()
         
-        return {p.user_id: p.socket_id for p in presences if p.socket_id}
+        return dict(rows)
 
 
 # Singleton instance
@@ -3,12 +3,35 @@ Progress service for tracking and calculating user learning progress.
 
 Uses SQLAlchemy for database persistence of quiz results and progress tracking.
 """
-from typing import Optional, Dict, Any, List
+import json
+import uuid
 from datetime import datetime
-from collections import defaultdict
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from sqlalchemy import case, func, insert, update
+from sqlalchemy.orm import load_only
 
 from app.database import db
 from app.models.quiz_result import QuizResult
+from app.services.cache import cache
+
+
+# Seconds a cached progress summary stays valid. Summaries are also dropped
+# whenever the user records a quiz result, so this only bounds staleness
+# from writes made outside record_quiz_result.
+PROGRESS_CACHE_TTL = 30
+
+
+def _progress_key(user_id: str) -> str:
+    """Cache key for a user's progress summary."""
+    return f"progress:{user_id}"
+
+
+# Number of latest quiz results shown as recent activity
+RECENT_ACTIVITY_LIMIT = 10
+
+# Rows fetched per round trip when streaming a user's full result history
+QUIZ_RESULTS_BATCH_SIZE = 500
 
 
 class ProgressService:
@@ -42,7 +65,8 @@ class ProgressService:
             quiz_id=quiz_id,
             topic=topic,
             score=score,
-            total_questions=total_questions
+            total_questions=total_questions,
+            success_rate=self.calculate_success_rate(score, total_questions)
         )
         
         if answers:
@@ -50,9 +74,47 @@ class ProgressService:
         
         db.session.add(result)
         db.session.commit()
+        cache.invalidate(_progress_key(user_id))
         
         return result
     
+    def record_quiz_results_bulk(self, results: List[Dict[str, Any]]) -> int:
+        """
+        Record many quiz results in one INSERT and one commit.
+        
+        For importing or replaying result history, where record_quiz_result
+        would cost a round trip and a commit per row.
+        
+        Args:
+            results: Dictionaries with the arguments of record_quiz_result
+                (user_id, quiz_id, topic, score, total_questions and optional
+                answers), plus an optional created_at
+                
+        Returns:
+            Number of results recorded
+        """
+        if not results:
+            return 0
+        
+        now = datetime.utcnow()
+        rows = [{
+            'id': str(uuid.uuid4()),
+            'user_id': data['user_id'],
+            'quiz_id': data['quiz_id'],
+            'topic': data.get('topic'),
+            'score': data['score'],
+            'total_questions': data['total_questions'],
+            'answers_json': json.dumps(data['answers']) if data.get('answers') else None,
+            'success_rate': self.calculate_success_rate(data['score'], data['total_questions']),
+            'created_at': data.get('created_at') or now
+        } for data in results]
+        
+        db.session.execute(insert(QuizResult), rows)
+        db.session.commit()
+        cache.invalidate(*{_progress_key(row['user_id']) for row in rows})
+        
+        return len(rows)
+    
     def get_progress(self, user_id: str) -> Dict[str, Any]:
         """
         Get aggregated progress for a user.
@@ -71,9 +133,26 @@ class ProgressService:
         Returns:
             Dictionary containing progress metrics
         """
-        results = QuizResult.query.filter_by(user_id=user_id).all()
+        progress = cache.get(_progress_key(user_id))
+        if progress is not None:
+            return progress
         
-        if not results:
+        progress = self._calculate_progress(user_id)
+        cache.set(_progress_key(user_id), progress, PROGRESS_CACHE_TTL)
+        return progress
+    
+    def _calculate_progress(self, user_id: str) -> Dict[str, Any]:
+        """Aggregate a user's progress metrics from the database."""
+        # Overall totals, aggregated by the database
+        quiz_count, total_questions, correct_answers = db.session.query(
+            func.count(QuizResult.id),
+            func.coalesce(func.sum(QuizResult.total_questions), 0),
+            func.coalesce(func.sum(QuizResult.score), 0)
+        ).filter(
+            QuizResult.user_id == user_id
+        ).one()
+        
+        if not quiz_count:
             return {
                 'totalQuizzes': 0,
                 'totalQuestions': 0,
@@ -83,29 +162,40 @@ class ProgressService:
                 'recentActivity': []
             }
         
-        total_questions = sum(r.total_questions for r in results)
-        correct_answers = sum(r.score for r in results)
-        
-        # Calculate topic-wise progress
-        topic_stats = defaultdict(lambda: {'correct': 0, 'total': 0, 'quizzes': 0})
-        for r in results:
-            if r.topic:
-                topic_stats[r.topic]['correct'] += r.score
-                topic_stats[r.topic]['total'] += r.total_questions
-                topic_stats[r.topic]['quizzes'] += 1
+        # Topic-wise progress, one aggregated row per topic
+        topic_rows = db.session.query(
+            QuizResult.topic,
+            func.sum(QuizResult.score),
+            func.sum(QuizResult.total_questions),
+            func.count(QuizResult.id)
+        ).filter(
+            QuizResult.user_id == user_id,
+            QuizResult.topic.isnot(None),
+            QuizResult.topic != ''
+        ).group_by(
+            QuizResult.topic
+        ).all()
         
         topic_progress = {}
-        for topic, stats in topic_stats.items():
-            percentage = (stats['correct'] / stats['total'] * 100) if stats['total'] > 0 else 0.0
+        for topic, correct, total, quizzes in topic_rows:
+            percentage = (correct / total * 100) if total > 0 else 0.0
             topic_progress[topic] = {
                 'percentage': round(percentage, 1),
-                'quizzes': stats['quizzes'],
-                'correct': stats['correct'],
-                'total': stats['total']
+                'quizzes': quizzes,
+                'correct': correct,
+                'total': total
             }
         
-        # Get recent activity (last 10 results, sorted by date descending)
-        recent = sorted(results, key=lambda r: r.created_at or datetime.min, reverse=True)[:10]
+        # Get recent activity (last 10 results, sorted by date descending),
+        # loading only the columns shown so answers_json stays in the database
+        recent = QuizResult.query.filter_by(user_id=user_id).options(
+            load_only(
+                QuizResult.quiz_id, QuizResult.topic, QuizResult.score,
+                QuizResult.total_questions, QuizResult.success_rate, QuizResult.created_at
+            )
+        ).order_by(
+            QuizResult.created_at.desc()
+        ).limit(RECENT_ACTIVITY_LIMIT).all()
         recent_activity = [{
             'quizId': r.quiz_id,
             'topic': r.topic,
@@ -119,7 +209,7 @@ class ProgressService:
         success_rate = round((correct_answers / total_questions * 100), 1) if total_questions > 0 else 0.0
         
         return {
-            'totalQuizzes': len(results),
+            'totalQuizzes': quiz_count,
             'totalQuestions': total_questions,
             'correctAnswers': correct_answers,
             'successRate': success_rate,
@@ -127,19 +217,52 @@ class ProgressService:
             'recentActivity': recent_activity
         }
     
-    def get_quiz_results(self, user_id: str) -> List[QuizResult]:
+    def _quiz_results_query(self, user_id: str):
+        """Query for a user's quiz results, newest first."""
+        return QuizResult.query.filter_by(user_id=user_id).order_by(
+            QuizResult.created_at.desc(), QuizResult.id.desc()
+        )
+    
+    def get_quiz_results(
+        self,
+        user_id: str,
+        limit: Optional[int] = None,
+        offset: int = 0
+    ) -> List[QuizResult]:
         """
-        Get all quiz results for a user.
+        Get quiz results for a user, newest first.
         
         Args:
             user_id: ID of the user
+            limit: Maximum number of results (all if None)
+            offset: Number of newest results to skip
             
         Returns:
             List of QuizResult objects
         """
-        return QuizResult.query.filter_by(user_id=user_id).order_by(
-            QuizResult.created_at.desc()
-        ).all()
+        query = self._quiz_results_query(user_id)
+        
+        if offset:
+            query = query.offset(offset)
+        if limit is not None:
+            query = query.limit(limit)
+        
+        return query.all()
+    
+    def iter_quiz_results(self, user_id: str) -> Iterator[QuizResult]:
+        """
+        Stream all quiz results for a user, newest first.
+        
+        Rows are fetched QUIZ_RESULTS_BATCH_SIZE at a time, so a long history
+        is never held in memory at once.
+        
+        Args:
+            user_id: ID of the user
+            
+        Returns:
+            Iterator of QuizResult objects
+        """
+        return iter(self._quiz_results_query(user_id).yield_per(QUIZ_RESULTS_BATCH_SIZE))
     
     def get_quiz_result(self, result_id: str, user_id: str) -> Optional[QuizResult]:
         """
@@ -154,6 +277,26 @@ class ProgressService:
         """
         return QuizResult.query.filter_by(id=result_id, user_id=user_id).first()
     
+    def backfill_success_rates(self) -> None:
+        """
+        Store the percentage score on quiz results recorded without one.
+        
+        Used to backfill the denormalized column after it is added to an
+        existing database.
+        """
+        db.session.execute(
+            update(QuizResult).where(
+                QuizResult.success_rate.is_(None)
+            ).values(
+                success_rate=case(
+                    (QuizResult.total_questions > 0,
+                     func.round(QuizResult.score * 100.0 / QuizResult.total_questions, 1)),
+                    else_=0.0
+                )
+            ).execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+    
     def calculate_success_rate(self, correct: int, total: int) -> float:
         """
         Calculate success rate as a percentage.
@@ -186,6 +329,66 @@ class ProgressService:
         else:
             return "in_progress"
     
+    def _topics_with_percentage(self, user_id: str, condition: Callable) -> List[str]:
+        """
+        Get a user's topics whose overall percentage meets a condition.
+        
+        The filter runs in SQL as a HAVING clause, so only matching topic
+        names come back.
+        
+        Args:
+            user_id: ID of the user
+            condition: Callable building a SQL condition from the topic's
+                percentage expression (rounded like get_progress)
+                
+        Returns:
+            List of topic names
+        """
+        total = func.sum(QuizResult.total_questions)
+        percentage = case(
+            (total > 0, func.round(func.sum(QuizResult.score) * 100.0 / total, 1)),
+            else_=0.0
+        )
+        rows = db.session.query(QuizResult.topic).filter(
+            QuizResult.user_id == user_id,
+            QuizResult.topic.isnot(None),
+            QuizResult.topic != ''
+        ).group_by(
+            QuizResult.topic
+        ).having(
+            condition(percentage)
+        ).all()
+        return [topic for topic, in rows]
+    
+    def get_topic_buckets(self, user_id: str) -> Dict[str, List[str]]:
+        """
+        Group a user's topics by mastery category in one pass.
+        
+        Args:
+            user_id: ID of the user
+            
+        Returns:
+            Dictionary mapping "mastered", "needs_work" and "in_progress"
+            to lists of topic names
+        """
+        return self.categorize_topics(self.get_progress(user_id)['topicProgress'])
+    
+    def categorize_topics(self, topic_progress: Dict[str, Dict[str, Any]]) -> Dict[str, List[str]]:
+        """
+        Group topics by mastery category.
+        
+        Args:
+            topic_progress: The topicProgress mapping from get_progress
+            
+        Returns:
+            Dictionary mapping "mastered", "needs_work" and "in_progress"
+            to lists of topic names
+        """
+        buckets = {'mastered': [], 'needs_work': [], 'in_progress': []}
+        for topic, data in topic_progress.items():
+            buckets[self.categorize_topic_mastery(data['percentage'])].append(topic)
+        return buckets
+    
     def get_topics_mastered(self, user_id: str) -> List[str]:
         """
         Get list of topics with success rate >= 80%.
@@ -196,11 +399,7 @@ class ProgressService:
         Returns:
             List of mastered topic names
         """
-        progress = self.get_progress(user_id)
-        return [
-            topic for topic, data in progress['topicProgress'].items()
-            if data['percentage'] >= 80.0
-        ]
+        return self._topics_with_percentage(user_id, lambda percentage: percentage >= 80.0)
     
     def get_topics_needing_work(self, user_id: str) -> List[str]:
         """
@@ -212,11 +411,7 @@ class ProgressService:
         Returns:
             List of topic names needing improvement
         """
-        progress = self.get_progress(user_id)
-        return [
-            topic for topic, data in progress['topicProgress'].items()
-            if data['percentage'] < 50.0
-        ]
+        return self._topics_with_percentage(user_id, lambda percentage: percentage < 50.0)
 
 
 # Global progress service instance
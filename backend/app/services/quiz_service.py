@@ -1,7 +1,8 @@
 """Quiz service for quiz generation and management."""
+from collections import defaultdict
 from typing import Optional
 import uuid
-from app.models.quiz import Quiz, QuizQuestion, QuizResult
+from app.models.quiz import Quiz, QuizQuestion, QuizResult, count_correct
 from app.services.agent_orchestrator import agent_orchestrator
 from app.services.content_service import content_service
 
@@ -13,7 +14,11 @@ class QuizService:
         """Initialize the quiz service with in-memory storage."""
         self._quizzes: dict[str, Quiz] = {}
         self._results: dict[str, QuizResult] = {}
-        self._quiz_results: dict[str, list[str]] = {}  # quiz_id -> list of result_ids
+        self._quiz_results: dict[str, list[QuizResult]] = {}  # quiz_id -> results
+        # user_id -> items in creation order, so per-user reads skip a full scan
+        self._quizzes_by_user: dict[str, list[Quiz]] = defaultdict(list)
+        self._results_by_user: dict[str, list[QuizResult]] = defaultdict(list)
+        self._submitted: set[tuple[str, str]] = set()  # (quiz_id, user_id)
     
     def generate_quiz(self, user_id: str, topic: Optional[str] = None,
                       content_id: Optional[str] = None,
@@ -90,7 +95,7 @@ class QuizService:
         )
         
         # Store quiz
-        self._quizzes[quiz.id] = quiz
+        self._store_quiz(quiz)
         
         return quiz, None
     
@@ -100,7 +105,7 @@ class QuizService:
     
     def get_user_quizzes(self, user_id: str) -> list[Quiz]:
         """Get all quizzes for a user."""
-        return [q for q in self._quizzes.values() if q.user_id == user_id]
+        return list(self._quizzes_by_user.get(user_id, ()))
     
     def submit_quiz(self, quiz_id: str, user_id: str, 
                     answers: list[int]) -> tuple[Optional[QuizResult], Optional[str]]:
@@ -127,46 +132,56 @@ class QuizService:
         if len(answers) != len(quiz.questions):
             return None, f"Expected {len(quiz.questions)} answers, got {len(answers)}"
         
-        # Validate answer indices
-        for i, answer in enumerate(answers):
-            if answer < 0 or answer >= len(quiz.questions[i].options):
-                return None, f"Answer index {answer} out of range for question {i+1}"
+        # Validate answer indices against the quiz's precomputed option counts
+        invalid = next(
+            (i for i, (answer, count) in enumerate(zip(answers, quiz.option_counts))
+             if not 0 <= answer < count),
+            None
+        )
+        if invalid is not None:
+            return None, f"Answer index {answers[invalid]} out of range for question {invalid+1}"
         
         # Check if quiz already submitted
-        existing_results = self._quiz_results.get(quiz_id, [])
-        for result_id in existing_results:
-            result = self._results.get(result_id)
-            if result and result.user_id == user_id:
-                return None, "Quiz has already been submitted"
+        if (quiz_id, user_id) in self._submitted:
+            return None, "Quiz has already been submitted"
         
         # Create result
         result = QuizResult.create(
             quiz_id=quiz_id,
             user_id=user_id,
             answers=answers,
-            questions=quiz.questions
+            questions=quiz.questions,
+            topic=quiz.topic
         )
         
         # Store result
-        self._results[result.id] = result
-        if quiz_id not in self._quiz_results:
-            self._quiz_results[quiz_id] = []
-        self._quiz_results[quiz_id].append(result.id)
+        self._store_result(result)
         
         return result, None
     
+    def _store_quiz(self, quiz: Quiz) -> None:
+        """Store a quiz and index it under its owner."""
+        self._quizzes[quiz.id] = quiz
+        self._quizzes_by_user[quiz.user_id].append(quiz)
+    
+    def _store_result(self, result: QuizResult) -> None:
+        """Store a result and index it under its quiz and user."""
+        self._results[result.id] = result
+        self._quiz_results.setdefault(result.quiz_id, []).append(result)
+        self._results_by_user[result.user_id].append(result)
+        self._submitted.add((result.quiz_id, result.user_id))
+    
     def get_result(self, result_id: str) -> Optional[QuizResult]:
         """Get a quiz result by ID."""
         return self._results.get(result_id)
     
     def get_quiz_results(self, quiz_id: str) -> list[QuizResult]:
         """Get all results for a quiz."""
-        result_ids = self._quiz_results.get(quiz_id, [])
-        return [self._results[rid] for rid in result_ids if rid in self._results]
+        return list(self._quiz_results.get(quiz_id, ()))
     
     def get_user_results(self, user_id: str) -> list[QuizResult]:
         """Get all quiz results for a user."""
-        return [r for r in self._results.values() if r.user_id == user_id]
+        return list(self._results_by_user.get(user_id, ()))
     
     def get_answer(self, quiz_id: str, user_id: str, 
                    question_index: int) -> Optional[int]:
@@ -181,10 +196,8 @@ class QuizService:
         Returns:
             The recorded answer index, or None if not found.
         """
-        result_ids = self._quiz_results.get(quiz_id, [])
-        for result_id in result_ids:
-            result = self._results.get(result_id)
-            if result and result.user_id == user_id:
+        for result in self._quiz_results.get(quiz_id, ()):
+            if result.user_id == user_id:
                 if 0 <= question_index < len(result.answers):
                     return result.answers[question_index]
         return None
@@ -202,11 +215,7 @@ class QuizService:
             Tuple of (correct_count, total_questions, score_percentage).
         """
         total = len(questions)
-        correct = 0
-        
-        for i, answer in enumerate(answers):
-            if i < len(questions) and answer == questions[i].correct_index:
-                correct += 1
+        correct = count_correct(answers, questions)
         
         score = (correct / total) if total > 0 else 0.0
         return correct, total, score
@@ -216,6 +225,9 @@ class QuizService:
         self._quizzes.clear()
         self._results.clear()
         self._quiz_results.clear()
+        self._quizzes_by_user.clear()
+        self._results_by_user.clear()
+        self._submitted.clear()
 
 
 # Global quiz service instance
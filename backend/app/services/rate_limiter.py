@@ -0,0 +1,135 @@
+"""Client-side request and token throttling for Nebius API calls.
+
+Keeps outgoing calls under the provider's requests-per-minute and
+tokens-per-minute quotas so bursts wait locally instead of being rejected
+with 429s and retried.
+"""
+import logging
+import threading
+import time
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Shorter waits are floating-point refill error, not real debt
+MIN_WAIT_SECONDS = 1e-6
+
+
+class RateLimiter:
+    """Token-bucket limiter enforcing request and token budgets per minute.
+    
+    Each budget is a bucket that refills continuously at limit/60 units per
+    second up to one minute's worth. acquire() blocks until both buckets
+    can cover the call. A limit of None disables that bucket.
+    """
+    
+    def __init__(
+        self,
+        requests_per_minute: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None
+    ):
+        """
+        Initialize the rate limiter.
+        
+        Args:
+            requests_per_minute: Maximum requests per minute, or None for no limit.
+            tokens_per_minute: Maximum tokens per minute, or None for no limit.
+        """
+        if requests_per_minute is not None and requests_per_minute <= 0:
+            raise ValueError("requests_per_minute must be positive")
+        if tokens_per_minute is not None and tokens_per_minute <= 0:
+            raise ValueError("tokens_per_minute must be positive")
+        
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        
+        # Buckets start full so the first burst is not delayed
+        self._available_requests = float(requests_per_minute or 0)
+        self._available_tokens = float(tokens_per_minute or 0)
+        self._last_refill = time.monotonic()
+        # Calls wait until this time after the provider asked us to back off
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+    
+    def _refill(self, now: float) -> None:
+        """Add the capacity earned since the last refill."""
+        elapsed = now - self._last_refill
+        self._last_refill = now
+        
+        if self.requests_per_minute is not None:
+            self._available_requests = min(
+                float(self.requests_per_minute),
+                self._available_requests + elapsed * self.requests_per_minute / 60.0
+            )
+        if self.tokens_per_minute is not None:
+            self._available_tokens = min(
+                float(self.tokens_per_minute),
+                self._available_tokens + elapsed * self.tokens_per_minute / 60.0
+            )
+    
+    def _wait_time(self, tokens: int, now: float) -> float:
+        """Seconds until a call costing tokens fits in both buckets."""
+        wait = max(0.0, self._paused_until - now)
+        
+        if self.requests_per_minute is not None and self._available_requests < 1:
+            wait = max(
+                wait,
+                (1 - self._available_requests) * 60.0 / self.requests_per_minute
+            )
+        if self.tokens_per_minute is not None and self._available_tokens < tokens:
+            wait = max(
+                wait,
+                (tokens - self._available_tokens) * 60.0 / self.tokens_per_minute
+            )
+        
+        return wait
+    
+    def acquire(self, tokens: int = 0) -> float:
+        """
+        Block until a call may be sent, then reserve its budget.
+        
+        Args:
+            tokens: Estimated tokens the call will consume. Capped at the
+                per-minute limit so an oversized call can still go through.
+                
+        Returns:
+            Seconds spent waiting.
+        """
+        if self.tokens_per_minute is not None:
+            tokens = min(tokens, self.tokens_per_minute)
+        
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                wait = self._wait_time(tokens, now)
+                
+                if wait < MIN_WAIT_SECONDS:
+                    if self.requests_per_minute is not None:
+                        self._available_requests -= 1
+                    if self.tokens_per_minute is not None:
+                        self._available_tokens -= tokens
+                    if waited > 0:
+                        logger.debug(f"Rate limiter delayed call by {waited:.2f}s")
+                    return waited
+            
+            time.sleep(wait)
+            waited += wait
+    
+    def pause(self, seconds: float) -> None:
+        """
+        Hold back all calls for the given time.
+        
+        Used when the provider answers 429 with a Retry-After, so every
+        caller sharing this limiter backs off instead of only the one that
+        was rejected.
+        
+        Args:
+            seconds: How long to hold calls.
+        """
+        if seconds <= 0:
+            return
+        
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
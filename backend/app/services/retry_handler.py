@@ -10,14 +10,35 @@ Does not retry:
 - Invalid API key errors
 """
 import logging
+import math
+import random
 import time
 from dataclasses import dataclass
-from typing import Any, Callable, Optional, TypeVar, Union
+from typing import Any, Callable, Dict, Optional, TypeVar, Union
+
+from app.services.circuit_breaker import CircuitBreaker
+
+# OpenAI SDK exception types, resolved once at import. Without the SDK each
+# name is an empty tuple, which isinstance() never matches.
+try:
+    from openai import APIStatusError as OpenAIStatusError
+    from openai import APITimeoutError as OpenAITimeoutError
+    from openai import AuthenticationError as OpenAIAuthError
+    from openai import RateLimitError as OpenAIRateLimitError
+except ImportError:
+    OpenAIStatusError = OpenAITimeoutError = OpenAIAuthError = OpenAIRateLimitError = ()
+
+# SDK errors that are always worth retrying
+_OPENAI_RETRYABLE = (OpenAITimeoutError, OpenAIRateLimitError)
 
 logger = logging.getLogger(__name__)
 
 T = TypeVar('T')
 
+# Backoff jitter strategies: none keeps the exact exponential delay, full
+# draws from [0, delay], equal keeps half and draws the other half
+JITTER_MODES = ("none", "full", "equal")
+
 
 class RetryableError(Exception):
     """Base exception for errors that can be retried."""
@@ -42,6 +63,11 @@ class ServerError(RetryableError):
     pass
 
 
+class CircuitOpenError(ServerError):
+    """Raised without calling the API while the circuit breaker is open."""
+    pass
+
+
 class ClientError(Exception):
     """Raised for client errors (4xx except 429). Not retryable."""
     
@@ -70,7 +96,9 @@ class RetryHandler:
         max_attempts: int = 3,
         base_delay: float = 1.0,
         max_delay: float = 30.0,
-        exponential_base: float = 2.0
+        exponential_base: float = 2.0,
+        jitter: str = "full",
+        circuit_breaker: Optional[CircuitBreaker] = None
     ):
         """
         Initialize the retry handler.
@@ -80,6 +108,10 @@ class RetryHandler:
             base_delay: Initial delay between retries in seconds (default 1.0).
             max_delay: Maximum delay between retries in seconds (default 30.0).
             exponential_base: Base for exponential backoff calculation (default 2.0).
+            jitter: Backoff randomization, one of "none", "full" or "equal"
+                (default "full"), so concurrent callers do not retry in lockstep.
+            circuit_breaker: Optional breaker shared by calls to the same
+                upstream; while it is open, execute() fails immediately.
         """
         if max_attempts < 1:
             raise ValueError("max_attempts must be at least 1")
@@ -87,16 +119,31 @@ class RetryHandler:
             raise ValueError("base_delay must be positive")
         if max_delay < base_delay:
             raise ValueError("max_delay must be >= base_delay")
+        if jitter not in JITTER_MODES:
+            raise ValueError(f"jitter must be one of {', '.join(JITTER_MODES)}")
         
         self.max_attempts = max_attempts
         self.base_delay = base_delay
         self.max_delay = max_delay
         self.exponential_base = exponential_base
+        self.jitter = jitter
+        self.circuit_breaker = circuit_breaker
+        # Per-handler generator so concurrent handlers don't share one lock
+        self._rng = random.Random()
+        # Capped backoff for every attempt execute() can reach, computed once
+        self._caps = tuple(self._backoff_cap(attempt) for attempt in range(max_attempts))
+    
+    def _backoff_cap(self, attempt: int) -> float:
+        """Exponential backoff for an attempt, capped at max_delay."""
+        return min(self.base_delay * (self.exponential_base ** attempt), self.max_delay)
     
     def calculate_delay(self, attempt: int, retry_after: Optional[int] = None) -> float:
         """
         Calculate delay before next retry using exponential backoff.
         
+        The backoff is randomized according to the jitter mode; a
+        server-specified retry-after is used as-is.
+        
         Args:
             attempt: Current attempt number (0-indexed).
             retry_after: Optional server-specified retry delay in seconds.
@@ -108,11 +155,18 @@ class RetryHandler:
             # Respect server-specified retry-after, but cap at max_delay
             return min(float(retry_after), self.max_delay)
         
-        # Exponential backoff: base_delay * (exponential_base ^ attempt)
-        delay = self.base_delay * (self.exponential_base ** attempt)
+        # Exponential backoff: base_delay * (exponential_base ^ attempt),
+        # capped at max_delay
+        if attempt < len(self._caps):
+            cap = self._caps[attempt]
+        else:
+            cap = self._backoff_cap(attempt)
         
-        # Cap at max_delay
-        return min(delay, self.max_delay)
+        if self.jitter == "full":
+            return self._rng.uniform(0, cap)
+        if self.jitter == "equal":
+            return cap / 2 + self._rng.uniform(0, cap / 2)
+        return cap
     
     def should_retry(self, error: Exception) -> bool:
         """
@@ -129,26 +183,14 @@ class RetryHandler:
             return True
         
         # Check for OpenAI SDK specific errors
-        try:
-            from openai import APITimeoutError, RateLimitError as OpenAIRateLimitError
-            from openai import APIStatusError
-            
-            if isinstance(error, APITimeoutError):
-                return True
-            
-            if isinstance(error, OpenAIRateLimitError):
+        if isinstance(error, _OPENAI_RETRYABLE):
+            return True
+        
+        if isinstance(error, OpenAIStatusError):
+            status_code = getattr(error, 'status_code', 0)
+            # Retry on 5xx server errors and 429 rate limit
+            if 500 <= status_code < 600 or status_code == 429:
                 return True
-            
-            if isinstance(error, APIStatusError):
-                # Retry on 5xx server errors
-                if hasattr(error, 'status_code') and 500 <= error.status_code < 600:
-                    return True
-                # Retry on 429 rate limit
-                if hasattr(error, 'status_code') and error.status_code == 429:
-                    return True
-                
-        except ImportError:
-            pass
         
         # Non-retryable
         if isinstance(error, (ClientError, AuthenticationError)):
@@ -170,19 +212,14 @@ class RetryHandler:
             return error.retry_after
         
         # Check for OpenAI SDK specific errors with headers
-        try:
-            from openai import APIStatusError
-            
-            if isinstance(error, APIStatusError):
-                if hasattr(error, 'response') and error.response is not None:
-                    retry_after = error.response.headers.get('retry-after')
-                    if retry_after:
-                        try:
-                            return int(retry_after)
-                        except ValueError:
-                            pass
-        except ImportError:
-            pass
+        if isinstance(error, OpenAIStatusError):
+            if getattr(error, 'response', None) is not None:
+                retry_after = error.response.headers.get('retry-after')
+                if retry_after:
+                    try:
+                        return int(retry_after)
+                    except ValueError:
+                        pass
         
         return None
     
@@ -217,20 +254,40 @@ class RetryHandler:
         """
         last_error: Optional[Exception] = None
         
+        breaker = self.circuit_breaker
+        
         for attempt in range(self.max_attempts):
+            # Fail fast while the upstream is known to be down
+            if breaker is not None and not breaker.allow():
+                retry_in = breaker.retry_in()
+                raise CircuitOpenError(
+                    "Circuit open: AI service calls are paused after repeated failures",
+                    retry_after=math.ceil(retry_in) if retry_in > 0 else None
+                )
+            
             try:
-                return func(*args, **kwargs)
+                result = func(*args, **kwargs)
                 
+            except CircuitOpenError:
+                # A breaker further down refused the call; retrying would
+                # only wait out its recovery timeout
+                raise
             except Exception as e:
                 last_error = e
                 
                 # Check if we should retry
                 if not self.should_retry(e):
+                    # The service answered, so it counts as reachable
+                    if breaker is not None:
+                        breaker.record_success()
                     logger.warning(
                         f"Non-retryable error on attempt {attempt + 1}: {type(e).__name__}: {e}"
                     )
                     raise
                 
+                if breaker is not None:
+                    breaker.record_failure()
+                
                 # Check if we have more attempts
                 if attempt + 1 >= self.max_attempts:
                     logger.error(
@@ -249,6 +306,10 @@ class RetryHandler:
                 )
                 
                 time.sleep(delay)
+            else:
+                if breaker is not None:
+                    breaker.record_success()
+                return result
         
         # This should never be reached, but just in case
         if last_error is not None:
@@ -258,7 +319,7 @@ class RetryHandler:
 
 
 
-@dataclass
+@dataclass(slots=True)
 class AIErrorResponse:
     """Standardized error response from AI operations.
     
@@ -294,114 +355,11 @@ class AIErrorResponse:
         """
         technical_details = f"{type(error).__name__}: {str(error)}"
         
-        # Handle our custom exceptions
-        if isinstance(error, TimeoutError):
-            return cls(
-                error_type="timeout",
-                user_message="The AI service is taking too long to respond. Please try again.",
-                technical_details=technical_details,
-                retry_after=error.retry_after
-            )
-        
-        if isinstance(error, RateLimitError):
-            retry_msg = ""
-            if error.retry_after:
-                retry_msg = f" Please wait {error.retry_after} seconds before trying again."
-            return cls(
-                error_type="rate_limit",
-                user_message=f"The AI service is currently busy.{retry_msg}",
-                technical_details=technical_details,
-                retry_after=error.retry_after
-            )
-        
-        if isinstance(error, ServerError):
-            return cls(
-                error_type="api",
-                user_message="The AI service is temporarily unavailable. Please try again later.",
-                technical_details=technical_details,
-                retry_after=error.retry_after
-            )
-        
-        if isinstance(error, AuthenticationError):
-            return cls(
-                error_type="config",
-                user_message="AI service configuration error. Please contact support.",
-                technical_details=technical_details
-            )
-        
-        if isinstance(error, ClientError):
-            return cls(
-                error_type="api",
-                user_message="There was a problem with the request. Please try again.",
-                technical_details=technical_details
-            )
-        
-        # Handle OpenAI SDK specific errors
-        try:
-            from openai import APITimeoutError, RateLimitError as OpenAIRateLimitError
-            from openai import APIStatusError, AuthenticationError as OpenAIAuthError
-            
-            if isinstance(error, APITimeoutError):
-                return cls(
-                    error_type="timeout",
-                    user_message="The AI service is taking too long to respond. Please try again.",
-                    technical_details=technical_details
-                )
-            
-            if isinstance(error, OpenAIRateLimitError):
-                retry_after = None
-                if hasattr(error, 'response') and error.response:
-                    retry_header = error.response.headers.get('retry-after')
-                    if retry_header:
-                        try:
-                            retry_after = int(retry_header)
-                        except ValueError:
-                            pass
-                
-                retry_msg = ""
-                if retry_after:
-                    retry_msg = f" Please wait {retry_after} seconds before trying again."
-                
-                return cls(
-                    error_type="rate_limit",
-                    user_message=f"The AI service is currently busy.{retry_msg}",
-                    technical_details=technical_details,
-                    retry_after=retry_after
-                )
-            
-            if isinstance(error, OpenAIAuthError):
-                return cls(
-                    error_type="config",
-                    user_message="AI service configuration error. Please contact support.",
-                    technical_details=technical_details
-                )
-            
-            if isinstance(error, APIStatusError):
-                status_code = getattr(error, 'status_code', 0)
-                
-                if 500 <= status_code < 600:
-                    return cls(
-                        error_type="api",
-                        user_message="The AI service is temporarily unavailable. Please try again later.",
-                        technical_details=technical_details
-                    )
-                
-                return cls(
-                    error_type="api",
-                    user_message="There was a problem with the AI service. Please try again.",
-                    technical_details=technical_details
-                )
-                
-        except ImportError:
-            pass
-        
-        # Handle network errors
-        if isinstance(error, (ConnectionError, OSError)):
-            return cls(
-                error_type="network",
-                user_message="Unable to connect to the AI service. Please check your connection.",
-                technical_details=technical_details
-            )
+        # Most specific registered class wins, as in an except clause chain
+        for error_class in type(error).__mro__:
+            builder = _ERROR_RESPONSE_BUILDERS.get(error_class)
+            if builder is not None:
+                return builder(cls, error, technical_details)
         
         # Default fallback
         return cls(
@@ -418,8 +376,9 @@ class AIErrorResponse:
             "user_message": self.user_message
         }
         
-        if self.retry_after is not None:
-            result["retry_after"] = self.retry_after
+        retry_after = self.retry_after
+        if retry_after is not None:
+            result["retry_after"] = retry_after
         
         return result
     
@@ -435,3 +394,120 @@ class AIErrorResponse:
             f"AI Error [{self.error_type}]: {self.user_message} | "
             f"Details: {self.technical_details}"
         )
+
+
+def _timeout_response(cls, error: Exception, technical_details: str) -> AIErrorResponse:
+    """Response for a call that timed out."""
+    return cls(
+        error_type="timeout",
+        user_message="The AI service is taking too long to respond. Please try again.",
+        technical_details=technical_details,
+        retry_after=getattr(error, 'retry_after', None)
+    )
+
+
+def _rate_limit_message(retry_after: Optional[int]) -> str:
+    """User message for a rate limit, with the wait time when known."""
+    retry_msg = ""
+    if retry_after:
+        retry_msg = f" Please wait {retry_after} seconds before trying again."
+    return f"The AI service is currently busy.{retry_msg}"
+
+
+def _rate_limit_response(cls, error: RateLimitError, technical_details: str) -> AIErrorResponse:
+    """Response for our rate limit error, carrying its retry-after."""
+    return cls(
+        error_type="rate_limit",
+        user_message=_rate_limit_message(error.retry_after),
+        technical_details=technical_details,
+        retry_after=error.retry_after
+    )
+
+
+def _openai_rate_limit_response(cls, error: Exception, technical_details: str) -> AIErrorResponse:
+    """Response for an SDK rate limit, reading retry-after from the headers."""
+    retry_after = None
+    if hasattr(error, 'response') and error.response:
+        retry_header = error.response.headers.get('retry-after')
+        if retry_header:
+            try:
+                retry_after = int(retry_header)
+            except ValueError:
+                pass
+    
+    return cls(
+        error_type="rate_limit",
+        user_message=_rate_limit_message(retry_after),
+        technical_details=technical_details,
+        retry_after=retry_after
+    )
+
+
+def _server_error_response(cls, error: Exception, technical_details: str) -> AIErrorResponse:
+    """Response for a server-side (5xx) failure."""
+    return cls(
+        error_type="api",
+        user_message="The AI service is temporarily unavailable. Please try again later.",
+        technical_details=technical_details,
+        retry_after=getattr(error, 'retry_after', None)
+    )
+
+
+def _config_error_response(cls, error: Exception, technical_details: str) -> AIErrorResponse:
+    """Response for an authentication or configuration failure."""
+    return cls(
+        error_type="config",
+        user_message="AI service configuration error. Please contact support.",
+        technical_details=technical_details
+    )
+
+
+def _client_error_response(cls, error: Exception, technical_details: str) -> AIErrorResponse:
+    """Response for a rejected (4xx) request."""
+    return cls(
+        error_type="api",
+        user_message="There was a problem with the request. Please try again.",
+        technical_details=technical_details
+    )
+
+
+def _openai_status_response(cls, error: Exception, technical_details: str) -> AIErrorResponse:
+    """Response for any other SDK status error, by status code."""
+    if 500 <= getattr(error, 'status_code', 0) < 600:
+        return _server_error_response(cls, error, technical_details)
+    
+    return cls(
+        error_type="api",
+        user_message="There was a problem with the AI service. Please try again.",
+        technical_details=technical_details
+    )
+
+
+def _network_error_response(cls, error: Exception, technical_details: str) -> AIErrorResponse:
+    """Response for a connection failure."""
+    return cls(
+        error_type="network",
+        user_message="Unable to connect to the AI service. Please check your connection.",
+        technical_details=technical_details
+    )
+
+
+# Exception class -> response builder used by AIErrorResponse.from_exception.
+# OpenAI entries are skipped when the SDK is not installed.
+_ERROR_RESPONSE_BUILDERS: Dict[type, Callable[..., AIErrorResponse]] = {
+    error_class: builder
+    for error_class, builder in [
+        (TimeoutError, _timeout_response),
+        (RateLimitError, _rate_limit_response),
+        (ServerError, _server_error_response),
+        (AuthenticationError, _config_error_response),
+        (ClientError, _client_error_response),
+        (OpenAITimeoutError, _timeout_response),
+        (OpenAIRateLimitError, _openai_rate_limit_response),
+        (OpenAIAuthError, _config_error_response),
+        (OpenAIStatusError, _openai_status_response),
+        (ConnectionError, _network_error_response),
+        (OSError, _network_error_response),
+    ]
+    if isinstance(error_class, type)
+}
@@ -9,13 +9,13 @@ import uuid
 from datetime import datetime, timedelta
 from typing import Optional
 
+from app.database import db
 from app.models.user import User
 from app.models.content import Content
 from app.models.quiz import Quiz, QuizQuestion, QuizResult
 from app.models.progress import UserProgress, TopicProgress, ProgressEntry
 from app.services.auth_service import auth_service
 from app.services.quiz_service import quiz_service
-from app.services.content_service import content_service
 
 
 # Demo user accounts
@@ -310,26 +310,29 @@ class SeedDataService:
         if not demo_user_id:
             return [{"status": "error", "error": "Demo user not found"}]
         
-        for lesson in SAMPLE_LESSONS:
-            # Create content record directly (without actual file)
-            content = Content(
+        # Create content records directly (without actual files)
+        now = datetime.utcnow()
+        contents = [
+            Content(
                 id=str(uuid.uuid4()),
                 user_id=demo_user_id,
                 filename=lesson["filename"],
-                file_type=lesson["file_type"],
+                content_type=lesson["file_type"],
                 file_path=f"/demo/{lesson['filename']}",
-                summary=lesson["summary"],
+                title=lesson["title"],
+                summary=" ".join(lesson["summary"]),
                 key_points=lesson["key_points"],
-                processed_at=datetime.utcnow(),
-                created_at=datetime.utcnow()
+                processing_status='complete',
+                created_at=now
             )
-            
-            # Store in content service
-            content_service._contents[content.id] = content
-            if demo_user_id not in content_service._user_contents:
-                content_service._user_contents[demo_user_id] = []
-            content_service._user_contents[demo_user_id].append(content.id)
-            
+            for lesson in SAMPLE_LESSONS
+        ]
+        
+        # Store all lessons with one commit
+        db.session.add_all(contents)
+        db.session.commit()
+        
+        for lesson, content in zip(SAMPLE_LESSONS, contents):
             self._demo_content_ids.append(content.id)
             created_content.append({
                 "title": lesson["title"],
@@ -379,7 +382,7 @@ class SeedDataService:
             )
             
             # Store quiz
-            quiz_service._quizzes[quiz.id] = quiz
+            quiz_service._store_quiz(quiz)
             self._demo_quiz_ids.append(quiz.id)
             
             # Create a sample result (simulate user taking the quiz)
@@ -398,15 +401,13 @@ class SeedDataService:
                 quiz_id=quiz.id,
                 user_id=demo_user_id,
                 answers=answers,
-                questions=questions
+                questions=questions,
+                topic=topic
             )
             result.completed_at = datetime.utcnow() - timedelta(days=5)
             
             # Store result
-            quiz_service._results[result.id] = result
-            if quiz.id not in quiz_service._quiz_results:
-                quiz_service._quiz_results[quiz.id] = []
-            quiz_service._quiz_results[quiz.id].append(result.id)
+            quiz_service._store_result(result)
             
             created_quizzes.append({
                 "topic": topic,
@@ -6,6 +6,7 @@ from datetime import datetime
 from flask import request
 from flask_socketio import SocketIO, emit, join_room, leave_room
 
+from app import json_provider
 from app.services.presence_service import presence_service
 from app.services.auth_service import auth_service
 from app.services.chat_service import chat_service
@@ -20,12 +21,16 @@ socketio = SocketIO()
 
 def init_socketio(app):
     """Initialize SocketIO with the Flask app."""
+    # Presence and chat events are encoded with orjson when it is installed
+    options = {'json': json_provider} if json_provider.ORJSON_AVAILABLE else {}
+    
     socketio.init_app(
         app,
         cors_allowed_origins=["http://localhost:5173", "http://localhost:5174"],
         async_mode='eventlet',
         logger=True,
-        engineio_logger=True
+        engineio_logger=True,
+        **options
     )
     return socketio
 
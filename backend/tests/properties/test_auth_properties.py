@@ -149,3 +149,16 @@ class TestAuthProperties:
             
             db.session.remove()
             db.drop_all()
+    
+    def test_pooled_salts_are_unique_and_valid(self):
+        """Salts handed out by the pool are never reused and hash correctly."""
+        import bcrypt
+        
+        auth = AuthService()
+        salts = [auth._next_salt() for _ in range(300)]
+        
+        assert len(set(salts)) == 300
+        
+        hashed = bcrypt.hashpw(b'password123', salts[-1])
+        assert bcrypt.checkpw(b'password123', hashed)
+
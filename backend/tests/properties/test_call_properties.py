@@ -10,7 +10,8 @@ from app.models.user import User
 from app.models.friend import Friend
 from app.models.direct_chat import DirectChat
 from app.models.call import Call, CallParticipant
-from app.services.call_service import CallService
+from app.services.cache import cache
+from app.services.call_service import CallService, _active_call_key
 
 
 def get_app():
@@ -223,3 +224,146 @@ def test_no_duplicate_active_calls(call_type):
         assert "already" in error.lower()
         
         db.drop_all()
+
+
+# Property: Only participants can view or end a call
+@given(
+    call_type=st.sampled_from(['voice', 'video'])
+)
+@settings(max_examples=5, deadline=None, phases=[Phase.generate])
+def test_call_access_limited_to_participants(call_type):
+    """Participants can fetch and end a call; outsiders are rejected."""
+    app = get_app()
+    call_service = CallService()
+    
+    with app.app_context():
+        db.create_all()
+        
+        user1 = create_test_user("User1", "user1@test.com")
+        user2 = create_test_user("User2", "user2@test.com")
+        outsider = create_test_user("Outsider", "outsider@test.com")
+        create_friendship(user1.id, user2.id)
+        chat = create_direct_chat(user1.id, user2.id)
+        
+        call, _ = call_service.initiate_call(user1.id, call_type, 'direct', chat.id)
+        
+        call_data, error = call_service.get_call(call.id, user2.id)
+        assert error is None
+        assert call_data['id'] == call.id
+        
+        call_data, error = call_service.get_call(call.id, outsider.id)
+        assert call_data is None
+        assert error is not None
+        
+        success, _ = call_service.end_call(call.id, outsider.id)
+        assert not success
+        
+        success, _ = call_service.end_call(call.id, user2.id)
+        assert success
+        
+        db.drop_all()
+
+
+# Property: A call ends when its last joined participant leaves
+@given(
+    call_type=st.sampled_from(['voice', 'video'])
+)
+@settings(max_examples=5, deadline=None, phases=[Phase.generate])
+def test_call_ends_when_last_participant_leaves(call_type):
+    """Leaving keeps the call up while others remain joined and ends it after the last."""
+    app = get_app()
+    call_service = CallService()
+    
+    with app.app_context():
+        db.create_all()
+        
+        user1 = create_test_user("User1", "user1@test.com")
+        user2 = create_test_user("User2", "user2@test.com")
+        outsider = create_test_user("Outsider", "outsider@test.com")
+        create_friendship(user1.id, user2.id)
+        chat = create_direct_chat(user1.id, user2.id)
+        
+        call, _ = call_service.initiate_call(user1.id, call_type, 'direct', chat.id)
+        call_id = call.id
+        call_service.join_call(call_id, user2.id)
+        
+        success, error = call_service.leave_call(call_id, outsider.id)
+        assert not success
+        assert error == "Not a participant in this call"
+        
+        success, error = call_service.leave_call(str(uuid.uuid4()), user1.id)
+        assert not success
+        assert error == "Call not found"
+        
+        success, _ = call_service.leave_call(call_id, user1.id)
+        assert success
+        assert db.session.get(Call, call_id).status == 'active'
+        
+        success, _ = call_service.leave_call(call_id, user2.id)
+        assert success
+        call = db.session.get(Call, call_id)
+        assert call.status == 'ended'
+        assert call.ended_at is not None
+        
+        db.drop_all()
+
+
+# Property: Cached active-call lookups follow call state changes
+@given(
+    call_type=st.sampled_from(['voice', 'video'])
+)
+@settings(max_examples=5, deadline=None, phases=[Phase.generate])
+def test_active_call_lookup_tracks_state(call_type):
+    """get_active_call reflects joins and ends even after results are cached."""
+    app = get_app()
+    call_service = CallService()
+    
+    with app.app_context():
+        db.create_all()
+        
+        user1 = create_test_user("User1", "user1@test.com")
+        user2 = create_test_user("User2", "user2@test.com")
+        create_friendship(user1.id, user2.id)
+        chat = create_direct_chat(user1.id, user2.id)
+        
+        call, _ = call_service.initiate_call(user1.id, call_type, 'direct', chat.id)
+        call_id = call.id
+        
+        # Ringing calls are not active yet
+        assert call_service.get_active_call(user1.id) is None
+        assert call_service.get_active_call(user1.id) is None
+        
+        # Users outside the call keep their cached lookups when it changes
+        outsider = create_test_user("Outsider", "outsider@test.com")
+        assert call_service.get_active_call(outsider.id) is None
+        
+        call_service.join_call(call_id, user2.id)
+        assert cache.get(_active_call_key(outsider.id)) is not None
+        
+        for user in (user1, user2):
+            active = call_service.get_active_call(user.id)
+            assert active is not None
+            assert active['id'] == call_id
+            # Callers get their own copy of the cached participants
+            active['participants'].clear()
+            assert call_service.get_active_call(user.id)['participants']
+        
+        # A lookup racing with a state change does not cache its result
+        cache.invalidate(_active_call_key(user1.id))
+        get_call = call_service._get_call
+        
+        def get_call_during_change(call_id):
+            call_service._commit(call_id)
+            return get_call(call_id)
+        
+        call_service._get_call = get_call_during_change
+        assert call_service.get_active_call(user1.id)['id'] == call_id
+        call_service._get_call = get_call
+        assert cache.get(_active_call_key(user1.id)) is None
+        
+        call_service.end_call(call_id, user2.id)
+        
+        assert call_service.get_active_call(user1.id) is None
+        assert call_service.get_active_call(user2.id) is None
+        
+        db.drop_all()
@@ -9,6 +9,7 @@ import uuid
 import pytest
 from hypothesis import given, strategies as st, settings, assume, HealthCheck
 from datetime import datetime
+from sqlalchemy import event
 
 # Set test database before importing app
 os.environ['DATABASE_URL'] = 'sqlite:///:memory:'
@@ -524,3 +525,297 @@ class TestTopicProgressTracking:
             
             db.session.remove()
             db.drop_all()
+    
+    @settings(max_examples=25, deadline=None, suppress_health_check=[HealthCheck.function_scoped_fixture])
+    @given(
+        minutes=st.lists(st.integers(min_value=0, max_value=10000), min_size=1, max_size=15, unique=True)
+    )
+    def test_property_8_recent_activity_is_latest_ten(self, minutes):
+        """
+        Property 8 (recent activity): Recent activity lists the user's ten
+        latest quiz results, newest first, and nothing from other users.
+        """
+        from datetime import timedelta
+        
+        app = get_test_app()
+        with app.app_context():
+            db.create_all()
+            
+            user = User(id=str(uuid.uuid4()), name='Test User', is_anonymous=False)
+            other = User(id=str(uuid.uuid4()), name='Other User', is_anonymous=False)
+            db.session.add_all([user, other])
+            db.session.commit()
+            
+            base = datetime(2024, 1, 1)
+            for offset in minutes:
+                db.session.add(QuizResult(
+                    user_id=user.id, quiz_id=f"quiz_{offset}", topic=None,
+                    score=1, total_questions=2, created_at=base + timedelta(minutes=offset)
+                ))
+            db.session.add(QuizResult(
+                user_id=other.id, quiz_id="other_quiz", topic=None,
+                score=1, total_questions=2, created_at=base + timedelta(minutes=20000)
+            ))
+            db.session.commit()
+            
+            statements = []
+            
+            def record(conn, cursor, statement, *args):
+                statements.append(statement)
+            
+            event.listen(db.engine, 'before_cursor_execute', record)
+            try:
+                progress = ProgressService().get_progress(user.id)
+            finally:
+                event.remove(db.engine, 'before_cursor_execute', record)
+            
+            expected = [f"quiz_{m}" for m in sorted(minutes, reverse=True)[:10]]
+            assert [a['quizId'] for a in progress['recentActivity']] == expected
+            # The stored answers are never loaded for the summary
+            assert not any('answers_json' in statement for statement in statements)
+            
+            db.session.remove()
+            db.drop_all()
+
+
+class TestProgressCacheProperties:
+    """
+    Property: Cached progress follows writes
+    
+    get_progress serves repeated reads from the cache, and recording a quiz
+    result drops the cached summary so the next read sees it.
+    """
+    
+    @settings(max_examples=25, deadline=None, suppress_health_check=[HealthCheck.function_scoped_fixture])
+    @given(results=st.lists(quiz_result_strategy(), min_size=1, max_size=5))
+    def test_cached_progress_follows_recorded_results(self, results):
+        """Each recorded result shows up in the next get_progress call."""
+        app = get_test_app()
+        with app.app_context():
+            db.create_all()
+            
+            user_id = create_test_user(app)
+            progress_service = ProgressService()
+            
+            assert progress_service.get_progress(user_id)['totalQuizzes'] == 0
+            
+            for count, data in enumerate(results, start=1):
+                progress_service.record_quiz_result(
+                    user_id=user_id,
+                    quiz_id=f"quiz_{count}",
+                    topic=data['topic'],
+                    score=data['score'],
+                    total_questions=data['total_questions']
+                )
+                assert progress_service.get_progress(user_id)['totalQuizzes'] == count
+            
+            # A row written behind the service's back is not seen until the
+            # cached summary is invalidated or expires
+            db.session.add(QuizResult(
+                user_id=user_id, quiz_id='direct', topic=None, score=0, total_questions=1
+            ))
+            db.session.commit()
+            assert progress_service.get_progress(user_id)['totalQuizzes'] == len(results)
+            
+            db.session.remove()
+            db.drop_all()
+
+
+class TestQuizResultListingProperties:
+    """
+    Property: Streamed and paginated result listings agree
+    
+    iter_quiz_results yields the same results, in the same order, as
+    get_quiz_results, and limit/offset pages slice that order.
+    """
+    
+    @settings(max_examples=25, deadline=None, suppress_health_check=[HealthCheck.function_scoped_fixture])
+    @given(
+        count=st.integers(min_value=0, max_value=12),
+        limit=st.integers(min_value=1, max_value=5),
+        offset=st.integers(min_value=0, max_value=15)
+    )
+    def test_streamed_and_paginated_results_match(self, count, limit, offset):
+        """Every listing follows the same newest-first order."""
+        app = get_test_app()
+        with app.app_context():
+            db.create_all()
+            
+            user_id = create_test_user(app)
+            other_id = create_test_user(app)
+            progress_service = ProgressService()
+            
+            for i in range(count):
+                for owner in (user_id, other_id):
+                    progress_service.record_quiz_result(
+                        user_id=owner, quiz_id=f"quiz_{i}", topic=None,
+                        score=1, total_questions=2
+                    )
+            
+            full = progress_service.get_quiz_results(user_id)
+            assert len(full) == count
+            assert all(r.user_id == user_id for r in full)
+            
+            assert [r.id for r in progress_service.iter_quiz_results(user_id)] == [r.id for r in full]
+            
+            page = progress_service.get_quiz_results(user_id, limit=limit, offset=offset)
+            assert [r.id for r in page] == [r.id for r in full[offset:offset + limit]]
+            
+            db.session.remove()
+            db.drop_all()
+    
+    @settings(max_examples=10, deadline=None, suppress_health_check=[HealthCheck.function_scoped_fixture])
+    @given(count=st.integers(min_value=0, max_value=5))
+    def test_streamed_results_route_returns_same_json(self, count):
+        """The streamed full-history response decodes to the same results as a single page."""
+        app = get_test_app()
+        with app.app_context():
+            db.create_all()
+            client = app.test_client()
+            
+            registered = client.post('/api/auth/register', json={
+                'email': f'{uuid.uuid4().hex[:8]}@example.com',
+                'password': 'password123',
+                'name': 'Test User'
+            }).get_json()
+            headers = {'Authorization': f"Bearer {registered['token']}"}
+            
+            for i in range(count):
+                ProgressService().record_quiz_result(
+                    user_id=registered['user']['id'], quiz_id=f"quiz_{i}", topic="Math",
+                    score=i, total_questions=5
+                )
+            
+            streamed = client.get('/api/progress/results', headers=headers)
+            assert streamed.is_streamed
+            assert streamed.mimetype == 'application/json'
+            
+            paged = client.get(f'/api/progress/results?limit={count + 1}', headers=headers)
+            assert streamed.get_json() == paged.get_json()
+            assert len(streamed.get_json()['results']) == count
+            
+            db.session.remove()
+            db.drop_all()
+
+
+def test_upgrade_schema_backfills_success_rate():
+    """Adding the success_rate column to an existing database backfills it."""
+    from sqlalchemy import text
+    from app.database import upgrade_schema
+    
+    app = get_test_app()
+    with app.app_context():
+        db.create_all()
+        
+        user_id = create_test_user(app)
+        progress_service = ProgressService()
+        for score, total in [(2, 3), (5, 5), (0, 0)]:
+            progress_service.record_quiz_result(
+                user_id=user_id, quiz_id=f"quiz_{score}_{total}", topic=None,
+                score=score, total_questions=total
+            )
+        
+        # Simulate a database created before the column existed
+        db.session.execute(text('ALTER TABLE quiz_results DROP COLUMN success_rate'))
+        db.session.commit()
+        db.session.expire_all()
+        
+        upgrade_schema()
+        upgrade_schema()
+        
+        rates = sorted(r.success_rate for r in progress_service.get_quiz_results(user_id))
+        assert rates == [0.0, 66.7, 100.0]
+        
+        db.session.remove()
+        db.drop_all()
+
+
+class TestTopicThresholdQueryProperties:
+    """
+    Property: SQL topic thresholds agree with get_progress
+    
+    get_topics_mastered and get_topics_needing_work filter topics in SQL;
+    they must pick the same topics as bucketing get_progress's rounded
+    percentages.
+    """
+    
+    @settings(max_examples=50, deadline=None, suppress_health_check=[HealthCheck.function_scoped_fixture])
+    @given(results=st.lists(
+        st.tuples(
+            st.sampled_from(['Algebra', 'Biology', 'Chemistry', '']),
+            st.integers(min_value=0, max_value=2000),
+            st.integers(min_value=0, max_value=2000)
+        ).map(lambda r: (r[0], min(r[1], r[2]), r[2])),
+        min_size=1, max_size=8
+    ))
+    def test_sql_thresholds_match_progress_buckets(self, results):
+        """Both paths categorize every topic the same way."""
+        app = get_test_app()
+        with app.app_context():
+            db.create_all()
+            
+            user_id = create_test_user(app)
+            progress_service = ProgressService()
+            
+            for i, (topic, score, total) in enumerate(results):
+                progress_service.record_quiz_result(
+                    user_id=user_id, quiz_id=f"quiz_{i}", topic=topic,
+                    score=score, total_questions=total
+                )
+            
+            buckets = progress_service.get_topic_buckets(user_id)
+            assert sorted(progress_service.get_topics_mastered(user_id)) == sorted(buckets['mastered'])
+            assert sorted(progress_service.get_topics_needing_work(user_id)) == sorted(buckets['needs_work'])
+            
+            db.session.remove()
+            db.drop_all()
+
+
+class TestBulkRecordingProperties:
+    """
+    Property: Bulk recording matches one-by-one recording
+    
+    record_quiz_results_bulk produces the same progress summary as calling
+    record_quiz_result for each result, and drops cached summaries.
+    """
+    
+    @settings(max_examples=25, deadline=None, suppress_health_check=[HealthCheck.function_scoped_fixture])
+    @given(results=multiple_quiz_results_strategy())
+    def test_bulk_recording_matches_single_recording(self, results):
+        """Totals and topic progress agree between both write paths."""
+        app = get_test_app()
+        with app.app_context():
+            db.create_all()
+            
+            single_user = create_test_user(app)
+            bulk_user = create_test_user(app)
+            progress_service = ProgressService()
+            
+            # Cache an empty summary first; the bulk write must drop it
+            assert progress_service.get_progress(bulk_user)['totalQuizzes'] == 0
+            
+            for i, data in enumerate(results):
+                progress_service.record_quiz_result(
+                    user_id=single_user, quiz_id=f"quiz_{i}", topic=data['topic'],
+                    score=data['score'], total_questions=data['total_questions'],
+                    answers={'q1': 0}
+                )
+            
+            recorded = progress_service.record_quiz_results_bulk([
+                {'user_id': bulk_user, 'quiz_id': f"quiz_{i}", 'answers': {'q1': 0}, **data}
+                for i, data in enumerate(results)
+            ])
+            assert recorded == len(results)
+            
+            single = progress_service.get_progress(single_user)
+            bulk = progress_service.get_progress(bulk_user)
+            for key in ('totalQuizzes', 'totalQuestions', 'correctAnswers', 'successRate', 'topicProgress'):
+                assert bulk[key] == single[key]
+            
+            assert all(
+                r.answers == {'q1': 0} and r.success_rate is not None
+                for r in progress_service.get_quiz_results(bulk_user)
+            )
+            
+            db.session.remove()
+            db.drop_all()
@@ -154,3 +154,186 @@ def test_bidirectional_friend_removal(name1, name2):
         assert not friend_service.are_friends(user2.id, user1.id)
         
         db.drop_all()
+
+
+# Property 6: Friend List Matches Friendships
+@given(friend_count=st.integers(min_value=0, max_value=5))
+@settings(max_examples=10, deadline=None, phases=[Phase.generate])
+def test_friend_list_matches_friendships(friend_count):
+    """Property 6: get_friends returns each friend exactly once with friendship details."""
+    app = get_app()
+    friend_service = FriendService()
+    
+    with app.app_context():
+        db.create_all()
+        
+        user = create_test_user("Main User", "main@test.com")
+        friends = [create_test_user(f"Friend {i}", f"friend{i}@test.com") for i in range(friend_count)]
+        
+        for friend in friends:
+            request, _ = friend_service.send_friend_request(user.id, friend.id)
+            friend_service.accept_request(request.id, friend.id)
+        
+        friend_list = friend_service.get_friends(user.id)
+        
+        assert sorted(f['id'] for f in friend_list) == sorted(f.id for f in friends)
+        assert all(f['friendshipId'] and f['friendsSince'] for f in friend_list)
+        
+        db.drop_all()
+
+
+# Property 7: Search Reflects Relationship State
+@given(name=st.text(alphabet=st.characters(whitelist_categories=('L',)), min_size=2, max_size=20))
+@settings(max_examples=10, deadline=None, phases=[Phase.generate])
+def test_search_reflects_relationship_state(name):
+    """Property 7: search_users flags friends, sent requests and received requests."""
+    app = get_app()
+    friend_service = FriendService()
+    
+    with app.app_context():
+        db.create_all()
+        
+        user = create_test_user("Searcher", "searcher@test.com")
+        friend, sent, received, stranger = [
+            create_test_user(f"{name} {i}", f"match{i}@test.com") for i in range(4)
+        ]
+        
+        request, _ = friend_service.send_friend_request(user.id, friend.id)
+        friend_service.accept_request(request.id, friend.id)
+        friend_service.send_friend_request(user.id, sent.id)
+        friend_service.send_friend_request(received.id, user.id)
+        
+        flags = {
+            result['id']: (result['isFriend'], result['hasPendingRequest'], result['hasReceivedRequest'])
+            for result in friend_service.search_users(name, user.id)
+        }
+        
+        assert flags[friend.id] == (True, False, False)
+        assert flags[sent.id] == (False, True, False)
+        assert flags[received.id] == (False, False, True)
+        assert flags[stranger.id] == (False, False, False)
+        
+        # Flags follow later changes to requests and friendships
+        pending = friend_service.get_pending_requests(user.id)[0]
+        friend_service.accept_request(pending['id'], user.id)
+        friend_service.remove_friend(user.id, friend.id)
+        friend_service.send_friend_request(user.id, stranger.id)
+        
+        flags = {
+            result['id']: (result['isFriend'], result['hasPendingRequest'], result['hasReceivedRequest'])
+            for result in friend_service.search_users(name, user.id)
+        }
+        
+        assert flags[friend.id] == (False, False, False)
+        assert flags[received.id] == (True, False, False)
+        assert flags[stranger.id] == (False, True, False)
+        
+        db.drop_all()
+
+
+# Property 8: Friend List Follows Friendship Changes
+@given(
+    name1=st.text(min_size=1, max_size=50).filter(lambda x: x.strip()),
+    name2=st.text(min_size=1, max_size=50).filter(lambda x: x.strip())
+)
+@settings(max_examples=10, deadline=None, phases=[Phase.generate])
+def test_friend_list_follows_friendship_changes(name1, name2):
+    """Property 8: Cached friend lists are refreshed when a friendship is added or removed."""
+    app = get_app()
+    friend_service = FriendService()
+    
+    with app.app_context():
+        db.create_all()
+        
+        user1 = create_test_user(name1.strip(), "user1@test.com")
+        user2 = create_test_user(name2.strip(), "user2@test.com")
+        
+        assert friend_service.get_friends(user1.id) == []
+        assert friend_service.get_friends(user2.id) == []
+        
+        request, _ = friend_service.send_friend_request(user1.id, user2.id)
+        friend_service.accept_request(request.id, user2.id)
+        
+        assert [f['id'] for f in friend_service.get_friends(user1.id)] == [user2.id]
+        assert [f['id'] for f in friend_service.get_friends(user2.id)] == [user1.id]
+        
+        friend_service.remove_friend(user2.id, user1.id)
+        
+        success, error = friend_service.remove_friend(user2.id, user1.id)
+        assert not success
+        assert "not found" in error.lower()
+        # The no-op DELETE must not leave its transaction (and write lock) open
+        assert not db.session().in_transaction()
+        
+        assert friend_service.get_friends(user1.id) == []
+        assert friend_service.get_friends(user2.id) == []
+        
+        db.drop_all()
+
+
+# Property 9: Requests Are Accepted Once, By The Recipient
+@given(
+    name1=st.text(min_size=1, max_size=50).filter(lambda x: x.strip()),
+    name2=st.text(min_size=1, max_size=50).filter(lambda x: x.strip())
+)
+@settings(max_examples=10, deadline=None, phases=[Phase.generate])
+def test_request_accepted_once_by_recipient(name1, name2):
+    """Property 9: Only the recipient can accept, and only while the request is pending."""
+    app = get_app()
+    friend_service = FriendService()
+    
+    with app.app_context():
+        db.create_all()
+        
+        user1 = create_test_user(name1.strip(), "user1@test.com")
+        user2 = create_test_user(name2.strip(), "user2@test.com")
+        
+        request, _ = friend_service.send_friend_request(user1.id, user2.id)
+        
+        success, error = friend_service.accept_request(request.id, user1.id)
+        assert not success
+        assert "not authorized" in error.lower()
+        
+        success, error = friend_service.accept_request(str(uuid.uuid4()), user2.id)
+        assert not success
+        assert "not found" in error.lower()
+        
+        success, _ = friend_service.accept_request(request.id, user2.id)
+        assert success
+        
+        success, error = friend_service.accept_request(request.id, user2.id)
+        assert not success
+        assert "no longer pending" in error.lower()
+        
+        assert Friend.query.count() == 2
+        assert db.session.get(FriendRequest, request.id).status == 'accepted'
+        
+        db.drop_all()
+
+
+# Property 10: Pending Request Lists Include The Other User
+@given(sender_count=st.integers(min_value=1, max_value=4))
+@settings(max_examples=10, deadline=None, phases=[Phase.generate])
+def test_request_lists_include_users(sender_count):
+    """Property 10: Received lists carry the sender's details, sent lists the recipient's."""
+    app = get_app()
+    friend_service = FriendService()
+    
+    with app.app_context():
+        db.create_all()
+        
+        user = create_test_user("Recipient", "recipient@test.com")
+        senders = [create_test_user(f"Sender {i}", f"sender{i}@test.com") for i in range(sender_count)]
+        for sender in senders:
+            friend_service.send_friend_request(sender.id, user.id)
+        
+        received = friend_service.get_pending_requests(user.id)
+        assert sorted(r['sender']['id'] for r in received) == sorted(s.id for s in senders)
+        assert all(r['recipientId'] == user.id for r in received)
+        assert {r['sender']['name'] for r in received} == {s.name for s in senders}
+        
+        sent = friend_service.get_sent_requests(senders[0].id)
+        assert [(r['senderId'], r['recipient']['id']) for r in sent] == [(senders[0].id, user.id)]
+        assert sent[0]['recipient']['email'] == user.email
+        
+        db.drop_all()
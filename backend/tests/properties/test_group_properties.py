@@ -137,4 +137,171 @@ def test_only_creator_can_remove(group_name):
         success, error = group_service.remove_member(group.id, creator.id, member2.id)
         assert success
         
+        # Removing again matches nothing and must not leave the UPDATE's transaction open
+        success, error = group_service.remove_member(group.id, creator.id, member2.id)
+        assert not success
+        assert "not found" in error.lower()
+        assert not db.session().in_transaction()
+        
+        db.drop_all()
+
+
+@given(group_name=st.text(min_size=1, max_size=50).filter(lambda x: x.strip()))
+@settings(max_examples=10, deadline=None, phases=[Phase.generate])
+def test_invite_only_friends_not_already_invited(group_name):
+    """Invites go to friends who are not already active or pending members."""
+    app = get_app()
+    group_service = GroupService()
+    
+    with app.app_context():
+        db.create_all()
+        
+        creator = create_test_user("Creator", "creator@test.com")
+        friend = create_test_user("Friend", "friend@test.com")
+        former = create_test_user("Former", "former@test.com")
+        stranger = create_test_user("Stranger", "stranger@test.com")
+        
+        create_friendship(creator.id, friend.id)
+        create_friendship(creator.id, former.id)
+        
+        group, _ = group_service.create_group(creator.id, group_name.strip())
+        group_service.invite_to_group(group.id, creator.id, [former.id])
+        group_service.join_group(group.id, former.id)
+        group_service.leave_group(group.id, former.id)
+        
+        successful, failed = group_service.invite_to_group(
+            group.id, creator.id, [friend.id, friend.id, former.id, stranger.id, creator.id]
+        )
+        
+        assert successful == [friend.id, former.id]
+        assert failed == [friend.id, stranger.id, creator.id]
+        assert GroupMember.query.filter_by(group_id=group.id, status='pending').count() == 2
+        
+        db.drop_all()
+
+
+@given(activity_offsets=st.lists(st.integers(min_value=0, max_value=10000), min_size=1, max_size=5))
+@settings(max_examples=10, deadline=None, phases=[Phase.generate])
+def test_user_groups_ordered_by_activity(activity_offsets):
+    """Groups are listed most recently active first."""
+    from datetime import datetime, timedelta
+    
+    app = get_app()
+    group_service = GroupService()
+    
+    with app.app_context():
+        db.create_all()
+        
+        creator = create_test_user("Creator", "creator@test.com")
+        now = datetime.utcnow()
+        for i, offset in enumerate(activity_offsets):
+            group, _ = group_service.create_group(creator.id, f"Group {i}")
+            group.last_activity_at = now - timedelta(minutes=offset)
+        db.session.commit()
+        
+        activity = [g['lastActivityAt'] for g in group_service.get_user_groups(creator.id)]
+        assert activity == sorted(activity, reverse=True)
+        
+        db.drop_all()
+
+
+@given(group_name=st.text(min_size=1, max_size=50).filter(lambda x: x.strip()))
+@settings(max_examples=10, deadline=None, phases=[Phase.generate])
+def test_user_groups_follow_membership_changes(group_name):
+    """Cached group lists are refreshed when members join or leave."""
+    app = get_app()
+    group_service = GroupService()
+    
+    with app.app_context():
+        db.create_all()
+        
+        creator = create_test_user("Creator", "creator@test.com")
+        member = create_test_user("Member", "member@test.com")
+        create_friendship(creator.id, member.id)
+        
+        group, _ = group_service.create_group(creator.id, group_name.strip())
+        assert group_service.get_user_groups(creator.id)[0]['memberCount'] == 1
+        assert group_service.get_user_groups(member.id) == []
+        
+        group_service.invite_to_group(group.id, creator.id, [member.id])
+        group_service.join_group(group.id, member.id)
+        
+        assert group_service.get_user_groups(creator.id)[0]['memberCount'] == 2
+        assert [g['id'] for g in group_service.get_user_groups(member.id)] == [group.id]
+        
+        group_service.leave_group(group.id, member.id)
+        
+        assert group_service.get_user_groups(creator.id)[0]['memberCount'] == 1
+        assert group_service.get_user_groups(member.id) == []
+        
+        db.drop_all()
+
+
+@given(content=st.text(min_size=1, max_size=200).filter(lambda x: x.strip()))
+@settings(max_examples=10, deadline=None, phases=[Phase.generate])
+def test_only_members_can_message(content):
+    """Only active members can post, and posting bumps the group's activity."""
+    app = get_app()
+    group_service = GroupService()
+    
+    with app.app_context():
+        db.create_all()
+        
+        creator = create_test_user("Creator", "creator@test.com")
+        outsider = create_test_user("Outsider", "outsider@test.com")
+        
+        group, _ = group_service.create_group(creator.id, "Study group")
+        created_activity = group.last_activity_at
+        
+        message, error = group_service.send_group_message(group.id, outsider.id, content)
+        assert message is None
+        assert "not a member" in error.lower()
+        
+        message, error = group_service.send_group_message(group.id, creator.id, content)
+        assert error is None
+        assert message.content == content.strip()
+        assert db.session.get(GroupLearning, group.id).last_activity_at >= created_activity
+        
+        _, error = group_service.get_group(group.id, outsider.id)
+        assert "not a member" in error.lower()
+        _, error = group_service.get_group(str(uuid.uuid4()), creator.id)
+        assert "not found" in error.lower()
+        
+        db.drop_all()
+
+
+@given(
+    message_count=st.integers(min_value=0, max_value=12),
+    page_size=st.integers(min_value=1, max_value=5)
+)
+@settings(max_examples=10, deadline=None, phases=[Phase.generate])
+def test_group_message_pages_cover_history(message_count, page_size):
+    """Walking the message cursor returns every message once, oldest first."""
+    from datetime import datetime
+    
+    app = get_app()
+    group_service = GroupService()
+    
+    with app.app_context():
+        db.create_all()
+        
+        creator = create_test_user("Creator", "creator@test.com")
+        group, _ = group_service.create_group(creator.id, "Study group")
+        sent = [
+            group_service.send_group_message(group.id, creator.id, f"message {i}")[0].id
+            for i in range(message_count)
+        ]
+        
+        seen = []
+        before = None
+        while True:
+            page, error = group_service.get_group_messages(group.id, creator.id, page_size, before)
+            assert error is None
+            seen = [m['id'] for m in page] + seen
+            if len(page) < page_size:
+                break
+            before = (datetime.fromisoformat(page[0]['createdAt']), page[0]['id'])
+        
+        assert seen == sent
+        
         db.drop_all()
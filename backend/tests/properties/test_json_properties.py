@@ -0,0 +1,42 @@
+"""
+Property-based tests for the orjson-backed JSON provider.
+"""
+import json
+from datetime import datetime
+from hypothesis import given, strategies as st, settings
+from flask.json.provider import DefaultJSONProvider
+from app import create_app
+
+
+def get_app():
+    """Create test application."""
+    app = create_app()
+    app.config['TESTING'] = True
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    return app
+
+
+json_values = st.recursive(
+    st.none() | st.booleans() | st.integers(min_value=-2**63, max_value=2**63 - 1)
+    | st.floats(allow_nan=False, allow_infinity=False) | st.text()
+    | st.datetimes(min_value=datetime(1970, 1, 1)),
+    lambda children: st.lists(children, max_size=5) | st.dictionaries(st.text(), children, max_size=5),
+    max_leaves=20
+)
+
+
+@given(value=json_values)
+@settings(max_examples=100, deadline=None)
+def test_provider_matches_standard_library(value):
+    """
+    The app's JSON provider produces the same document as Flask's default
+    provider, including dates, and reads it back the same way.
+    """
+    app = get_app()
+    standard = DefaultJSONProvider(app)
+    
+    with app.app_context():
+        encoded = app.json.dumps(value)
+        
+        assert json.loads(encoded) == json.loads(standard.dumps(value))
+        assert app.json.loads(encoded) == standard.loads(encoded)
@@ -169,3 +169,277 @@ def test_read_status_tracking(message_count):
             assert user2.id in msg['readBy']
         
         db.drop_all()
+
+
+# Property: Keyset pagination covers history without gaps or duplicates
+@given(
+    message_count=st.integers(min_value=1, max_value=12),
+    page_size=st.integers(min_value=1, max_value=5)
+)
+@settings(max_examples=10, deadline=None, phases=[Phase.generate])
+def test_keyset_pagination_completeness(message_count, page_size):
+    """Walking pages with the (createdAt, id) cursor should return every message once."""
+    from datetime import datetime
+    
+    app = get_app()
+    chat_service = ChatService()
+    
+    with app.app_context():
+        db.create_all()
+        
+        user1 = create_test_user("User1", "user1@test.com")
+        user2 = create_test_user("User2", "user2@test.com")
+        create_friendship(user1.id, user2.id)
+        
+        chat, _ = chat_service.get_or_create_direct_chat(user1.id, user2.id)
+        
+        for i in range(message_count):
+            chat_service.send_message(chat.id, user1.id, f"Message {i}")
+        
+        all_messages, _ = chat_service.get_messages(chat.id, user1.id, limit=100)
+        
+        collected = []
+        before = None
+        while True:
+            page, error = chat_service.get_messages(chat.id, user1.id, limit=page_size, before=before)
+            assert error is None
+            if not page:
+                break
+            collected = page + collected
+            oldest = page[0]
+            before = (datetime.fromisoformat(oldest['createdAt']), oldest['id'])
+        
+        assert [m['id'] for m in collected] == [m['id'] for m in all_messages]
+        
+        db.drop_all()
+
+
+# Property: Marking specific messages only touches those messages, once
+@given(
+    message_count=st.integers(min_value=2, max_value=10),
+    data=st.data()
+)
+@settings(max_examples=10, deadline=None, phases=[Phase.generate])
+def test_mark_as_read_selected_messages(message_count, data):
+    """Only the listed messages are marked, and re-marking them updates nothing."""
+    app = get_app()
+    chat_service = ChatService()
+    
+    with app.app_context():
+        db.create_all()
+        
+        user1 = create_test_user("User1", "user1@test.com")
+        user2 = create_test_user("User2", "user2@test.com")
+        create_friendship(user1.id, user2.id)
+        
+        chat, _ = chat_service.get_or_create_direct_chat(user1.id, user2.id)
+        
+        sent_ids = []
+        for i in range(message_count):
+            msg, _ = chat_service.send_message(chat.id, user1.id, f"Message {i}")
+            sent_ids.append(msg.id)
+        
+        selected = data.draw(st.lists(st.sampled_from(sent_ids), min_size=1, unique=True))
+        
+        count, error = chat_service.mark_as_read(chat.id, user2.id, selected)
+        assert error is None
+        assert count == len(selected)
+        
+        count, _ = chat_service.mark_as_read(chat.id, user2.id, selected)
+        assert count == 0
+        
+        messages, _ = chat_service.get_messages(chat.id, user2.id)
+        for msg in messages:
+            assert (user2.id in msg['readBy']) == (msg['id'] in selected)
+            assert msg['readBy'].count(user2.id) <= 1
+        
+        count, _ = chat_service.mark_as_read(chat.id, user2.id)
+        assert count == message_count - len(selected)
+        
+        count, _ = chat_service.mark_as_read(chat.id, user2.id)
+        assert count == 0
+        
+        db.drop_all()
+
+
+# Property: Denormalized unread counters follow send and read
+@given(
+    message_count=st.integers(min_value=2, max_value=10),
+    data=st.data()
+)
+@settings(max_examples=10, deadline=None, phases=[Phase.generate])
+def test_unread_counter_tracking(message_count, data):
+    """send_message increments the recipient's counter; mark_as_read decrements or clears it."""
+    app = get_app()
+    chat_service = ChatService()
+    
+    with app.app_context():
+        db.create_all()
+        
+        user1 = create_test_user("User1", "user1@test.com")
+        user2 = create_test_user("User2", "user2@test.com")
+        create_friendship(user1.id, user2.id)
+        
+        chat, _ = chat_service.get_or_create_direct_chat(user1.id, user2.id)
+        
+        def unread(user):
+            return chat_service.get_user_chats(user.id)[0]['unreadCount']
+        
+        sent_ids = []
+        for i in range(message_count):
+            msg, _ = chat_service.send_message(chat.id, user1.id, f"Message {i}")
+            sent_ids.append(msg.id)
+        chat_service.send_message(chat.id, user2.id, "Reply")
+        
+        assert unread(user2) == message_count
+        assert unread(user1) == 1
+        
+        selected = data.draw(st.lists(st.sampled_from(sent_ids), min_size=1, max_size=message_count - 1, unique=True))
+        chat_service.mark_as_read(chat.id, user2.id, selected)
+        assert unread(user2) == message_count - len(selected)
+        
+        chat_service.mark_as_read(chat.id, user2.id)
+        assert unread(user2) == 0
+        assert unread(user1) == 1
+        
+        db.drop_all()
+
+
+def test_send_message_rejects_outsiders():
+    """Only chat members can send, and a rejected send leaves the chat untouched."""
+    app = get_app()
+    chat_service = ChatService()
+    
+    with app.app_context():
+        db.create_all()
+        
+        user1 = create_test_user("User1", "user1@test.com")
+        user2 = create_test_user("User2", "user2@test.com")
+        outsider = create_test_user("Outsider", "outsider@test.com")
+        create_friendship(user1.id, user2.id)
+        
+        chat, _ = chat_service.get_or_create_direct_chat(user1.id, user2.id)
+        opened_at = chat.last_message_at
+        
+        message, error = chat_service.send_message(chat.id, outsider.id, "Hello")
+        assert message is None
+        assert error == "Not authorized to send messages in this chat"
+        
+        message, error = chat_service.send_message("missing-chat", user1.id, "Hello")
+        assert message is None
+        assert error == "Chat not found"
+        
+        db.session.refresh(chat)
+        assert chat.last_message_at == opened_at
+        assert chat.user1_unread == chat.user2_unread == 0
+        
+        message, error = chat_service.send_message(chat.id, user1.id, "Hello")
+        assert error is None
+        db.session.refresh(chat)
+        assert chat.last_message_at == message.created_at
+        assert (chat.get_unread_count(user1.id), chat.get_unread_count(user2.id)) == (0, 1)
+        
+        db.drop_all()
+
+
+def test_upgrade_schema_backfills_unread_counters():
+    """Adding the unread columns to an existing database backfills them from read_by."""
+    from sqlalchemy import text
+    from app.database import upgrade_schema
+    
+    app = get_app()
+    chat_service = ChatService()
+    
+    with app.app_context():
+        db.create_all()
+        
+        user1 = create_test_user("User1", "user1@test.com")
+        user2 = create_test_user("User2", "user2@test.com")
+        create_friendship(user1.id, user2.id)
+        
+        chat, _ = chat_service.get_or_create_direct_chat(user1.id, user2.id)
+        for i in range(3):
+            chat_service.send_message(chat.id, user1.id, f"Message {i}")
+        chat_service.send_message(chat.id, user2.id, "Reply")
+        first_id = chat_service.get_messages(chat.id, user2.id)[0][0]['id']
+        chat_service.mark_as_read(chat.id, user2.id, [first_id])
+        
+        # Simulate a database created before the counters existed
+        db.session.execute(text('ALTER TABLE direct_chats DROP COLUMN user1_unread'))
+        db.session.execute(text('ALTER TABLE direct_chats DROP COLUMN user2_unread'))
+        db.session.commit()
+        db.session.expire_all()
+        
+        upgrade_schema()
+        upgrade_schema()
+        
+        assert chat_service.get_user_chats(user2.id)[0]['unreadCount'] == 2
+        assert chat_service.get_user_chats(user1.id)[0]['unreadCount'] == 1
+        
+        db.drop_all()
+
+
+def test_upgrade_schema_imports_legacy_read_by():
+    """Receipts stored in the legacy read_by JSON column move to message_reads."""
+    from sqlalchemy import text
+    from app.database import upgrade_schema
+    from app.models.message import MessageRead
+    
+    app = get_app()
+    chat_service = ChatService()
+    
+    with app.app_context():
+        db.create_all()
+        
+        user1 = create_test_user("User1", "user1@test.com")
+        user2 = create_test_user("User2", "user2@test.com")
+        create_friendship(user1.id, user2.id)
+        
+        chat, _ = chat_service.get_or_create_direct_chat(user1.id, user2.id)
+        read_msg, _ = chat_service.send_message(chat.id, user1.id, "Read")
+        unread_msg, _ = chat_service.send_message(chat.id, user1.id, "Unread")
+        read_id, unread_id = read_msg.id, unread_msg.id
+        
+        # Simulate a database that still keeps receipts in read_by
+        db.session.execute(text('ALTER TABLE direct_messages ADD COLUMN read_by JSON'))
+        db.session.execute(text('UPDATE direct_messages SET read_by = :read_by WHERE id = :id'),
+                           {'read_by': f'["{user1.id}", "{user2.id}"]', 'id': read_id})
+        db.session.execute(text('UPDATE direct_messages SET read_by = :read_by WHERE id = :id'),
+                           {'read_by': f'["{user1.id}"]', 'id': unread_id})
+        db.session.query(MessageRead).delete()
+        db.session.commit()
+        
+        upgrade_schema()
+        upgrade_schema()
+        
+        messages = {msg['id']: msg for msg in chat_service.get_messages(chat.id, user2.id)[0]}
+        assert sorted(messages[read_id]['readBy']) == sorted([user1.id, user2.id])
+        assert messages[unread_id]['readBy'] == [user1.id]
+        
+        db.drop_all()
+
+
+# Property: One canonical chat per pair regardless of who opens it
+@given(reverse=st.booleans())
+@settings(max_examples=4, deadline=None, phases=[Phase.generate])
+def test_direct_chat_canonical_ordering(reverse):
+    """Opening a chat from either side returns the same row with user1_id < user2_id."""
+    app = get_app()
+    chat_service = ChatService()
+    
+    with app.app_context():
+        db.create_all()
+        
+        user1 = create_test_user("User1", "user1@test.com")
+        user2 = create_test_user("User2", "user2@test.com")
+        create_friendship(user1.id, user2.id)
+        
+        first, second = (user2, user1) if reverse else (user1, user2)
+        chat_a, _ = chat_service.get_or_create_direct_chat(first.id, second.id)
+        chat_b, _ = chat_service.get_or_create_direct_chat(second.id, first.id)
+        
+        assert chat_a.id == chat_b.id
+        assert chat_a.user1_id < chat_a.user2_id
+        assert DirectChat.query.count() == 1
+        
+        db.drop_all()
@@ -244,7 +244,8 @@ class TestRetryHandlerProperties:
         handler = RetryHandler(
             max_attempts=max_attempts,
             base_delay=base_delay,
-            max_delay=max_delay
+            max_delay=max_delay,
+            jitter="none"
         )
         
         delay = handler.calculate_delay(attempt)
@@ -264,6 +265,34 @@ class TestRetryHandlerProperties:
             assert delay >= base_delay, \
                 f"Initial delay should be at least base_delay {base_delay}"
     
+    @settings(max_examples=100, deadline=None)
+    @given(
+        base_delay=st.floats(min_value=0.001, max_value=1.0, allow_nan=False),
+        attempt=st.integers(min_value=0, max_value=10),
+        jitter=st.sampled_from(["full", "equal"])
+    )
+    def test_jittered_backoff_stays_within_cap(self, base_delay, attempt, jitter):
+        """
+        Test that jittered delays stay between their floor and the
+        exponential cap.
+        
+        Full jitter draws from [0, cap]; equal jitter from [cap/2, cap].
+        """
+        max_delay = base_delay * 100
+        handler = RetryHandler(base_delay=base_delay, max_delay=max_delay, jitter=jitter)
+        
+        cap = min(base_delay * (2 ** attempt), max_delay)
+        floor = 0.0 if jitter == "full" else cap / 2
+        
+        for _ in range(20):
+            delay = handler.calculate_delay(attempt)
+            assert floor <= delay <= cap
+    
+    def test_unknown_jitter_mode_rejected(self):
+        """Test that an unknown jitter mode is rejected at construction."""
+        with pytest.raises(ValueError):
+            RetryHandler(jitter="sometimes")
+    
     @settings(max_examples=100, deadline=None)
     @given(retry_after=st.integers(min_value=1, max_value=60))
     def test_retry_after_respected(self, retry_after):
@@ -394,6 +423,24 @@ class TestAIErrorResponseProperties:
         network_response = AIErrorResponse.from_exception(ConnectionError(error_message))
         assert network_response.error_type == "network"
     
+    def test_error_subclasses_use_nearest_registered_type(self):
+        """
+        Test that an exception subclass is categorized like its nearest
+        registered base class.
+        """
+        class QuotaError(RateLimitError):
+            pass
+        
+        class SocketTimeout(ConnectionError):
+            pass
+        
+        quota_response = AIErrorResponse.from_exception(QuotaError("quota", retry_after=5))
+        assert quota_response.error_type == "rate_limit"
+        assert quota_response.retry_after == 5
+        
+        assert AIErrorResponse.from_exception(SocketTimeout("reset")).error_type == "network"
+        assert AIErrorResponse.from_exception(ValueError("bad")).error_type == "unknown"
+    
     @settings(max_examples=100, deadline=None)
     @given(retry_after=st.integers(min_value=1, max_value=300))
     def test_retry_after_preserved(self, retry_after):
@@ -408,6 +455,9 @@ class TestAIErrorResponseProperties:
         assert response.retry_after == retry_after, \
             f"retry_after should be preserved: expected {retry_after}, got {response.retry_after}"
         
+        # Slotted: no per-instance __dict__
+        assert not hasattr(response, '__dict__')
+        
         # Should also be in dict when present
         response_dict = response.to_dict()
         assert response_dict.get("retry_after") == retry_after, \
@@ -1610,3 +1660,618 @@ class TestFallbackModeProperties:
                 os.environ["NEBIUS_API_KEY"] = original_value
             elif "NEBIUS_API_KEY" in os.environ:
                 del os.environ["NEBIUS_API_KEY"]
+
+
+class TestBatchChatCompletionProperties:
+    """Property-based tests for concurrent batch chat completions."""
+    
+    @settings(max_examples=20, deadline=None)
+    @given(
+        prompts=st.lists(st.text(min_size=1, max_size=50), min_size=0, max_size=12),
+        max_concurrency=st.integers(min_value=1, max_value=4)
+    )
+    def test_batch_preserves_order_and_bounds_concurrency(self, prompts, max_concurrency):
+        """
+        Batch results come back in input order, with no more than
+        max_concurrency requests in flight at once.
+        """
+        import threading
+        import time
+        from app.services.nebius_client import NebiusClient
+        
+        config = NebiusConfig(api_key=None)
+        client = NebiusClient(config=config)
+        
+        lock = threading.Lock()
+        in_flight = [0]
+        peak = [0]
+        
+        def fake_completion(messages, **kwargs):
+            with lock:
+                in_flight[0] += 1
+                peak[0] = max(peak[0], in_flight[0])
+            time.sleep(0.001)
+            with lock:
+                in_flight[0] -= 1
+            return messages[-1]["content"].upper()
+        
+        client.chat_completion = fake_completion
+        
+        results = client.batch_chat_completion(
+            [[{"role": "user", "content": p}] for p in prompts],
+            max_concurrency=max_concurrency
+        )
+        
+        assert results == [p.upper() for p in prompts]
+        assert peak[0] <= max_concurrency
+
+
+class TestRateLimiterProperties:
+    """Property-based tests for client-side RPM/TPM throttling."""
+    
+    @settings(max_examples=100, deadline=None)
+    @given(
+        rpm=st.integers(min_value=1, max_value=120),
+        tpm=st.integers(min_value=100, max_value=10000),
+        costs=st.lists(st.integers(min_value=0, max_value=5000), min_size=1, max_size=40)
+    )
+    def test_limiter_never_exceeds_budget(self, rpm, tpm, costs):
+        """
+        By any point in time T, the limiter has admitted no more requests or
+        tokens than one minute's burst plus what refilled during T.
+        """
+        from app.services import rate_limiter as rate_limiter_module
+        from app.services.rate_limiter import RateLimiter
+        
+        clock = [1000.0]
+        
+        def fake_sleep(seconds):
+            clock[0] += seconds
+        
+        with patch.object(rate_limiter_module.time, 'monotonic', lambda: clock[0]), \
+             patch.object(rate_limiter_module.time, 'sleep', fake_sleep):
+            limiter = RateLimiter(requests_per_minute=rpm, tokens_per_minute=tpm)
+            start = clock[0]
+            used_tokens = 0
+            
+            for count, cost in enumerate(costs, start=1):
+                limiter.acquire(cost)
+                used_tokens += min(cost, tpm)
+                elapsed = clock[0] - start
+                
+                assert count <= rpm + rpm * elapsed / 60.0 + 1e-6
+                assert used_tokens <= tpm + tpm * elapsed / 60.0 + 1e-6
+    
+    @settings(max_examples=50, deadline=None)
+    @given(seconds=st.integers(min_value=1, max_value=120))
+    def test_pause_holds_back_calls(self, seconds):
+        """
+        After pause(seconds), the next call waits out the pause even when
+        no RPM/TPM limit is configured.
+        """
+        from app.services import rate_limiter as rate_limiter_module
+        from app.services.rate_limiter import RateLimiter
+        
+        clock = [1000.0]
+        
+        def fake_sleep(delay):
+            clock[0] += delay
+        
+        with patch.object(rate_limiter_module.time, 'monotonic', lambda: clock[0]), \
+             patch.object(rate_limiter_module.time, 'sleep', fake_sleep):
+            limiter = RateLimiter()
+            assert limiter.acquire() == 0
+            
+            limiter.pause(seconds)
+            waited = limiter.acquire()
+            
+            assert abs(waited - seconds) < 1e-6
+
+
+class TestClientRetryProperties:
+    """Property-based tests for NebiusClient's retry loop and model fallback."""
+    
+    @staticmethod
+    def _make_client(retry_attempts):
+        from app.services.nebius_client import NebiusClient
+        
+        config = NebiusConfig.default()
+        config.api_key = "test-key"
+        config.retry_attempts = retry_attempts
+        client = NebiusClient(config=config)
+        client._client = MagicMock()
+        return client
+    
+    @staticmethod
+    def _connection_error():
+        from openai import APIConnectionError
+        
+        return APIConnectionError(request=MagicMock())
+    
+    @staticmethod
+    def _response(text):
+        response = MagicMock()
+        response.choices[0].message.content = text
+        return response
+    
+    @staticmethod
+    def _server_error():
+        from openai import InternalServerError
+        
+        response = MagicMock(status_code=503, headers={})
+        return InternalServerError("Service unavailable", response=response, body=None)
+    
+    @settings(max_examples=30, deadline=None)
+    @given(retry_attempts=st.integers(min_value=1, max_value=5))
+    def test_transient_error_switches_to_fallback_without_retry(self, retry_attempts):
+        """
+        A transient error on the primary model is not retried by the client
+        (that is the RetryHandler's job): the fallback is tried at once.
+        """
+        client = self._make_client(retry_attempts)
+        create = client._client.chat.completions.create
+        create.side_effect = [self._connection_error(), self._response("ok")]
+        
+        with patch('app.services.nebius_client.time.sleep') as mock_sleep:
+            result = client.chat_completion([{"role": "user", "content": "hi"}])
+        
+        assert result == "ok"
+        models = [c.kwargs["model"] for c in create.call_args_list]
+        tutor = client.config.tutor_model
+        assert models == [tutor.model_id, tutor.fallback_model_id]
+        assert mock_sleep.call_count == 0
+    
+    @settings(max_examples=30, deadline=None)
+    @given(retry_attempts=st.integers(min_value=1, max_value=5))
+    def test_non_transient_error_switches_to_fallback_once(self, retry_attempts):
+        """
+        A non-transient error moves straight to the fallback model without
+        retrying or sleeping; the fallback's error is the one raised.
+        """
+        client = self._make_client(retry_attempts)
+        create = client._client.chat.completions.create
+        create.side_effect = [ValueError("bad request"), ValueError("still bad")]
+        
+        with patch('app.services.nebius_client.time.sleep') as mock_sleep:
+            with pytest.raises(ValueError, match="still bad"):
+                client.chat_completion([{"role": "user", "content": "hi"}])
+        
+        models = [c.kwargs["model"] for c in create.call_args_list]
+        tutor = client.config.tutor_model
+        assert models == [tutor.model_id, tutor.fallback_model_id]
+        assert mock_sleep.call_count == 0
+    
+    @settings(max_examples=30, deadline=None)
+    @given(retry_attempts=st.integers(min_value=1, max_value=5))
+    def test_attempts_are_bounded(self, retry_attempts):
+        """
+        When every call fails transiently, each model is tried exactly once
+        and the last error is raised.
+        """
+        from openai import APIConnectionError
+        
+        client = self._make_client(retry_attempts)
+        create = client._client.embeddings.create
+        create.side_effect = self._connection_error()
+        
+        with pytest.raises(APIConnectionError):
+            client.create_embedding("some text")
+        
+        assert create.call_count == 2
+    
+    @staticmethod
+    def _make_orchestrator(client):
+        orchestrator = AgentOrchestrator(config=client.config, nebius_client=client)
+        orchestrator._agents["TutorAgent"] = AgentPrompt(
+            name="TutorAgent",
+            role="AI Tutor",
+            description="Test tutor agent",
+            system_prompt="You are a helpful AI tutor.",
+            example_format={},
+            context_guidance=[]
+        )
+        orchestrator._loaded = True
+        return orchestrator
+    
+    @settings(max_examples=10, deadline=None)
+    @given(retry_attempts=st.integers(min_value=1, max_value=2))
+    def test_orchestrator_retries_in_one_layer(self, retry_attempts):
+        """
+        Through the orchestrator, a persistent 503 costs retry_attempts
+        RetryHandler attempts of primary + fallback each, and no more.
+        """
+        client = self._make_client(retry_attempts)
+        create = client._client.chat.completions.create
+        create.side_effect = self._server_error()
+        
+        orchestrator = self._make_orchestrator(client)
+        
+        with patch('app.services.retry_handler.time.sleep'):
+            response = orchestrator.process_chat("hi", stream=False)
+        
+        assert "temporarily unavailable" in response
+        assert create.call_count == retry_attempts * 2
+    
+    def test_breaker_counts_every_upstream_call(self):
+        """
+        Each failed upstream call counts toward the client's breaker, so a
+        dead service sees failure_threshold calls and then none at all.
+        """
+        client = self._make_client(retry_attempts=5)
+        create = client._client.chat.completions.create
+        create.side_effect = self._server_error()
+        orchestrator = self._make_orchestrator(client)
+        
+        with patch('app.services.retry_handler.time.sleep') as mock_sleep:
+            orchestrator.process_chat("hi", stream=False)
+            assert create.call_count == client._breaker.failure_threshold
+            
+            sleeps = mock_sleep.call_count
+            response = orchestrator.process_chat("hi again", stream=False)
+        
+        assert "temporarily unavailable" in response
+        assert create.call_count == client._breaker.failure_threshold
+        # An open circuit is not retried by the RetryHandler
+        assert mock_sleep.call_count == sleeps
+    
+    @settings(max_examples=50, deadline=None)
+    @given(
+        texts=st.lists(st.text(max_size=20), min_size=0, max_size=30),
+        batch_size=st.integers(min_value=1, max_value=10)
+    )
+    def test_create_embeddings_batches_and_preserves_order(self, texts, batch_size):
+        """
+        create_embeddings makes ceil(N / batch_size) requests for N distinct
+        texts and returns one vector per text in input order, even if the
+        API reorders its data.
+        """
+        client = self._make_client(retry_attempts=1)
+        
+        def fake_create(model, input):
+            response = MagicMock()
+            items = []
+            for index, text in reversed(list(enumerate(input))):
+                item = MagicMock()
+                item.index = index
+                item.embedding = [float(len(text)), float(hash(text) % 1000)]
+                items.append(item)
+            response.data = items
+            return response
+        
+        create = client._client.embeddings.create
+        create.side_effect = fake_create
+        
+        result = client.create_embeddings(texts, batch_size=batch_size)
+        
+        assert result == [(float(len(t)), float(hash(t) % 1000)) for t in texts]
+        assert create.call_count == -(-len(set(texts)) // batch_size)
+
+
+class TestStreamCoalescingProperties:
+    """Property-based tests for stream chunk coalescing."""
+    
+    @settings(max_examples=100, deadline=None)
+    @given(
+        deltas=st.lists(st.one_of(st.none(), st.text(max_size=120)), max_size=40),
+        min_chunk=st.integers(min_value=1, max_value=30),
+        extra=st.integers(min_value=0, max_value=60)
+    )
+    def test_stream_pieces_are_bounded_and_lossless(self, deltas, min_chunk, extra):
+        """
+        The streamed pieces join back to the full text; every piece is at
+        most stream_max_chunk long and, except the last, at least
+        stream_min_chunk long.
+        """
+        from app.services.nebius_client import NebiusClient
+        
+        config = NebiusConfig(api_key=None)
+        config.stream_min_chunk = min_chunk
+        config.stream_max_chunk = min_chunk + extra
+        client = NebiusClient(config=config)
+        
+        chunks = []
+        for delta in deltas:
+            chunk = MagicMock()
+            chunk.choices[0].delta.content = delta
+            chunks.append(chunk)
+        
+        pieces = list(client._stream_response(iter(chunks)))
+        
+        assert "".join(pieces) == "".join(d for d in deltas if d)
+        assert all(0 < len(p) <= config.stream_max_chunk for p in pieces)
+        assert all(len(p) >= min_chunk for p in pieces[:-1])
+
+
+class TestVisionImageEncodingProperties:
+    """Property-based tests for building vision image data URLs."""
+    
+    @settings(max_examples=100, deadline=None)
+    @given(
+        signature=st.sampled_from([
+            (b'\x89PNG\r\n\x1a\n', 'image/png'),
+            (b'\xff\xd8\xff', 'image/jpeg'),
+            (b'GIF89a', 'image/gif'),
+            (b'RIFF\x00\x00\x00\x00WEBP', 'image/webp'),
+            (b'', 'image/jpeg'),
+        ]),
+        body=st.binary(max_size=200),
+        as_base64=st.booleans()
+    )
+    def test_data_url_matches_image(self, signature, body, as_base64):
+        """
+        The data URL carries the image's real MIME type and decodes back to
+        the original bytes, whether the image came as bytes or base64.
+        """
+        import base64
+        from app.services.nebius_client import NebiusClient
+        
+        magic, mime_type = signature
+        assume(magic or not any(body.startswith(m) for m in (b'\x89PNG', b'\xff\xd8', b'GIF8', b'RIFF')))
+        image = magic + body
+        image_data = base64.b64encode(image).decode('ascii') if as_base64 else image
+        
+        url = NebiusClient._image_data_url(image_data)
+        
+        prefix = f"data:{mime_type};base64,"
+        assert url.startswith(prefix)
+        assert base64.b64decode(url[len(prefix):]) == image
+
+
+class TestDefaultModelConfigProperties:
+    """Property-based tests for sharing the default model configs safely."""
+    
+    @settings(max_examples=50, deadline=None)
+    @given(
+        temperature=st.floats(min_value=0.0, max_value=2.0, allow_nan=False),
+        max_tokens=st.integers(min_value=1, max_value=100000)
+    )
+    def test_default_configs_do_not_share_state(self, temperature, max_tokens):
+        """
+        Mutating one default config's model settings never leaks into the
+        module defaults or into configs created afterwards.
+        """
+        from app.services.nebius_config import DEFAULT_TUTOR_MODEL
+        
+        original = ModelConfig.from_dict(DEFAULT_TUTOR_MODEL.to_dict())
+        
+        config = NebiusConfig.default()
+        config.tutor_model.temperature = temperature
+        config.tutor_model.max_tokens = max_tokens
+        
+        assert DEFAULT_TUTOR_MODEL == original
+        assert NebiusConfig.default().tutor_model == original
+        assert NebiusConfig(api_key=None).tutor_model == original
+    
+    @settings(max_examples=20, deadline=None)
+    @given(api_key=st.text(min_size=1, max_size=20))
+    def test_client_api_key_does_not_mutate_config(self, api_key):
+        """Passing api_key to NebiusClient leaves the caller's config untouched."""
+        from app.services.nebius_client import NebiusClient
+        
+        config = NebiusConfig(api_key=None)
+        with patch('app.services.nebius_client.OpenAI'):
+            client = NebiusClient(api_key=api_key, config=config)
+        
+        assert config.api_key is None
+        assert client.config.api_key == api_key
+
+
+class TestFallbackEmbeddingProperties:
+    """Property-based tests for embeddings in fallback mode."""
+    
+    @settings(max_examples=20, deadline=None)
+    @given(texts=st.lists(st.text(max_size=20), max_size=10))
+    def test_fallback_embeddings_share_read_only_zero_vector(self, texts):
+        """
+        In fallback mode every text gets the same immutable 4096-wide zero
+        vector, so no per-call vectors are allocated.
+        """
+        from app.services.nebius_client import NebiusClient, ZERO_EMBEDDING
+        
+        client = NebiusClient(config=NebiusConfig(api_key=None))
+        
+        embeddings = client.create_embeddings(texts)
+        
+        assert len(embeddings) == len(texts)
+        assert all(e is ZERO_EMBEDDING for e in embeddings)
+        assert len(ZERO_EMBEDDING) == 4096 and not any(ZERO_EMBEDDING)
+        assert client.create_embedding("text") is ZERO_EMBEDDING
+        
+        with pytest.raises(TypeError):
+            ZERO_EMBEDDING[0] = 1.0
+
+
+class TestSharedHttpClientProperties:
+    """Property-based tests for connection reuse across NebiusClients."""
+    
+    @settings(max_examples=10, deadline=None)
+    @given(count=st.integers(min_value=2, max_value=5))
+    def test_clients_share_one_connection_pool(self, count):
+        """Every NebiusClient with an API key uses the same HTTP client."""
+        from app.services.nebius_client import NebiusClient
+        
+        config = NebiusConfig(api_key="test-key")
+        clients = [NebiusClient(config=config) for _ in range(count)]
+        
+        pools = {id(client._client._client) for client in clients}
+        assert len(pools) == 1
+        assert clients[0]._client.timeout == config.timeout
+
+
+
+class TestEmbeddingCacheProperties:
+    """Property-based tests for the per-client embedding cache."""
+    
+    @settings(max_examples=30, deadline=None)
+    @given(
+        first=st.lists(st.text(max_size=10), min_size=1, max_size=10),
+        second=st.lists(st.text(max_size=10), min_size=1, max_size=10)
+    )
+    def test_embedding_cache_skips_repeated_texts(self, first, second):
+        """
+        Texts embedded before are served from the cache; only new texts
+        reach the API, until the cache is cleared.
+        """
+        client = TestClientRetryProperties._make_client(retry_attempts=1)
+        requested = []
+        
+        def fake_create(model, input):
+            requested.extend(input)
+            response = MagicMock()
+            items = []
+            for index, text in enumerate(input):
+                item = MagicMock()
+                item.index = index
+                item.embedding = [float(len(text))]
+                items.append(item)
+            response.data = items
+            return response
+        
+        client._client.embeddings.create.side_effect = fake_create
+        
+        client.create_embeddings(first)
+        requested.clear()
+        result = client.create_embeddings(second)
+        
+        assert result == [(float(len(t)),) for t in second]
+        assert sorted(requested) == sorted(set(second) - set(first))
+        
+        client.clear_embedding_cache()
+        requested.clear()
+        client.create_embeddings(second)
+        assert sorted(requested) == sorted(set(second))
+    
+    @settings(max_examples=10, deadline=None)
+    @given(text=st.text(max_size=10))
+    def test_fallback_model_embeddings_are_not_cached(self, text):
+        """
+        Vectors produced by the fallback model are returned but not cached
+        under the primary model, so the next call tries the primary again.
+        """
+        client = TestClientRetryProperties._make_client(retry_attempts=1)
+        primary = client.config.embedding_model.model_id
+        
+        def fake_create(model, input):
+            if model == primary:
+                raise ValueError("primary down")
+            response = MagicMock()
+            item = MagicMock()
+            item.index = 0
+            item.embedding = [1.0]
+            response.data = [item]
+            return response
+        
+        create = client._client.embeddings.create
+        create.side_effect = fake_create
+        
+        assert client.create_embedding(text) == (1.0,)
+        assert client.create_embedding(text) == (1.0,)
+        assert [c.kwargs["model"] for c in create.call_args_list].count(primary) == 2
+
+
+class TestConfigSlotsProperties:
+    """Property-based tests for the slotted config dataclasses."""
+    
+    @settings(max_examples=20, deadline=None)
+    @given(attribute=st.from_regex(r"[a-z]{3,12}_typo", fullmatch=True))
+    def test_configs_reject_unknown_attributes(self, attribute):
+        """
+        Config objects have no per-instance __dict__, so misspelled settings
+        fail loudly instead of being silently ignored.
+        """
+        config = NebiusConfig.default()
+        
+        for obj in (config, config.tutor_model):
+            assert not hasattr(obj, '__dict__')
+            with pytest.raises(AttributeError):
+                setattr(obj, attribute, 1)
+
+
+class TestCircuitBreakerProperties:
+    """Property-based tests for failing fast during upstream outages."""
+    
+    @settings(max_examples=50, deadline=None)
+    @given(
+        threshold=st.integers(min_value=1, max_value=6),
+        max_attempts=st.integers(min_value=1, max_value=4),
+        recovery=st.integers(min_value=1, max_value=60)
+    )
+    def test_open_circuit_fails_fast_until_recovery(self, threshold, max_attempts, recovery):
+        """
+        After threshold consecutive failures, execute() raises
+        CircuitOpenError without calling the API until recovery_timeout has
+        passed; then a single successful trial closes the circuit.
+        """
+        from app.services import circuit_breaker as breaker_module
+        from app.services.circuit_breaker import CircuitBreaker
+        from app.services.retry_handler import CircuitOpenError
+        
+        clock = [1000.0]
+        calls = []
+        failing = [True]
+        
+        def api_call():
+            calls.append(clock[0])
+            if failing[0]:
+                raise ServerError("down")
+            return "ok"
+        
+        with patch.object(breaker_module.time, 'monotonic', lambda: clock[0]), \
+             patch('app.services.retry_handler.time.sleep'):
+            breaker = CircuitBreaker(failure_threshold=threshold, recovery_timeout=recovery)
+            handler = RetryHandler(max_attempts=max_attempts, base_delay=0.001, max_delay=0.01,
+                                   circuit_breaker=breaker)
+            
+            while breaker.state == "closed":
+                with pytest.raises(ServerError):
+                    handler.execute(api_call)
+            assert len(calls) == threshold
+            
+            with pytest.raises(CircuitOpenError) as excinfo:
+                handler.execute(api_call)
+            assert len(calls) == threshold
+            assert excinfo.value.retry_after == recovery
+            assert AIErrorResponse.from_exception(excinfo.value).retry_after == recovery
+            
+            clock[0] += recovery
+            failing[0] = False
+            assert handler.execute(api_call) == "ok"
+            assert breaker.state == "closed"
+    
+    def test_failed_trial_reopens_circuit(self):
+        """A failing half-open trial call re-opens the circuit at once."""
+        from app.services import circuit_breaker as breaker_module
+        from app.services.circuit_breaker import CircuitBreaker
+        
+        clock = [1000.0]
+        
+        with patch.object(breaker_module.time, 'monotonic', lambda: clock[0]):
+            breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=10)
+            breaker.record_failure()
+            assert breaker.allow()
+            breaker.record_failure()
+            assert not breaker.allow()
+            
+            clock[0] += 10
+            assert breaker.allow()
+            # Only one trial call at a time
+            assert not breaker.allow()
+            
+            breaker.record_failure()
+            assert breaker.state == "open"
+            assert not breaker.allow()
+    
+    def test_client_errors_do_not_trip_breaker(self):
+        """Non-retryable errors mean the service answered; they never open the circuit."""
+        from app.services.circuit_breaker import CircuitBreaker
+        
+        breaker = CircuitBreaker(failure_threshold=1)
+        handler = RetryHandler(circuit_breaker=breaker)
+        
+        def bad_request():
+            raise ClientError("bad", 400)
+        
+        for _ in range(3):
+            with pytest.raises(ClientError):
+                handler.execute(bad_request)
+        assert breaker.state == "closed"
@@ -121,3 +121,201 @@ def test_status_updates(status):
         assert presence_data['status'] == status
         
         db.drop_all()
+
+
+# Property: Friends presence only covers friends, in one query
+@given(
+    states=st.lists(st.sampled_from(['none', 'online', 'offline']), min_size=0, max_size=5),
+    stranger_online=st.booleans()
+)
+@settings(max_examples=10, deadline=None, phases=[Phase.generate])
+def test_friends_presence_matches_friendships(states, stranger_online):
+    """
+    Friends presence lists every friend exactly once (offline if they have
+    no presence record) and never includes non-friends; online friends are
+    exactly those marked online.
+    """
+    from sqlalchemy import event
+    
+    app = get_app()
+    presence_service = PresenceService()
+    
+    with app.app_context():
+        db.create_all()
+        
+        main_user = create_test_user("MainUser", "main@test.com")
+        stranger = create_test_user("Stranger", "stranger@test.com")
+        if stranger_online:
+            presence_service.set_online(stranger.id, "stranger_socket")
+        
+        expected_online = set()
+        friend_ids = set()
+        for i, state in enumerate(states):
+            friend = create_test_user(f"Friend{i}", f"friend{i}@test.com")
+            create_friendship(main_user.id, friend.id)
+            friend_ids.add(friend.id)
+            if state in ('online', 'offline'):
+                presence_service.set_online(friend.id, f"socket_{i}")
+            if state == 'offline':
+                presence_service.set_offline(friend.id)
+            if state == 'online':
+                expected_online.add(friend.id)
+        
+        main_user_id = main_user.id
+        statements = []
+        
+        def count(*args):
+            statements.append(args)
+        
+        event.listen(db.engine, 'before_cursor_execute', count)
+        try:
+            presences = presence_service.get_friends_presence(main_user_id)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', count)
+        
+        assert len(statements) == 1
+        assert sorted(p['userId'] for p in presences) == sorted(friend_ids)
+        assert {p['userId'] for p in presences if p['isOnline']} == expected_online
+        assert all(p['status'] == 'available' for p in presences)
+        assert set(presence_service.get_online_friends(main_user.id)) == expected_online
+        
+        db.drop_all()
+
+
+# Property: Socket lookups only return live connections
+@given(states=st.lists(st.sampled_from(['none', 'online', 'no_socket', 'offline']), min_size=0, max_size=5))
+@settings(max_examples=10, deadline=None, phases=[Phase.generate])
+def test_socket_ids_only_for_online_users(states):
+    """
+    Socket lookups return a socket ID only for users who are online with a
+    socket; everyone else is left out (or gets None).
+    """
+    app = get_app()
+    presence_service = PresenceService()
+    
+    with app.app_context():
+        db.create_all()
+        
+        user_ids = []
+        expected = {}
+        for i, state in enumerate(states):
+            user = create_test_user(f"User{i}", f"user{i}@test.com")
+            user_ids.append(user.id)
+            if state == 'online':
+                presence_service.set_online(user.id, f"socket_{i}")
+                expected[user.id] = f"socket_{i}"
+            elif state == 'no_socket':
+                presence_service.set_online(user.id)
+            elif state == 'offline':
+                presence_service.set_online(user.id, f"socket_{i}")
+                presence_service.set_offline(user.id)
+        
+        assert presence_service.get_socket_ids_for_users(user_ids) == expected
+        for user_id in user_ids:
+            assert presence_service.get_socket_id(user_id) == expected.get(user_id)
+        
+        db.drop_all()
+
+
+# Property: Presence writes keep one row per user
+@given(
+    actions=st.lists(
+        st.one_of(
+            st.tuples(st.just('online'), st.sampled_from(['s1', 's2', None])),
+            st.tuples(st.just('offline'), st.none()),
+            st.tuples(st.just('status'), st.sampled_from(['available', 'busy', 'away', 'in_call']))
+        ),
+        min_size=1,
+        max_size=8
+    )
+)
+@settings(max_examples=10, deadline=None, phases=[Phase.generate])
+def test_presence_writes_keep_one_row(actions):
+    """
+    Any sequence of presence writes leaves at most one presence row per
+    user, matching the last write; offline/status writes on a user with
+    no row write nothing and return None.
+    """
+    from app.models.user_presence import UserPresence
+    
+    app = get_app()
+    presence_service = PresenceService()
+    
+    with app.app_context():
+        db.create_all()
+        
+        user = create_test_user("User", "user@test.com")
+        expected = None
+        
+        for action, value in actions:
+            if action == 'online':
+                presence = presence_service.set_online(user.id, value)
+                expected = {'isOnline': True, 'status': 'available'}
+                assert presence.socket_id == value
+            elif action == 'offline':
+                presence = presence_service.set_offline(user.id)
+                if expected is not None:
+                    expected = {'isOnline': False, 'status': 'available'}
+            else:
+                presence = presence_service.set_status(user.id, value)
+                if expected is not None:
+                    expected['status'] = value
+            
+            if expected is None:
+                assert presence is None
+            else:
+                assert presence.is_online == expected['isOnline']
+                assert presence.current_status == expected['status']
+        
+        assert UserPresence.query.filter_by(user_id=user.id).count() == (0 if expected is None else 1)
+        
+        db.drop_all()
+
+
+# Property: Cached presence follows writes
+@given(statuses=st.lists(st.sampled_from(['available', 'busy', 'away', 'in_call']), min_size=1, max_size=4))
+@settings(max_examples=10, deadline=None, phases=[Phase.generate])
+def test_cached_presence_follows_writes(statuses):
+    """
+    Repeated presence reads are served from cache without queries, and
+    every presence write is visible to the next read.
+    """
+    from sqlalchemy import event
+    
+    app = get_app()
+    presence_service = PresenceService()
+    
+    with app.app_context():
+        db.create_all()
+        
+        user = create_test_user("User", "user@test.com")
+        user_id = user.id
+        
+        assert presence_service.get_presence(user_id)['isOnline'] is False
+        assert presence_service.get_socket_id(user_id) is None
+        
+        presence_service.set_online(user_id, "socket_1")
+        assert presence_service.get_presence(user_id)['isOnline'] is True
+        
+        for status in statuses:
+            presence_service.set_status(user_id, status)
+            assert presence_service.get_presence(user_id)['status'] == status
+        
+        statements = []
+        
+        def count(*args):
+            statements.append(args)
+        
+        event.listen(db.engine, 'before_cursor_execute', count)
+        try:
+            assert presence_service.get_socket_id(user_id) == "socket_1"
+            assert presence_service.get_presence(user_id)['status'] == statuses[-1]
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', count)
+        assert statements == []
+        
+        presence_service.set_offline(user_id)
+        assert presence_service.get_presence(user_id)['isOnline'] is False
+        assert presence_service.get_socket_id(user_id) is None
+        
+        db.drop_all()
@@ -186,6 +186,29 @@ class TestTopicMasteryCategorizationProperties:
         else:
             assert category == "in_progress", \
                 f"Rate {success_rate}% should be 'in_progress', got '{category}'"
+    
+    @settings(max_examples=100, deadline=None)
+    @given(rates=st.dictionaries(
+        topic_strategy, st.floats(min_value=0.0, max_value=100.0, allow_nan=False), max_size=8
+    ))
+    def test_property_14_categorize_topics_partitions_all_topics(self, rates):
+        """
+        categorize_topics puts every topic in exactly the bucket that
+        categorize_topic_mastery names for it.
+        
+        Validates: Requirements 7.3
+        """
+        progress_svc = ProgressService()
+        
+        buckets = progress_svc.categorize_topics(
+            {topic: {'percentage': rate} for topic, rate in rates.items()}
+        )
+        
+        assert set(buckets) == {"mastered", "needs_work", "in_progress"}
+        assert sorted(t for topics in buckets.values() for t in topics) == sorted(rates)
+        for category, topics in buckets.items():
+            for topic in topics:
+                assert progress_svc.categorize_topic_mastery(rates[topic]) == category
 
 
 class TestProgressUpdateAfterQuizProperties:
@@ -159,6 +159,8 @@ class TestQuizAnswerRecordingProperties:
         # Submission should succeed
         assert error is None, f"Quiz submission failed: {error}"
         assert result is not None
+        assert result.topic == quiz.topic
+        assert QuizResult.from_dict(result.to_dict()).topic == quiz.topic
         
         # Verify each recorded answer matches submitted value
         for i, submitted_answer in enumerate(answers):
@@ -232,3 +234,46 @@ class TestQuizScoreCalculationProperties:
         assert result.correct_count == expected_correct
         assert result.total_questions == num_questions
         assert abs(result.score - expected_score) < 0.0001
+
+
+class TestQuizOwnershipIndexProperties:
+    """Property-based tests for per-user quiz and result lookups."""
+    
+    @settings(max_examples=50, deadline=None)
+    @given(
+        owners=st.lists(st.sampled_from(["alice", "bob", "carol"]), min_size=1, max_size=10),
+        questions=quiz_questions_list_strategy(min_questions=1, max_questions=3)
+    )
+    def test_user_lookups_return_only_own_items_in_order(self, owners, questions):
+        """
+        get_user_quizzes and get_user_results return exactly the user's
+        quizzes and results, in the order they were stored.
+        """
+        quiz_service = QuizService()
+        
+        quizzes = []
+        for owner in owners:
+            quiz = Quiz.create(user_id=owner, questions=questions, topic="Topic")
+            quiz_service._store_quiz(quiz)
+            quizzes.append(quiz)
+        
+        answers = [q.correct_index for q in questions]
+        results = []
+        for quiz in quizzes:
+            result, error = quiz_service.submit_quiz(quiz.id, quiz.user_id, answers)
+            assert error is None
+            results.append(result)
+        
+        # Each quiz can only be submitted once per user
+        for quiz in quizzes:
+            result, error = quiz_service.submit_quiz(quiz.id, quiz.user_id, answers)
+            assert result is None
+            assert error == "Quiz has already been submitted"
+        
+        for owner in ["alice", "bob", "carol", "nobody"]:
+            assert quiz_service.get_user_quizzes(owner) == [q for q in quizzes if q.user_id == owner]
+            assert quiz_service.get_user_results(owner) == [r for r in results if r.user_id == owner]
+        
+        quiz_service.clear_all()
+        assert quiz_service.get_user_quizzes(owners[0]) == []
+        assert quiz_service.get_user_results(owners[0]) == []
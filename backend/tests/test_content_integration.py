@@ -3,6 +3,7 @@ Integration tests for content management flows.
 
 Tests the content upload, listing, and deletion flows via the API.
 """
+import hashlib
 import os
 import io
 import pytest
@@ -121,6 +122,191 @@ class TestContentUpload:
         assert response.status_code == 400
         result = response.get_json()
         assert 'error' in result
+    
+    def test_upload_extracts_text_from_upload_stream(self, client, auth_token, monkeypatch):
+        """Test that processing reads the uploaded data, not the file written to disk."""
+        from app.services.content_service import content_service
+        
+        sources = []
+        monkeypatch.setattr(
+            content_service, '_extract_pdf_text',
+            lambda source: sources.append(source.read()) or 'extracted'
+        )
+        
+        response = client.post(
+            '/api/content/upload',
+            data={'file': (io.BytesIO(b'%PDF-1.4 test content'), 'test.pdf')},
+            content_type='multipart/form-data',
+            headers={'Authorization': f'Bearer {auth_token}'}
+        )
+        
+        assert response.status_code == 201
+        assert sources == [b'%PDF-1.4 test content']
+    
+    def test_upload_streams_large_file(self, client, auth_token):
+        """Test that a file larger than one write chunk is stored intact."""
+        from app.models.content import Content
+        from app.services.content_service import WRITE_CHUNK_SIZE
+        
+        file_data = os.urandom(WRITE_CHUNK_SIZE + 12345)
+        response = client.post(
+            '/api/content/upload',
+            data={'file': (io.BytesIO(file_data), 'large.mp4')},
+            content_type='multipart/form-data',
+            headers={'Authorization': f'Bearer {auth_token}'}
+        )
+        assert response.status_code == 201
+        
+        content = db.session.get(Content, response.get_json()['contentId'])
+        assert content.file_size == len(file_data)
+        with open(content.file_path, 'rb') as f:
+            assert f.read() == file_data
+    
+    def test_upload_with_async_processing(self, client, auth_token, monkeypatch):
+        """Test that async uploads return before processing and complete later."""
+        from app.services.content_service import content_service
+        
+        queued = []
+        queue_processing = content_service.process_content_async
+        monkeypatch.setattr(
+            content_service, 'process_content_async',
+            lambda content_id: queued.append(queue_processing(content_id))
+        )
+        
+        response = client.post(
+            '/api/content/upload',
+            data={
+                'file': (io.BytesIO(b'%PDF-1.4 test content'), 'test.pdf'),
+                'processAsync': 'true'
+            },
+            content_type='multipart/form-data',
+            headers={'Authorization': f'Bearer {auth_token}'}
+        )
+        
+        assert response.status_code == 202
+        result = response.get_json()
+        assert result['processingStatus'] == 'pending'
+        
+        processed_content, error = queued[0].result(timeout=30)
+        assert error is None
+        
+        content_response = client.get(
+            f"/api/content/{result['contentId']}",
+            headers={'Authorization': f'Bearer {auth_token}'}
+        )
+        assert content_response.get_json()['processingStatus'] == 'complete'
+    
+    def test_failed_write_leaves_no_record(self, client, auth_token, monkeypatch):
+        """Test that a file write failure does not leave a content row behind."""
+        from app.services import content_service as content_module
+        
+        def failing_write(file_path, file_data, blob_dir):
+            raise IOError("disk full")
+        
+        monkeypatch.setattr(content_module, '_write_file', failing_write)
+        
+        response = client.post(
+            '/api/content/upload',
+            data={'file': (io.BytesIO(b'%PDF-1.4 test content'), 'test.pdf')},
+            content_type='multipart/form-data',
+            headers={'Authorization': f'Bearer {auth_token}'}
+        )
+        assert response.status_code == 400
+        assert 'disk full' in response.get_json()['error']
+        
+        list_response = client.get(
+            '/api/content/list',
+            headers={'Authorization': f'Bearer {auth_token}'}
+        )
+        assert list_response.get_json()['contents'] == []
+    
+    def test_batch_upload_success(self, client, auth_token):
+        """Test uploading several files in one request."""
+        data = {
+            'files': [
+                (io.BytesIO(b'%PDF-1.4 first'), 'first.pdf'),
+                (io.BytesIO(b'fake video content'), 'second.mp4')
+            ]
+        }
+        response = client.post(
+            '/api/content/upload/batch',
+            data=data,
+            content_type='multipart/form-data',
+            headers={'Authorization': f'Bearer {auth_token}'}
+        )
+        
+        assert response.status_code == 201
+        result = response.get_json()
+        assert [c['filename'] for c in result['contents']] == ['first.pdf', 'second.mp4']
+        
+        list_response = client.get(
+            '/api/content/list',
+            headers={'Authorization': f'Bearer {auth_token}'}
+        )
+        assert len(list_response.get_json()['contents']) == 2
+    
+    def test_batch_upload_reports_processing_failures_per_file(self, client, auth_token, monkeypatch):
+        """Test that one file failing to process does not affect the others."""
+        from app.services.content_service import content_service
+        
+        extract_text = content_service._extract_text
+        
+        def failing_extract(content_type, filename, file_path, file_data=None):
+            if filename == 'broken.pdf':
+                raise ValueError("unreadable")
+            return extract_text(content_type, filename, file_path, file_data)
+        
+        monkeypatch.setattr(content_service, '_extract_text', failing_extract)
+        
+        data = {
+            'files': [
+                (io.BytesIO(b'%PDF-1.4 broken'), 'broken.pdf'),
+                (io.BytesIO(b'fake video content'), 'second.mp4')
+            ]
+        }
+        response = client.post(
+            '/api/content/upload/batch',
+            data=data,
+            content_type='multipart/form-data',
+            headers={'Authorization': f'Bearer {auth_token}'}
+        )
+        
+        assert response.status_code == 201
+        broken, video = response.get_json()['contents']
+        assert 'unreadable' in broken['warning']
+        assert 'warning' not in video
+        
+        statuses = {
+            c['filename']: c['processingStatus']
+            for c in client.get(
+                '/api/content/list',
+                headers={'Authorization': f'Bearer {auth_token}'}
+            ).get_json()['contents']
+        }
+        assert statuses == {'broken.pdf': 'failed', 'second.mp4': 'complete'}
+    
+    def test_batch_upload_rejects_whole_batch(self, client, auth_token):
+        """Test that one invalid file rejects the whole batch."""
+        data = {
+            'files': [
+                (io.BytesIO(b'%PDF-1.4 first'), 'first.pdf'),
+                (io.BytesIO(b'test content'), 'notes.txt')
+            ]
+        }
+        response = client.post(
+            '/api/content/upload/batch',
+            data=data,
+            content_type='multipart/form-data',
+            headers={'Authorization': f'Bearer {auth_token}'}
+        )
+        
+        assert response.status_code == 400
+        
+        list_response = client.get(
+            '/api/content/list',
+            headers={'Authorization': f'Bearer {auth_token}'}
+        )
+        assert list_response.get_json()['contents'] == []
 
 
 class TestContentListing:
@@ -162,6 +348,50 @@ class TestContentListing:
         assert len(result['contents']) == 1
         assert result['contents'][0]['filename'] == 'test.pdf'
     
+    def test_list_cursor_walks_all_content(self, client, auth_token):
+        """Test paging through content with the keyset cursor."""
+        data = {
+            'files': [(io.BytesIO(b'%PDF-1.4 content'), f'doc{i}.pdf') for i in range(5)]
+        }
+        client.post(
+            '/api/content/upload/batch',
+            data=data,
+            content_type='multipart/form-data',
+            headers={'Authorization': f'Bearer {auth_token}'}
+        )
+        
+        seen = []
+        params = {'limit': 2}
+        while True:
+            response = client.get(
+                '/api/content/list',
+                query_string=params,
+                headers={'Authorization': f'Bearer {auth_token}'}
+            )
+            assert response.status_code == 200
+            result = response.get_json()
+            seen.extend(c['id'] for c in result['contents'])
+            if not result['nextCursor']:
+                break
+            params = {'limit': 2, **result['nextCursor']}
+        
+        full_response = client.get(
+            '/api/content/list',
+            headers={'Authorization': f'Bearer {auth_token}'}
+        )
+        assert seen == [c['id'] for c in full_response.get_json()['contents']]
+        assert len(seen) == 5
+    
+    def test_list_rejects_bad_pagination(self, client, auth_token):
+        """Test validation of the pagination parameters."""
+        headers = {'Authorization': f'Bearer {auth_token}'}
+        
+        assert client.get('/api/content/list?limit=0', headers=headers).status_code == 400
+        assert client.get('/api/content/list?beforeId=abc', headers=headers).status_code == 400
+        assert client.get(
+            '/api/content/list?beforeCreatedAt=yesterday&beforeId=abc', headers=headers
+        ).status_code == 400
+    
     def test_list_without_auth(self, client):
         """Test listing without authentication fails."""
         response = client.get('/api/content/list')
@@ -247,6 +477,58 @@ class TestContentDeletion:
         )
         assert len(list_response.get_json()['contents']) == 0
     
+    def test_delete_content_with_missing_file(self, client, auth_token):
+        """Test that deleting content whose file is already gone still succeeds."""
+        from app.models.content import Content
+        
+        upload_response = client.post(
+            '/api/content/upload',
+            data={'file': (io.BytesIO(b'%PDF-1.4 test content'), 'test.pdf')},
+            content_type='multipart/form-data',
+            headers={'Authorization': f'Bearer {auth_token}'}
+        )
+        content_id = upload_response.get_json()['contentId']
+        os.remove(db.session.get(Content, content_id).file_path)
+        
+        response = client.delete(
+            f'/api/content/{content_id}',
+            headers={'Authorization': f'Bearer {auth_token}'}
+        )
+        
+        assert response.status_code == 200
+        assert db.session.get(Content, content_id) is None
+    
+    def test_duplicate_uploads_share_storage(self, client, auth_token, second_auth_token):
+        """Test that identical uploads share one blob until the last is deleted."""
+        from app.models.content import Content
+        
+        content_ids = []
+        for token in (auth_token, second_auth_token):
+            response = client.post(
+                '/api/content/upload',
+                data={'file': (io.BytesIO(b'%PDF-1.4 shared content'), 'shared.pdf')},
+                content_type='multipart/form-data',
+                headers={'Authorization': f'Bearer {token}'}
+            )
+            content_ids.append(response.get_json()['contentId'])
+        
+        contents = [db.session.get(Content, content_id) for content_id in content_ids]
+        paths = [content.file_path for content in contents]
+        sha256 = hashlib.sha256(b'%PDF-1.4 shared content').hexdigest()
+        assert all(content.sha256 == sha256 for content in contents)
+        assert os.path.samefile(paths[0], paths[1])
+        assert os.stat(paths[0]).st_nlink == 3
+        
+        client.delete(f'/api/content/{content_ids[0]}', headers={'Authorization': f'Bearer {auth_token}'})
+        assert os.stat(paths[1]).st_nlink == 2
+        with open(paths[1], 'rb') as f:
+            assert f.read() == b'%PDF-1.4 shared content'
+        
+        blob_path = os.path.join(os.path.dirname(os.path.dirname(paths[1])), 'blobs', sha256)
+        assert os.path.samefile(blob_path, paths[1])
+        client.delete(f'/api/content/{content_ids[1]}', headers={'Authorization': f'Bearer {second_auth_token}'})
+        assert not os.path.exists(blob_path)
+    
     def test_delete_other_user_content(self, client, auth_token, second_auth_token):
         """Test that users cannot delete other users' content."""
         # User 1 uploads a file
@@ -275,3 +557,62 @@ class TestContentDeletion:
             headers={'Authorization': f'Bearer {auth_token}'}
         )
         assert len(list_response.get_json()['contents']) == 1
+
+
+class TestContentMetadata:
+    """Test metadata updates on uploaded content."""
+    
+    def test_update_metadata(self, client, auth_token):
+        """Test that metadata updates persist and leave unspecified fields alone."""
+        from app.services.content_service import content_service
+        
+        upload_response = client.post(
+            '/api/content/upload',
+            data={'file': (io.BytesIO(b'%PDF-1.4 test content'), 'test.pdf')},
+            content_type='multipart/form-data',
+            headers={'Authorization': f'Bearer {auth_token}'}
+        )
+        content_id = upload_response.get_json()['contentId']
+        summary = upload_response.get_json()['summary']
+        
+        updated = content_service.update_content_metadata(
+            content_id, title='Renamed', key_points=['One', 'Two']
+        )
+        
+        assert updated.title == 'Renamed'
+        assert updated.key_points == ['One', 'Two']
+        assert updated.summary == summary
+        assert updated.processing_status == 'complete'
+        
+        assert content_service.update_content_metadata(content_id, topics=[], return_object=False) is True
+        assert content_service.get_content(content_id).topics == []
+    
+    def test_update_metadata_missing_content(self, app):
+        """Test updating content that does not exist."""
+        from app.services.content_service import content_service
+        
+        assert content_service.update_content_metadata('missing', title='Title') is None
+        assert content_service.update_content_metadata('missing', title='Title', return_object=False) is False
+    
+    def test_summary_and_key_points_lookup(self, client, auth_token):
+        """Test the summary and key point lookups for processed and pending content."""
+        from app.services.content_service import content_service
+        
+        upload_response = client.post(
+            '/api/content/upload',
+            data={'file': (io.BytesIO(b'%PDF-1.4 test content'), 'test.pdf')},
+            content_type='multipart/form-data',
+            headers={'Authorization': f'Bearer {auth_token}'}
+        )
+        result = upload_response.get_json()
+        content_id = result['contentId']
+        
+        assert content_service.get_content_summary(content_id) == result['summary']
+        assert content_service.get_content_key_points(content_id) == result['keyPoints']
+        assert content_service.get_content_summary('missing') is None
+        assert content_service.get_content_key_points('missing') is None
+        
+        content_service.get_content(content_id).processing_status = 'pending'
+        db.session.commit()
+        assert content_service.get_content_summary(content_id) is None
+        assert content_service.get_content_key_points(content_id) is None
@@ -0,0 +1,110 @@
+"""
+Integration tests for direct chat message pagination.
+
+Tests the keyset cursor handling of the messages endpoint via the API.
+"""
+import os
+import pytest
+
+# Set test database before importing app
+os.environ['DATABASE_URL'] = 'sqlite:///:memory:'
+
+from app import create_app
+from app.database import db
+from app.models.friend import Friend
+
+
+@pytest.fixture
+def app():
+    """Create application for testing."""
+    app = create_app()
+    app.config['TESTING'] = True
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    """Create test client."""
+    return app.test_client()
+
+
+def register(client, email):
+    """Register a user and return (user_id, auth headers)."""
+    response = client.post('/api/auth/register', json={
+        'email': email,
+        'password': 'password123',
+        'name': email.split('@')[0]
+    })
+    data = response.get_json()
+    return data['user']['id'], {'Authorization': f"Bearer {data['token']}"}
+
+
+@pytest.fixture
+def chat(client):
+    """Create two friends with a direct chat holding five messages."""
+    user1_id, headers = register(client, 'alice@example.com')
+    user2_id, _ = register(client, 'bob@example.com')
+    
+    db.session.add_all([
+        Friend(user_id=user1_id, friend_id=user2_id),
+        Friend(user_id=user2_id, friend_id=user1_id)
+    ])
+    db.session.commit()
+    
+    chat_id = client.get(f'/api/chat/direct/{user2_id}', headers=headers).get_json()['id']
+    for i in range(5):
+        client.post(f'/api/chat/{chat_id}/messages', json={'content': f'Message {i}'}, headers=headers)
+    
+    return chat_id, headers
+
+
+class TestMessagePagination:
+    """Test keyset pagination of chat messages."""
+    
+    def test_cursor_walks_full_history(self, client, chat):
+        """Following nextCursor should return every message exactly once."""
+        chat_id, headers = chat
+        
+        seen = []
+        params = {'limit': 2}
+        while True:
+            data = client.get(f'/api/chat/{chat_id}/messages', query_string=params, headers=headers).get_json()
+            seen = [m['content'] for m in data['messages']] + seen
+            if not data['nextCursor']:
+                break
+            params = {'limit': 2, **data['nextCursor']}
+        
+        assert seen == [f'Message {i}' for i in range(5)]
+    
+    def test_non_positive_limit_rejected(self, client, chat):
+        """A limit below 1 should return 400."""
+        chat_id, headers = chat
+        
+        response = client.get(f'/api/chat/{chat_id}/messages?limit=0', headers=headers)
+        
+        assert response.status_code == 400
+    
+    def test_partial_cursor_rejected(self, client, chat):
+        """Sending only half of the cursor should return 400."""
+        chat_id, headers = chat
+        
+        response = client.get(f'/api/chat/{chat_id}/messages?beforeId=abc', headers=headers)
+        
+        assert response.status_code == 400
+    
+    def test_invalid_cursor_timestamp_rejected(self, client, chat):
+        """An unparseable cursor timestamp should return 400."""
+        chat_id, headers = chat
+        
+        response = client.get(
+            f'/api/chat/{chat_id}/messages?beforeCreatedAt=yesterday&beforeId=abc',
+            headers=headers
+        )
+        
+        assert response.status_code == 400
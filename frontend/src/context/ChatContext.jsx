@@ -174,13 +174,17 @@ export function ChatProvider({ children }) {
     }
   };
 
-  const loadMoreMessages = async (offset) => {
+  const loadMoreMessages = async (oldestMessage) => {
     const chat = currentChatRef.current;
-    if (!chat || !token) return [];
+    if (!chat || !token || !oldestMessage) return [];
     
     try {
+      const params = new URLSearchParams({
+        beforeCreatedAt: oldestMessage.createdAt,
+        beforeId: oldestMessage.id
+      });
       const response = await fetch(
-        `${API_BASE}/chat/${chat.id}/messages?offset=${offset}`,
+        `${API_BASE}/chat/${chat.id}/messages?${params}`,
         { headers: { 'Authorization': `Bearer ${token}` } }
       );
       const data = await response.json();